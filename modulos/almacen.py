@@ -0,0 +1,248 @@
+"""
+Almacén binario del historial (Loto y Kino), para no re-parsear el CSV en
+cada rerun de Streamlit. Por juego, en data/historial_<juego>/:
+
+  fecha.bin      datetime64[D] (n,)
+  bolas.bin      uint8 (n, 6) Loto / (n, 20) Kino
+  <extra>.bin    uint8 (n,) por columna extra (Loto_Mas, Super_Mas)
+  manifest.json  filas confirmadas, columnas y fecha más reciente
+
+Son arreglos crudos de ancho fijo: se abren con np.memmap sin copiar ni
+parsear nada, y agregar sorteos es escribir al final de cada archivo y
+luego el manifest (el manifest manda: bytes de más tras un corte se
+descartan en la próxima escritura). Las filas quedan en orden de llegada;
+la lectura ordena por fecha.
+
+El CSV sigue siendo el formato de intercambio: el almacén se construye
+desde él la primera vez y toma sus sorteos nuevos si alguien lo edita por
+fuera (ver abrir_df). La sync escribe al almacén y exporta el CSV.
+"""
+import os
+import json
+import numpy as np
+import pandas as pd
+
+RUTA_DATA = os.path.join(os.path.dirname(__file__), '..', 'data')
+VERSION = 1
+ESQUEMAS = {
+    'loto': {'bolas': [f"Bola_{i}" for i in range(1, 7)], 'extras': ['Loto_Mas', 'Super_Mas']},
+    'kino': {'bolas': [f"B{i}" for i in range(1, 21)], 'extras': []},
+}
+
+_abiertos = {}  # juego -> (filas, columnas memmap)
+_dfs = {}       # juego -> (filas, DataFrame de a_df): se arma una vez por cambio del almacén
+
+
+def _ruta(juego, archivo=''):
+    return os.path.join(RUTA_DATA, f"historial_{juego}", archivo)
+
+
+def _archivos(juego):
+    """(nombre, dtype, ancho) de cada columna del juego."""
+    esquema = ESQUEMAS[juego]
+    cols = [('fecha', np.dtype('datetime64[D]'), None),
+            ('bolas', np.dtype(np.uint8), len(esquema['bolas']))]
+    return cols + [(e, np.dtype(np.uint8), None) for e in esquema['extras']]
+
+
+def columnas(juego):
+    esquema = ESQUEMAS[juego]
+    return ['Fecha'] + esquema['bolas'] + esquema['extras']
+
+
+def manifest(juego):
+    try:
+        with open(_ruta(juego, 'manifest.json'), encoding='utf-8') as fh:
+            m = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if m.get('version') != VERSION or m.get('columnas') != columnas(juego):
+        return None
+    return m
+
+
+def _guardar_manifest(juego, filas, ultima, csv=None):
+    tmp = _ruta(juego, 'manifest.json.tmp')
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        json.dump({'version': VERSION, 'columnas': columnas(juego),
+                   'filas': int(filas), 'ultima': ultima, 'csv': csv}, fh)
+    os.replace(tmp, _ruta(juego, 'manifest.json'))
+
+
+def _firma(ruta):
+    """Tamaño y mtime del CSV: si cambian, alguien lo escribió por fuera del almacén."""
+    try:
+        st = os.stat(ruta)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def abrir(juego):
+    """
+    Dict columna -> memmap de solo lectura ('fecha', 'bolas', extras), en
+    orden de llegada, o None si no hay almacén. Sin copia ni parseo.
+    """
+    m = manifest(juego)
+    if m is None:
+        return None
+    filas = m['filas']
+    previo = _abiertos.get(juego)
+    if previo is not None and previo[0] == filas:
+        return previo[1]
+    datos = {}
+    for nombre, dtype, ancho in _archivos(juego):
+        forma = (filas,) if ancho is None else (filas, ancho)
+        if filas == 0:
+            datos[nombre] = np.empty(forma, dtype=dtype)
+            continue
+        try:
+            datos[nombre] = np.memmap(_ruta(juego, nombre + '.bin'), dtype=dtype, mode='r', shape=forma)
+        except (OSError, ValueError):
+            return None  # archivo faltante o más corto que el manifest
+    _abiertos[juego] = (filas, datos)
+    return datos
+
+
+def _normalizar(juego, df):
+    """
+    df de sorteos -> (fechas datetime64[D], bolas uint8, extras). Como al
+    leer el CSV: fechas en cualquier formato que entienda pandas (igual que
+    normalizar_fecha_iso de la página; sin fecha la fila se descarta) y
+    números vacíos o no numéricos como 0.
+    """
+    esquema = ESQUEMAS[juego]
+    fechas = pd.to_datetime(df['Fecha'].astype(str).str.strip(), format='mixed', errors='coerce')
+    numeros = pd.DataFrame({c: pd.to_numeric(df[c], errors='coerce') if c in df.columns else 0
+                            for c in esquema['bolas'] + esquema['extras']}, index=df.index)
+    validas = fechas.notna().values
+    numeros = numeros[validas].fillna(0).clip(0, 255).values.astype(np.uint8)
+    n_bolas = len(esquema['bolas'])
+    return (fechas.values[validas].astype('datetime64[D]'), numeros[:, :n_bolas],
+            {e: numeros[:, n_bolas + i] for i, e in enumerate(esquema['extras'])})
+
+
+def agregar(juego, df):
+    """
+    Agrega al almacén los sorteos de df cuya fecha no esté ya (solo se
+    parsean esas filas; lo que ya está no se reescribe). Crea el almacén si
+    no existe. Devuelve cuántos sorteos se agregaron.
+    """
+    actual = abrir(juego)
+    filas = 0 if actual is None else len(actual['fecha'])
+    fechas, bolas, extras = _normalizar(juego, df)
+    nuevas = ~np.isin(fechas, actual['fecha']) if filas else np.ones(len(fechas), dtype=bool)
+    # una sola vez por fecha, aunque df la traiga repetida
+    _, primeras = np.unique(fechas, return_index=True)
+    unicas = np.zeros(len(fechas), dtype=bool)
+    unicas[primeras] = True
+    nuevas &= unicas
+    if not nuevas.any():
+        return 0
+
+    columnas_nuevas = {'fecha': fechas[nuevas], 'bolas': bolas[nuevas],
+                       **{e: v[nuevas] for e, v in extras.items()}}
+    os.makedirs(_ruta(juego), exist_ok=True)
+    for nombre, dtype, ancho in _archivos(juego):
+        ruta = _ruta(juego, nombre + '.bin')
+        fila_bytes = dtype.itemsize * (ancho or 1)
+        with open(ruta, 'ab') as fh:
+            if fh.tell() != filas * fila_bytes:
+                fh.truncate(filas * fila_bytes)  # descarta una escritura cortada
+            fh.write(np.ascontiguousarray(columnas_nuevas[nombre], dtype=dtype).tobytes())
+    ultima = fechas[nuevas].max()
+    if filas:
+        ultima = max(ultima, actual['fecha'].max())
+    m = manifest(juego)
+    _guardar_manifest(juego, filas + int(nuevas.sum()), str(ultima), m and m.get('csv'))
+    _abiertos.pop(juego, None)
+    _dfs.pop(juego, None)
+    return int(nuevas.sum())
+
+
+def _solo_agrega(juego, actual, df):
+    """True si df trae cada sorteo del almacén sin cambios (a lo más suma fechas nuevas)."""
+    fechas, bolas, extras = _normalizar(juego, df)
+    unicas, primeras = np.unique(fechas, return_index=True)
+    guardadas = actual['fecha']
+    if len(unicas) == 0:
+        return len(guardadas) == 0
+    pos = np.minimum(np.searchsorted(unicas, guardadas), len(unicas) - 1)
+    if (unicas[pos] != guardadas).any():
+        return False
+    filas = primeras[pos]
+    return (np.array_equal(bolas[filas], actual['bolas'])
+            and all(np.array_equal(v[filas], actual[e]) for e, v in extras.items()))
+
+
+def reconstruir(juego, df):
+    """Reemplaza el almacén por el contenido de df. Devuelve cuántos sorteos quedaron."""
+    try:
+        os.remove(_ruta(juego, 'manifest.json'))
+    except OSError:
+        pass
+    _abiertos.pop(juego, None)
+    _dfs.pop(juego, None)
+    return agregar(juego, df)
+
+
+def a_df(juego, datos):
+    """DataFrame como el del CSV (Fecha ISO, enteros), del más reciente al más viejo."""
+    esquema = ESQUEMAS[juego]
+    orden = np.argsort(datos['fecha'], kind='stable')[::-1]
+    out = {'Fecha': np.datetime_as_string(datos['fecha'][orden], unit='D')}
+    bolas = datos['bolas'][orden].astype(np.int64)
+    for i, c in enumerate(esquema['bolas']):
+        out[c] = bolas[:, i]
+    for e in esquema['extras']:
+        out[e] = datos[e][orden].astype(np.int64)
+    return pd.DataFrame(out)
+
+
+def abrir_df(juego, ruta_csv):
+    """
+    Historial del juego como DataFrame, leído del almacén. Si el almacén no
+    existe se construye desde ruta_csv. Si el CSV cambió por fuera (git pull,
+    otro script, edición a mano) y solo suma sorteos, se agregan; si corrige
+    o borra alguno, el almacén se rehace desde el CSV (manda el CSV). None si
+    no se pudo usar el almacén: el que llama lee el CSV como antes.
+
+    El DataFrame (con las fechas pasadas a texto) se arma una sola vez por
+    cambio del almacén y se reparte copiado: un rerun sin sorteos nuevos solo
+    mira el manifest y la firma del CSV.
+    """
+    firma = _firma(ruta_csv)
+    m = manifest(juego)
+    try:
+        if firma is not None and (m is None or m.get('csv') != firma):
+            df_csv = pd.read_csv(ruta_csv)
+            actual = None if m is None else abrir(juego)
+            if actual is None or not _solo_agrega(juego, actual, df_csv):
+                reconstruir(juego, df_csv)
+            else:
+                agregar(juego, df_csv)
+            m = manifest(juego)
+            if m is not None:
+                _guardar_manifest(juego, m['filas'], m['ultima'], firma)
+    except (OSError, ValueError, KeyError):
+        return None
+    datos = abrir(juego)
+    if datos is None:
+        return None
+    filas = len(datos['fecha'])
+    previo = _dfs.get(juego)
+    if previo is None or previo[0] != filas:
+        previo = _dfs[juego] = (filas, a_df(juego, datos))
+    return previo[1].copy()
+
+
+def exportar_csv(juego, ruta_csv):
+    """Escribe el almacén completo como CSV (más reciente primero) y lo marca como al día."""
+    datos = abrir(juego)
+    if datos is None:
+        return False
+    os.makedirs(os.path.dirname(ruta_csv), exist_ok=True)
+    a_df(juego, datos).to_csv(ruta_csv, index=False)
+    m = manifest(juego)
+    _guardar_manifest(juego, m['filas'], m['ultima'], _firma(ruta_csv))
+    return True
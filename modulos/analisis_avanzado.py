@@ -1,91 +1,185 @@
 """Análisis extra para Loto Leidsa: pares frecuentes y test de imparcialidad."""
+import numpy as np
 import pandas as pd
-from collections import Counter
-from itertools import combinations
+
+import modulos.historial as historial
 
 BOLAS = ['Bola_1', 'Bola_2', 'Bola_3', 'Bola_4', 'Bola_5', 'Bola_6']
 
 
-def pares_frecuentes(df, top=15):
+def _incidencia(df, desde=None, hasta=None):
+    """Incidencia sorteo x 40 (bool) y fechas, opcionalmente recortadas a [desde, hasta]."""
+    idx = historial.indexar(df)
+    X = idx.incidencia
+    fechas = idx.fechas
+    if desde is not None or hasta is not None:
+        ok = np.ones(len(fechas), dtype=bool)
+        if desde is not None:
+            ok &= fechas >= np.datetime64(pd.Timestamp(desde).date())
+        if hasta is not None:
+            ok &= fechas <= np.datetime64(pd.Timestamp(hasta).date())
+        X, fechas = X[ok], fechas[ok]
+    return X, fechas
+
+
+def coocurrencia(df, desde=None, hasta=None, vida_media=None):
+    """
+    Matriz 40x40 de co-ocurrencia como X.T @ X sobre la incidencia sorteo x número.
+    desde/hasta: ventana de fechas. vida_media: en sorteos; si se da, cada sorteo
+    pesa 0.5 ** (antigüedad / vida_media) (el más reciente pesa 1).
+    La diagonal queda en 0.
+    """
+    X, _ = _incidencia(df, desde, hasta)
+    X = X.astype(np.float64)
+    if vida_media:
+        pesos = 0.5 ** (np.arange(len(X)) / float(vida_media))  # filas: reciente primero
+        m = (X * pesos[:, None]).T @ X
+    else:
+        m = X.T @ X
+    np.fill_diagonal(m, 0)
+    return m
+
+
+def pares_frecuentes(df, top=15, desde=None, hasta=None, vida_media=None):
     """Cuenta qué parejas de números han salido juntas más veces."""
-    if df is None or df.empty:
+    if df is None or (isinstance(df, pd.DataFrame) and df.empty):
         return pd.DataFrame(columns=['Par', 'Veces'])
-    conteo = Counter()
-    for _, fila in df.iterrows():
-        try:
-            nums = sorted(int(fila[c]) for c in BOLAS)
-        except Exception:
-            continue
-        for par in combinations(nums, 2):
-            conteo[par] += 1
-    filas = [(f"{a} - {b}", v) for (a, b), v in conteo.most_common(top)]
+    m = coocurrencia(df, desde, hasta, vida_media)
+    a, b = np.triu_indices(40, k=1)
+    veces = m[a, b]
+    # Orden: más veces primero; empate -> par menor primero
+    orden = np.lexsort((b, a, -veces))[:top]
+    orden = orden[veces[orden] > 0]
+    if not vida_media:
+        veces = veces.astype(int)
+    else:
+        veces = veces.round(2)
+    filas = [(f"{a[i] + 1} - {b[i] + 1}", veces[i]) for i in orden]
     return pd.DataFrame(filas, columns=['Par', 'Veces'])
 
 
-def matriz_pares(df):
+def matriz_pares(df, desde=None, hasta=None, vida_media=None):
     """Matriz 40x40 de co-ocurrencia para heatmap."""
-    import numpy as np
-    m = np.zeros((40, 40), dtype=int)
-    if df is None or df.empty:
-        return m
-    for _, fila in df.iterrows():
-        try:
-            nums = [int(fila[c]) for c in BOLAS]
-        except Exception:
-            continue
-        for a, b in combinations(nums, 2):
-            m[a-1][b-1] += 1
-            m[b-1][a-1] += 1
-    return m
+    if df is None or (isinstance(df, pd.DataFrame) and df.empty):
+        return np.zeros((40, 40), dtype=int)
+    m = coocurrencia(df, desde, hasta, vida_media)
+    return m if vida_media else m.astype(int)
+
+
+# ============ MONTE CARLO ============
+
+MAX_CELDAS_LOTE = 4_000_000  # sims x sorteos x 40 por lote (~32 MB en float64)
+
+
+def _estadisticos(conteos, pares_max, esperado):
+    """chi2, máximo y mínimo por número, y máximo de pares para cada historia."""
+    chi2 = ((conteos - esperado) ** 2 / esperado).sum(axis=-1)
+    return chi2, conteos.max(axis=-1), conteos.min(axis=-1), pares_max
+
+
+def simular_lote(rng, n_sims, n_sorteos):
+    """
+    n_sims historias sintéticas de n_sorteos sorteos 6-de-40 justos.
+    Devuelve conteos por número (n_sims, 40) y el máximo de co-ocurrencia de
+    pares de cada historia (n_sims,).
+    """
+    claves = rng.random((n_sims, n_sorteos, 40))
+    top6 = np.argpartition(claves, 6, axis=-1)[..., :6]
+    X = np.zeros((n_sims, n_sorteos, 40), dtype=np.float32)
+    np.put_along_axis(X, top6, 1.0, axis=-1)
+    conteos = X.sum(axis=1)
+    pares = np.matmul(X.transpose(0, 2, 1), X)
+    idx = np.arange(40)
+    pares[:, idx, idx] = 0
+    return conteos, pares.reshape(n_sims, -1).max(axis=1)
+
+
+def pvalores_montecarlo(X, simulaciones=20000, tiempo_max=2.0, tolerancia=0.005, semilla=None):
+    """
+    p-valores empíricos del historial observado (incidencia X: sorteos x 40)
+    contra historias justas simuladas del mismo largo, en lotes de NumPy:
+    chi2 (extremo alto), número más frecuente (alto), menos frecuente (bajo) y
+    par más repetido (alto). p = (1 + extremos) / (1 + simulaciones).
+    Para cuando se acaba el tiempo_max (segundos), se llega a 'simulaciones'
+    o el intervalo al 95% del p de chi2 es más estrecho que ±tolerancia.
+    """
+    import time
+    t0 = time.time()
+    rng = np.random.default_rng(semilla)
+    n_sorteos = len(X)
+    esperado = n_sorteos * 6 / 40.0
+    Xf = X.astype(np.float64)
+    pares_obs = Xf.T @ Xf
+    np.fill_diagonal(pares_obs, 0)
+    obs = _estadisticos(Xf.sum(axis=0), pares_obs.max(), esperado)
+
+    lote = max(1, min(1000, MAX_CELDAS_LOTE // (n_sorteos * 40)))
+    extremos = np.zeros(4, dtype=np.int64)
+    hechas = 0
+    while hechas < simulaciones:
+        n = min(lote, simulaciones - hechas)
+        conteos, pares_max = simular_lote(rng, n, n_sorteos)
+        chi2, mx, mn, pm = _estadisticos(conteos, pares_max, esperado)
+        extremos += [(chi2 >= obs[0] - 1e-9).sum(), (mx >= obs[1]).sum(),
+                     (mn <= obs[2]).sum(), (pm >= obs[3]).sum()]
+        hechas += n
+        p = (1 + extremos[0]) / (1 + hechas)
+        if time.time() - t0 > tiempo_max:
+            break
+        if hechas >= 1000 and 1.96 * np.sqrt(p * (1 - p) / hechas) < tolerancia:
+            break
+
+    p = (1 + extremos) / (1 + hechas)
+    return {
+        "simulaciones": hechas,
+        "segundos": round(time.time() - t0, 2),
+        "p_chi2": round(float(p[0]), 4),
+        "p_mas_sale": round(float(p[1]), 4),
+        "p_menos_sale": round(float(p[2]), 4),
+        "p_par": round(float(p[3]), 4),
+        "par_max": int(obs[3]),
+    }
 
 
-def test_chi_cuadrado(df):
+def test_chi_cuadrado(df, simulaciones=20000, tiempo_max=2.0, semilla=None, desde=None, hasta=None):
     """
     Test chi-cuadrado de bondad de ajuste: ¿todos los números salen
     con frecuencia parecida (sorteo justo) o hay sesgo?
-    Devuelve dict con estadístico, grados de libertad y veredicto.
+    El p-valor es empírico (Monte Carlo, ver pvalores_montecarlo), e incluye
+    también el del número más/menos frecuente y el del par más repetido.
+    desde/hasta: ventana de fechas; el mínimo de sorteos se exige después de recortar.
+    Devuelve dict con estadístico, grados de libertad, p-valores y veredicto.
     """
-    if df is None or df.empty or len(df) < 20:
+    X, _ = _incidencia(df, desde, hasta)
+    if len(X) < 20:
         return {"error": "Se necesitan al menos 20 sorteos para el test."}
 
-    conteo = Counter()
-    total_sorteos = 0
-    for _, fila in df.iterrows():
-        try:
-            nums = [int(fila[c]) for c in BOLAS]
-        except Exception:
-            continue
-        for n in nums:
-            if 1 <= n <= 40:
-                conteo[n] += 1
-        total_sorteos += 1
-
-    for i in range(1, 41):
-        if i not in conteo:
-            conteo[i] = 0
+    total_sorteos = len(X)
+    conteo = X.sum(axis=0).astype(int)
 
     total_bolas = total_sorteos * 6
     esperado = total_bolas / 40.0  # cada número debería salir esto en promedio
 
-    chi2 = sum((conteo[i] - esperado) ** 2 / esperado for i in range(1, 41))
+    chi2 = float(((conteo - esperado) ** 2 / esperado).sum())
     gl = 39  # 40 categorías - 1
 
-    # Valores críticos chi-cuadrado para gl=39
+    # Valor crítico chi-cuadrado para gl=39 (referencia para la UI)
     critico_95 = 54.572   # p=0.05
-    critico_99 = 62.428   # p=0.01
 
-    if chi2 < critico_95:
+    mc = pvalores_montecarlo(X, simulaciones, tiempo_max, semilla=semilla)
+    p = mc["p_chi2"]
+    if p >= 0.05:
         veredicto = "✅ JUSTO"
         detalle = "Las frecuencias son consistentes con un sorteo aleatorio justo. Ningún número está favorecido ni perjudicado de forma significativa."
-    elif chi2 < critico_99:
+    elif p >= 0.01:
         veredicto = "🟡 LEVE DESVIACIÓN"
         detalle = "Hay una desviación menor, dentro de lo que el azar puede producir ocasionalmente. No es evidencia de trucaje."
     else:
         veredicto = "🔴 DESVIACIÓN NOTABLE"
         detalle = "Desviación estadísticamente notable. Con más sorteos suele normalizarse; en loterías reales casi siempre se debe al azar de muestras pequeñas."
 
-    mas_sale = max(range(1, 41), key=lambda i: conteo[i])
-    menos_sale = min(range(1, 41), key=lambda i: conteo[i])
+    mas_sale = int(conteo.argmax()) + 1
+    menos_sale = int(conteo.argmin()) + 1
 
     return {
         "chi2": round(chi2, 2),
@@ -95,6 +189,7 @@ def test_chi_cuadrado(df):
         "veredicto": veredicto,
         "detalle": detalle,
         "sorteos": total_sorteos,
-        "mas_sale": (mas_sale, conteo[mas_sale]),
-        "menos_sale": (menos_sale, conteo[menos_sale]),
-    }
\ No newline at end of file
+        "mas_sale": (mas_sale, int(conteo[mas_sale - 1])),
+        "menos_sale": (menos_sale, int(conteo[menos_sale - 1])),
+        **mc,
+    }
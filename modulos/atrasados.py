@@ -0,0 +1,126 @@
+"""
+Seguimiento incremental de atrasados (Loto y Kino).
+El estado es "último sorteo en que salió cada número" + cuántos sorteos
+llevamos. Se reconstruye de una pasada vectorizada y, cuando la sync agrega
+sorteos nuevos, se actualiza en O(números) por sorteo. El ranking de
+atrasados sale directo del estado, sin recorrer el historial.
+Se guarda en data/atrasados_<juego>.json.
+"""
+import os
+import json
+import numpy as np
+import pandas as pd
+
+RUTA_DATA = os.path.join(os.path.dirname(__file__), '..', 'data')
+MAXIMOS = {'loto': 40, 'kino': 80}
+
+_estados = {}
+
+
+def _ruta(juego):
+    return os.path.join(RUTA_DATA, f"atrasados_{juego}.json")
+
+
+def _a_fechas(fechas):
+    return pd.to_datetime(pd.Series(fechas), errors='coerce').values.astype('datetime64[D]')
+
+
+def reconstruir(fechas, sorteos, maximo):
+    """Estado desde cero. fechas/sorteos en cualquier orden; se ordenan cronológicamente."""
+    fechas = _a_fechas(fechas)
+    sorteos = np.asarray(sorteos, dtype=np.int64)
+    validas = ~np.isnat(fechas)
+    fechas, sorteos = fechas[validas], sorteos[validas]
+    orden = np.argsort(fechas, kind='stable')
+    fechas, sorteos = fechas[orden], sorteos[orden]
+
+    ultimo = np.full(maximo + 1, -1, dtype=np.int64)
+    filas = np.broadcast_to(np.arange(len(sorteos))[:, None], sorteos.shape)
+    en_rango = (sorteos >= 1) & (sorteos <= maximo)
+    np.maximum.at(ultimo, sorteos[en_rango], filas[en_rango])
+    return {
+        'maximo': maximo,
+        'total': int(len(sorteos)),
+        'fecha': str(fechas[-1]) if len(fechas) else None,
+        'ultimo': ultimo[1:].tolist(),
+    }
+
+
+def actualizar(estado, fechas, sorteos):
+    """Agrega sorteos posteriores a estado['fecha'] (O(números) por sorteo)."""
+    fechas = _a_fechas(fechas)
+    orden = np.argsort(fechas, kind='stable')
+    for i in orden:
+        if np.isnat(fechas[i]):
+            continue
+        for n in sorteos[i]:
+            if 1 <= int(n) <= estado['maximo']:
+                estado['ultimo'][int(n) - 1] = estado['total']
+        estado['total'] += 1
+        estado['fecha'] = str(fechas[i])
+    return estado
+
+
+def cargar(juego):
+    if juego in _estados:
+        return _estados[juego]
+    try:
+        with open(_ruta(juego), encoding='utf-8') as fh:
+            _estados[juego] = json.load(fh)
+    except (OSError, ValueError):
+        _estados[juego] = None
+    return _estados[juego]
+
+
+def guardar(juego, estado):
+    _estados[juego] = estado
+    try:
+        os.makedirs(RUTA_DATA, exist_ok=True)
+        tmp = _ruta(juego) + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as fh:
+            json.dump(estado, fh)
+        os.replace(tmp, _ruta(juego))
+    except OSError:
+        pass
+
+
+def sincronizar(juego, fechas, sorteos):
+    """
+    Deja el estado de 'juego' al día con el historial completo: fechas ISO
+    (texto o datetime64; las que no se entienden no cuentan, como en
+    reconstruir) y sorteos (n, k). Si ya está al día no toca el historial.
+    Si solo hay sorteos nuevos al final: actualización incremental. Si
+    cambió de otra forma (fechas viejas): reconstrucción.
+    """
+    fechas = _a_fechas(fechas)
+    validas = fechas[~np.isnat(fechas)]
+    total = len(validas)
+    ultima = str(validas.max()) if total else None
+    estado = cargar(juego)
+    if estado is not None and estado['total'] == total and estado['fecha'] == ultima:
+        return estado
+
+    sorteos = np.asarray(sorteos, dtype=np.int64)
+    if estado is not None and estado['fecha'] is not None:
+        nuevas = fechas > np.datetime64(estado['fecha'])
+        if estado['total'] + int(nuevas.sum()) == total:
+            estado = actualizar(dict(estado, ultimo=list(estado['ultimo'])),
+                                fechas[nuevas], sorteos[nuevas])
+            guardar(juego, estado)
+            return estado
+
+    estado = reconstruir(fechas, sorteos, MAXIMOS[juego])
+    guardar(juego, estado)
+    return estado
+
+
+def sin_salir(estado):
+    """Array (maximo,): sorteos que lleva sin salir cada número (todos si nunca salió)."""
+    return estado['total'] - 1 - np.asarray(estado['ultimo'], dtype=np.int64)
+
+
+def ranking(estado, col_numero):
+    """DataFrame de atrasados, del más atrasado al menos."""
+    out = pd.DataFrame({col_numero: np.arange(1, estado['maximo'] + 1),
+                        'Sorteos_Sin_Salir': sin_salir(estado).astype(int)})
+    return out.sort_values(by='Sorteos_Sin_Salir', ascending=False).reset_index(drop=True)
@@ -0,0 +1,264 @@
+"""
+Backtest walk-forward de los generadores Loto y Kino.
+Se recorre el historial sorteo a sorteo: en cada paso el generador solo ve
+los sorteos anteriores, genera N jugadas con una configuración y se cuentan
+los aciertos contra el sorteo de ese día. Configuraciones x pasos se
+reparten en un pool de procesos y cada resultado se agrega a un .jsonl
+apenas llega: un barrido largo se puede cortar y retomar donde quedó.
+
+    import modulos.backtest as bt
+    configs = [bt.CONFIG_LOTO, dict(bt.CONFIG_LOTO, generador='azar')]
+    bt.correr('loto', df_historial, configs, 'data/backtest/loto.jsonl')
+    bt.resumen('data/backtest/loto.jsonl')
+
+Cada paso usa una semilla derivada de (semilla, config, fecha): el
+resultado no depende de cuántos procesos se usen ni del orden.
+"""
+import os
+import json
+import random
+import hashlib
+import numpy as np
+import pandas as pd
+
+import modulos.combinaciones as comb
+import modulos.historial as historial
+
+BOLAS_KINO = [f"B{i}" for i in range(1, 21)]
+GENERADORES = ('filtros', 'azar')
+
+# Loto no tiene tabla de premios en la app: para ROI pasa 'premios' {aciertos: RD$}
+CONFIG_LOTO = {
+    'generador': 'filtros', 'cantidad': 10, 'rango_suma': [90, 160],
+    'descartar_pares': True, 'descartar_terminaciones': True, 'descartar_consecutivos': True,
+    'filtro_historico': True, 'usar_gauss': True, 'spread_decenas': True, 'exacto': False,
+    'premios': None,
+}
+CONFIG_KINO = {'generador': 'filtros', 'cantidad': 10}
+ESPERADO_AZAR = {'loto': 6 * 6 / 40, 'kino': 10 * 20 / 80}  # aciertos medios por boleto
+PASOS_POR_TAREA = 10
+
+_estado = {}  # por proceso: historial ya preparado
+
+
+def id_config(config):
+    """Identificador estable de una configuración (mismo dict -> mismo id)."""
+    return hashlib.sha1(json.dumps(config, sort_keys=True).encode()).hexdigest()[:10]
+
+
+def _preparar(juego, df):
+    if juego == 'loto':
+        idx = historial.indexar(df)
+        return {'fechas': idx.fechas, 'indice': idx}
+    df = df.copy()
+    df['_f'] = pd.to_datetime(df['Fecha'], errors='coerce').values.astype('datetime64[D]')
+    df = df.dropna(subset=['_f']).sort_values('_f', ascending=False).reset_index(drop=True)
+    return {'fechas': df['_f'].values.astype('datetime64[D]'), 'df': df.drop(columns='_f')}
+
+
+def _iniciar(juego, df):
+    _estado['juego'] = juego
+    _estado['datos'] = _preparar(juego, df)
+
+
+def _semilla(semilla, cid, fecha):
+    dia = int(np.datetime64(fecha, 'D').astype(np.int64))
+    return np.random.SeedSequence([semilla, int(cid, 16), dia])
+
+
+def _paso_loto(datos, config, fecha, ss):
+    import modulos.fisica_filtros as filtros
+    import modulos.wheeling as wheeling
+    idx = datos['indice']
+    fila = int(np.flatnonzero(idx.fechas == np.datetime64(fecha, 'D'))[0])
+    previos = idx.previos(fecha)
+    n = int(config['cantidad'])
+    if config['generador'] == 'azar':
+        rng = np.random.default_rng(ss)
+        bolas = np.argsort(rng.random((n, 40)), axis=1)[:, :6] + 1
+    else:
+        df = filtros.generar_predicciones(
+            previos, n, tuple(config['rango_suma']), config['descartar_pares'],
+            config['descartar_terminaciones'], config['descartar_consecutivos'],
+            config['filtro_historico'], set(), config['usar_gauss'], config['spread_decenas'],
+            config['exacto'], semilla=ss, juego=None)
+        bolas = df[filtros.BOLAS_COLS].values.astype(np.int64)
+    aciertos = comb.popcount(comb.codificar_lote(bolas) & idx.mascaras[fila]).astype(np.int64)
+    premios = {int(k): v for k, v in (config.get('premios') or {}).items()}
+    return aciertos, 7, sum(premios.get(int(a), 0) for a in aciertos), len(bolas) * wheeling.COSTO_LOTO
+
+
+def _paso_kino(datos, config, fecha, ss):
+    import modulos.kino_filtros as kf
+    import modulos.wheeling as wheeling
+    df = datos['df']
+    dia = np.datetime64(fecha, 'D')
+    sorteo = set(df.loc[datos['fechas'] == dia, BOLAS_KINO].iloc[0].astype(int))
+    n = int(config['cantidad'])
+    if config['generador'] == 'azar':
+        rng = np.random.default_rng(ss)
+        jugadas = (np.argsort(rng.random((n, 80)), axis=1)[:, :10] + 1).tolist()
+    else:
+        rng = random.Random(int(ss.generate_state(1)[0]))
+        previos = df[datos['fechas'] < dia].reset_index(drop=True)
+        jugadas = kf.generar_kino(previos, n, set(), juego=None, rng=rng)[[f"N{i}" for i in range(1, 11)]].values.tolist()
+    aciertos = np.array([len(sorteo.intersection(j)) for j in jugadas], dtype=np.int64)
+    return aciertos, 11, sum(kf.premio_por_aciertos(int(a)) for a in aciertos), len(jugadas) * wheeling.COSTO_KINO
+
+
+def _tarea(args):
+    """Corre una configuración sobre varias fechas en el proceso actual."""
+    cid, config, fechas, semilla = args
+    paso = _paso_loto if _estado['juego'] == 'loto' else _paso_kino
+    out = []
+    for fecha in fechas:
+        aciertos, niveles, premio, costo = paso(_estado['datos'], config, fecha, _semilla(semilla, cid, fecha))
+        out.append({'config': cid, 'fecha': fecha, 'boletos': int(len(aciertos)),
+                    'aciertos': np.bincount(aciertos, minlength=niveles).tolist(),
+                    'premio': int(premio), 'costo': int(costo)})
+    return out
+
+
+def _hechos(salida):
+    hechos = set()
+    try:
+        with open(salida, encoding='utf-8') as fh:
+            for linea in fh:
+                try:
+                    r = json.loads(linea)
+                except ValueError:
+                    continue  # última línea cortada si se interrumpió
+                hechos.add((r['config'], r['fecha']))
+    except OSError:
+        pass
+    return hechos
+
+
+def _cortada(salida):
+    """True si el .jsonl no termina en salto de línea (se cortó escribiendo)."""
+    try:
+        with open(salida, 'rb') as fh:
+            fh.seek(-1, os.SEEK_END)
+            return fh.read(1) != b"\n"
+    except OSError:
+        return False  # no existe o está vacío
+
+
+def _guardar_configs(salida, configs):
+    ruta = salida + ".configs.json"
+    try:
+        with open(ruta, encoding='utf-8') as fh:
+            todas = json.load(fh)
+    except (OSError, ValueError):
+        todas = {}
+    todas.update(configs)
+    with open(ruta, 'w', encoding='utf-8') as fh:
+        json.dump(todas, fh, indent=1)
+
+
+def correr(juego, df, configs, salida, desde=None, hasta=None, min_previos=30,
+           procesos=None, semilla=0):
+    """
+    juego: 'loto' o 'kino'. df: historial completo (Loto: DataFrame o HistorialIndex).
+    configs: lista de dicts (ver CONFIG_LOTO / CONFIG_KINO; generador 'azar' = control).
+    salida: .jsonl donde se agrega una línea por (config, sorteo); las que ya
+    están se saltan. Los dicts de config se guardan en salida + '.configs.json'.
+    Solo se juegan sorteos con al menos min_previos sorteos anteriores.
+    Devuelve cuántas líneas nuevas se escribieron.
+    """
+    if juego not in ESPERADO_AZAR:
+        raise ValueError(f"Juego desconocido: {juego}")
+    datos = _preparar(juego, df)
+    fechas = np.sort(datos['fechas'])[min_previos:]
+    if desde is not None:
+        fechas = fechas[fechas >= np.datetime64(desde, 'D')]
+    if hasta is not None:
+        fechas = fechas[fechas <= np.datetime64(hasta, 'D')]
+    fechas = [str(f) for f in np.unique(fechas)]
+
+    por_id = {}
+    for config in configs:
+        if config.get('generador', 'filtros') not in GENERADORES:
+            raise ValueError(f"Generador desconocido: {config.get('generador')}")
+        por_id[id_config(config)] = config
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    _guardar_configs(salida, por_id)
+
+    hechos = _hechos(salida)
+    tareas = []
+    for cid, config in por_id.items():
+        pendientes = [f for f in fechas if (cid, f) not in hechos]
+        for i in range(0, len(pendientes), PASOS_POR_TAREA):
+            tareas.append((cid, config, pendientes[i:i + PASOS_POR_TAREA], semilla))
+
+    escritas = 0
+    procesos = max(1, min(procesos or os.cpu_count() or 1, len(tareas)))
+    with open(salida, 'a', encoding='utf-8') as fh:
+        if _cortada(salida):
+            fh.write("\n")  # la primera fila nueva no se pega a la línea cortada
+
+        def escribir(filas):
+            for fila in filas:
+                fh.write(json.dumps(fila) + "\n")
+            fh.flush()
+            return len(filas)
+
+        if procesos == 1:
+            _iniciar(juego, df)
+            for t in tareas:
+                escritas += escribir(_tarea(t))
+        else:
+            from concurrent.futures import ProcessPoolExecutor, as_completed
+            with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar,
+                                     initargs=(juego, df)) as pool:
+                for futuro in as_completed([pool.submit(_tarea, t) for t in tareas]):
+                    escritas += escribir(futuro.result())
+    return escritas
+
+
+def resumen(salida):
+    """
+    Una fila por configuración: pasos, boletos, aciertos medios contra lo
+    esperado al azar, distribución de aciertos (A0, A1, ...), premios,
+    costo y ROI = (premios - costo) / costo. Incluye los parámetros.
+    """
+    filas = []
+    with open(salida, encoding='utf-8') as fh:
+        for linea in fh:
+            try:
+                filas.append(json.loads(linea))
+            except ValueError:
+                continue
+    if not filas:
+        return pd.DataFrame()
+    try:
+        with open(salida + ".configs.json", encoding='utf-8') as fh:
+            configs = json.load(fh)
+    except (OSError, ValueError):
+        configs = {}
+
+    out = []
+    for cid, grupo in pd.DataFrame(filas).groupby('config', sort=False):
+        dist = np.sum(np.array(grupo['aciertos'].tolist()), axis=0)
+        boletos = int(grupo['boletos'].sum())
+        premio, costo = int(grupo['premio'].sum()), int(grupo['costo'].sum())
+        niveles = len(dist)
+        fila = {'config': cid, 'pasos': len(grupo), 'boletos': boletos,
+                'media_aciertos': round(float(dist @ np.arange(niveles)) / max(boletos, 1), 4),
+                'esperado_azar': ESPERADO_AZAR['loto' if niveles == 7 else 'kino'],
+                **{f"A{a}": int(dist[a]) for a in range(niveles)},
+                'premios': premio, 'costo': costo,
+                'roi': round((premio - costo) / costo, 4) if costo else None}
+        for k, v in configs.get(cid, {}).items():  # 'premios' de la config no pisa el total
+            fila.setdefault(k, json.dumps(v) if isinstance(v, (list, dict)) else v)
+        out.append(fila)
+    return pd.DataFrame(out).sort_values('media_aciertos', ascending=False).reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    import sys
+    import modulos.scraper as scraper
+    salida = sys.argv[1] if len(sys.argv) > 1 else os.path.join('data', 'backtest', 'loto.jsonl')
+    configs = [CONFIG_LOTO, dict(CONFIG_LOTO, generador='azar')]
+    print(f"{correr('loto', scraper.cargar_datos(), configs, salida)} pasos nuevos -> {salida}")
+    print(resumen(salida).to_string())
@@ -0,0 +1,119 @@
+"""
+Caché en disco de ruedas (covering designs) ya calculadas.
+Una rueda de 12 números "3 si salen 4" tiene la misma forma sean cuales
+sean los números: se guarda en forma abstracta (índices 0..n-1 del grupo
+ordenado) y se re-etiqueta con los números del usuario al leerla.
+
+Claves en data/ruedas.json:
+  "n-g-k"      mejor rueda COMPLETA conocida (sirve para cualquier tope >= su tamaño)
+  "n-g-k-max"  mejor rueda parcial con ese tope de boletos (la que más cubre)
+Boletos de otro tamaño que 6 (Kino: 10) llevan el prefijo "t10/".
+
+Sembrar con tablas conocidas (cada diseño se verifica antes de aceptarlo):
+    python -m modulos.cache_ruedas semillas.json
+"""
+import os
+import sys
+import json
+from math import comb as binom
+
+RUTA = os.path.join(os.path.dirname(__file__), '..', 'data', 'ruedas.json')
+
+_disenos = None
+
+
+def _clave(n, garantia, aciertos_objetivo, max_boletos=None, tam=6):
+    base = f"{n}-{garantia}-{aciertos_objetivo}"
+    if tam != 6:
+        base = f"t{tam}/{base}"
+    return base if max_boletos is None else f"{base}-{max_boletos}"
+
+
+def cargar():
+    global _disenos
+    if _disenos is None:
+        try:
+            with open(RUTA, encoding='utf-8') as fh:
+                _disenos = json.load(fh)
+        except (OSError, ValueError):
+            _disenos = {}
+    return _disenos
+
+
+def guardar(disenos):
+    global _disenos
+    _disenos = disenos
+    try:
+        os.makedirs(os.path.dirname(RUTA), exist_ok=True)
+        tmp = RUTA + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as fh:
+            json.dump(disenos, fh)
+        os.replace(tmp, RUTA)
+    except OSError:
+        pass
+
+
+def buscar(n, garantia, aciertos_objetivo, max_boletos, tam=6):
+    """
+    Mejor diseño guardado que respete el tope: dict con 'boletos' (listas de
+    índices), 'cubiertos' y 'total' objetivos y 'estrategia' que lo produjo
+    (falta en diseños viejos). None si no hay.
+    """
+    disenos = cargar()
+    completa = disenos.get(_clave(n, garantia, aciertos_objetivo, tam=tam))
+    if completa is not None and len(completa['boletos']) <= max_boletos:
+        return completa
+    return disenos.get(_clave(n, garantia, aciertos_objetivo, max_boletos, tam))
+
+
+def registrar(n, garantia, aciertos_objetivo, max_boletos, boletos, cubiertos, tam=6,
+              estrategia=None):
+    """
+    Guarda el diseño si mejora al que había (menos boletos o más cobertura).
+    estrategia: cómo se calculó, para informarlo al leerlo. True si se guardó.
+    """
+    total = binom(n, aciertos_objetivo)
+    entrada = {'boletos': [sorted(int(i) for i in b) for b in boletos],
+               'cubiertos': int(cubiertos), 'total': total, 'estrategia': estrategia}
+    disenos = dict(cargar())
+    if cubiertos == total:
+        clave = _clave(n, garantia, aciertos_objetivo, tam=tam)
+        previa = disenos.get(clave)
+        mejora = previa is None or len(entrada['boletos']) < len(previa['boletos'])
+    else:
+        clave = _clave(n, garantia, aciertos_objetivo, max_boletos, tam)
+        previa = disenos.get(clave)
+        mejora = previa is None or cubiertos > previa['cubiertos']
+    if mejora:
+        disenos[clave] = entrada
+        guardar(disenos)
+    return mejora
+
+
+def sembrar(semillas):
+    """
+    semillas: dict "n-g-k" (o "t10/n-g-k") -> lista de boletos en índices
+    0..n-1, o la ruta a un JSON con ese formato. Solo se aceptan diseños que
+    cubren todo.
+    Devuelve cuántas claves mejoraron.
+    """
+    import modulos.wheeling as wheeling
+    if isinstance(semillas, str):
+        with open(semillas, encoding='utf-8') as fh:
+            semillas = json.load(fh)
+    mejoradas = 0
+    for clave, boletos in semillas.items():
+        tam = int(clave[1:clave.index('/')]) if '/' in clave else 6
+        n, garantia, aciertos_objetivo = (int(x) for x in clave.split('/')[-1].split('-')[:3])
+        if any(len(set(b)) != tam for b in boletos):
+            continue
+        cubiertos = wheeling.cobertura_diseno(boletos, n, garantia, aciertos_objetivo)
+        if cubiertos == binom(n, aciertos_objetivo):
+            mejoradas += registrar(n, garantia, aciertos_objetivo, len(boletos), boletos, cubiertos, tam,
+                                   'semilla')
+    return mejoradas
+
+
+if __name__ == "__main__":
+    for ruta in sys.argv[1:]:
+        print(f"{ruta}: {sembrar(ruta)} diseños nuevos o mejores -> {os.path.abspath(RUTA)}")
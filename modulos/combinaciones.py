@@ -0,0 +1,120 @@
+"""
+Codificación compacta de jugadas como máscaras de bits.
+El número n se guarda en el bit (n - 1): una jugada Loto (1-40) cabe en un
+entero de 40 bits y una de Kino (1-80) en uno de 80 bits. Como enteros de
+Python sirven de clave en un set (pertenencia O(1)); como arrays de NumPy
+ocupan 1 palabra uint64 (Loto) o 2 palabras (Kino) por jugada.
+"""
+from numbers import Integral
+
+import numpy as np
+
+MAX_LOTO = 40
+MAX_KINO = 80
+
+
+def codificar(nums):
+    """Lista/set de números -> entero con un bit por número."""
+    mask = 0
+    for n in nums:
+        mask |= 1 << (int(n) - 1)
+    return mask
+
+
+def decodificar(mask):
+    """Entero -> lista ordenada de números."""
+    nums = []
+    n = 1
+    while mask:
+        if mask & 1:
+            nums.append(n)
+        mask >>= 1
+        n += 1
+    return nums
+
+
+def aciertos(mask_a, mask_b):
+    """Cuántos números comparten dos jugadas codificadas."""
+    return (mask_a & mask_b).bit_count()
+
+
+_POP8 = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def popcount(arr):
+    """Bits encendidos por elemento de un array sin signo (aciertos en lote)."""
+    arr = np.asarray(arr)
+    if arr.dtype.kind != 'u':
+        arr = arr.astype(np.uint64)
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(arr)
+    return _POP8[arr[..., None].view(np.uint8)].sum(axis=-1, dtype=np.uint8)
+
+
+def palabras(maximo):
+    """Palabras uint64 necesarias para números 1..maximo."""
+    return (maximo + 63) // 64
+
+
+def codificar_lote(matriz, maximo=MAX_LOTO):
+    """
+    Matriz (n, k) de números -> array (n, palabras) uint64.
+    Para Loto (maximo=40) devuelve directamente un vector (n,) uint64.
+    """
+    matriz = np.asarray(matriz, dtype=np.int64).reshape(len(matriz), -1)
+    bits = matriz - 1
+    out = np.zeros((len(matriz), palabras(maximo)), dtype=np.uint64)
+    for w in range(out.shape[1]):
+        en_palabra = (bits >= 64 * w) & (bits < 64 * (w + 1))
+        desplaz = np.where(en_palabra, bits - 64 * w, 0).astype(np.uint64)
+        valores = np.where(en_palabra, np.left_shift(np.uint64(1), desplaz), np.uint64(0))
+        out[:, w] = np.bitwise_or.reduce(valores, axis=1)
+    return out[:, 0] if maximo <= 64 else out
+
+
+def a_enteros(lote):
+    """Array de codificar_lote -> lista de enteros de Python (para sets)."""
+    lote = np.asarray(lote, dtype=np.uint64)
+    if lote.ndim == 1:
+        return [int(x) for x in lote]
+    return [sum(int(x) << (64 * w) for w, x in enumerate(fila)) for fila in lote]
+
+
+def conjunto(jugadas):
+    """
+    Set de máscaras a partir de cualquier colección de jugadas: enteros ya
+    codificados (también enteros de NumPy), o listas/sets/tuplas de números.
+    """
+    out = set()
+    for j in jugadas:
+        out.add(int(j) if isinstance(j, Integral) else codificar(j))
+    return out
+
+
+def como_conjunto(jugadas):
+    """
+    Como conjunto, pero si jugadas ya es un set de máscaras lo devuelve tal
+    cual (O(1), sin copiar): solo para consultar pertenencia, no para añadir.
+    """
+    if isinstance(jugadas, (set, frozenset)) and (not jugadas or isinstance(next(iter(jugadas)), Integral)):
+        return jugadas
+    return conjunto(jugadas)
+
+
+def conjunto_df(df, columnas):
+    """Set de máscaras de las filas completas de un DataFrame (bóveda, historial)."""
+    if df is None or df.empty:
+        return set()
+    import pandas as pd
+    nums = df[columnas].apply(pd.to_numeric, errors='coerce').dropna()
+    if nums.empty:
+        return set()
+    return set(a_enteros(codificar_lote(nums.values.astype(int), MAX_KINO)))
+
+
+def registrar(jugadas_previas, nums):
+    """Añade una jugada a la colección del llamador (set de máscaras o lista de sets)."""
+    if isinstance(jugadas_previas, set):
+        jugadas_previas.add(codificar(nums))
+    else:
+        jugadas_previas.append(set(nums))
@@ -1,64 +1,48 @@
-import random
-import math
+import os
+from math import comb as binom
+import numpy as np
 import pandas as pd
 from collections import Counter
+import modulos.combinaciones as comb
+import modulos.historial as historial
+import modulos.atrasados as atrasados
 
 # ============ ANÁLISIS ============
 
 def analizar_frecuencias(df, ventana_dias=None):
-    if df is None or df.empty:
+    """df: DataFrame del historial o HistorialIndex."""
+    idx = historial.indexar(df)
+    if idx.n_moderno == 0:
         return pd.DataFrame(columns=['Bola', 'Apariciones'])
-    df = df.copy()
-    df['Fecha'] = pd.to_datetime(df['Fecha'], errors='coerce')
-    df = df.dropna(subset=['Fecha'])
-    df_moderno = df[df['Fecha'] >= '2024-03-01']
-    if df_moderno.empty:
-        return pd.DataFrame(columns=['Bola', 'Apariciones'])
-    if ventana_dias is not None:
-        df_moderno = df_moderno.sort_values('Fecha', ascending=False).head(ventana_dias)
-    bolas = df_moderno[['Bola_1', 'Bola_2', 'Bola_3', 'Bola_4', 'Bola_5', 'Bola_6']].values.flatten()
-    conteo = Counter(int(b) for b in bolas)
-    for i in range(1, 41):
-        if i not in conteo:
-            conteo[i] = 0
-    df_frec = pd.DataFrame(conteo.items(), columns=['Bola', 'Apariciones'])
-    df_frec['Bola'] = df_frec['Bola'].astype(int)
-    return df_frec.sort_values(by='Bola').reset_index(drop=True)
-
-
-def analizar_atrasados(df):
-    if df is None or df.empty:
+    filas = idx.n_moderno if ventana_dias is None else min(ventana_dias, idx.n_moderno)
+    conteo = idx.incidencia[:filas].sum(axis=0)
+    return pd.DataFrame({'Bola': np.arange(1, 41), 'Apariciones': conteo.astype(int)})
+
+
+def analizar_atrasados(df, juego=None):
+    """
+    df: DataFrame del historial o HistorialIndex.
+    Por defecto se calcula en memoria sin tocar disco. juego='loto' usa el
+    estado persistente de atrasados (data/atrasados_loto.json): solo para el
+    historial completo (la página y la sync), nunca para recortes del historial.
+    """
+    idx = historial.indexar(df)
+    if idx.vacio:
         return pd.DataFrame(columns=['Bola', 'Sorteos_Sin_Salir'])
-    df = df.copy()
-    df['Fecha'] = pd.to_datetime(df['Fecha'], errors='coerce')
-    df = df.dropna(subset=['Fecha']).sort_values('Fecha', ascending=False)
-    sin_salir = {i: 0 for i in range(1, 41)}
-    visto = set()
-    for _, fila in df.iterrows():
-        bolas = {int(fila[c]) for c in ['Bola_1', 'Bola_2', 'Bola_3', 'Bola_4', 'Bola_5', 'Bola_6']}
-        for n in range(1, 41):
-            if n not in visto:
-                if n in bolas:
-                    visto.add(n)
-                else:
-                    sin_salir[n] += 1
-        if len(visto) == 40:
-            break
-    df_atr = pd.DataFrame(sin_salir.items(), columns=['Bola', 'Sorteos_Sin_Salir'])
-    return df_atr.sort_values(by='Sorteos_Sin_Salir', ascending=False).reset_index(drop=True)
+    if juego:
+        estado = atrasados.sincronizar(juego, idx.fechas, idx.sorteos)
+    else:
+        estado = atrasados.reconstruir(idx.fechas, idx.sorteos, 40)
+    return atrasados.ranking(estado, 'Bola')
 
 
 def estadisticas_suma(df):
-    if df is None or df.empty:
+    """df: DataFrame del historial o HistorialIndex."""
+    idx = historial.indexar(df)
+    if idx.n_moderno == 0:
         return {'media': 123, 'std': 25, 'min': 60, 'max': 180}
-    df = df.copy()
-    df['Fecha'] = pd.to_datetime(df['Fecha'], errors='coerce')
-    df = df.dropna(subset=['Fecha'])
-    df = df[df['Fecha'] >= '2024-03-01']
-    if df.empty:
-        return {'media': 123, 'std': 25, 'min': 60, 'max': 180}
-    sumas = df[['Bola_1', 'Bola_2', 'Bola_3', 'Bola_4', 'Bola_5', 'Bola_6']].sum(axis=1)
-    std = round(float(sumas.std()), 1)
+    sumas = idx.sorteos[idx.moderno].sum(axis=1, dtype=np.int64)
+    std = round(float(sumas.std(ddof=1)), 1) if len(sumas) > 1 else 0.0
     return {
         'media': round(float(sumas.mean()), 1),
         'std': std if std > 0 else 1.0,
@@ -101,12 +85,25 @@ def calcular_score(bolas, calientes, atrasados, stats):
 
 # ============ EVALUACIÓN ============
 
+BOLAS_COLS = ['Bola_1', 'Bola_2', 'Bola_3', 'Bola_4', 'Bola_5', 'Bola_6']
+COLUMNAS_JUGADA = BOLAS_COLS + ['Loto_Mas', 'Super_Mas', 'Suma', 'Score']
+MODOS = ['calientes', 'mixta', 'atrasados', 'libre']
+TAM_LOTE = 50000   # tope de candidatos por lote
+LOTE_MIN = 1000    # el lote se ajusta a lo que falta según la tasa de aprobación vista
+MAX_INTENTOS = 250000
+
 def evaluar_combinacion(combinacion, rango_suma, descartar_pares, descartar_terminaciones,
                        descartar_consecutivos, historial_sets, jugadas_previas_sets,
                        spread_decenas=True):
-    if set(combinacion) in historial_sets:
+    """
+    historial_sets y jugadas_previas_sets: sets de máscaras (consulta O(1);
+    conviene normalizarlos una vez con combinaciones.conjunto antes de
+    evaluar muchas) o colecciones de jugadas (lista de sets, como antes).
+    """
+    mask = comb.codificar(combinacion)
+    if mask in comb.como_conjunto(historial_sets):
         return False
-    if set(combinacion) in jugadas_previas_sets:
+    if mask in comb.como_conjunto(jugadas_previas_sets):
         return False
     suma = sum(combinacion)
     if not (rango_suma[0] <= suma <= rango_suma[1]):
@@ -140,83 +137,384 @@ def evaluar_combinacion(combinacion, rango_suma, descartar_pares, descartar_term
     return True
 
 
+# ============ EVALUACIÓN VECTORIZADA ============
+
+def _max_repetidos(valores):
+    """Por fila, cuántas veces se repite el valor más común (matriz n x 6)."""
+    return (valores[:, :, None] == valores[:, None, :]).sum(axis=2).max(axis=1)
+
+
+def _max_consecutivos(ordenadas):
+    """Por fila, la racha más larga de números consecutivos (filas ya ordenadas)."""
+    seguidos = np.diff(ordenadas, axis=1) == 1
+    racha = np.ones(len(ordenadas), dtype=np.int8)
+    maximo = racha.copy()
+    for j in range(seguidos.shape[1]):
+        racha = np.where(seguidos[:, j], racha + 1, 1)
+        maximo = np.maximum(maximo, racha)
+    return maximo
+
+
+def rasgos_lote(bolas):
+    """
+    Rasgos de forma de cada jugada (matriz n x 6, filas ordenadas): los mismos
+    que miran los filtros. Son los campos de la tabla de tabla_loto.
+    """
+    bolas = np.asarray(bolas)
+    decenas = (bolas.astype(np.int64) - 1) // 10
+    return {
+        'suma': bolas.sum(axis=1, dtype=np.int64),
+        'pares': (bolas % 2 == 0).sum(axis=1),
+        'bajos': (bolas <= 20).sum(axis=1),
+        'terminaciones': _max_repetidos(bolas % 10),
+        'consecutivos': _max_consecutivos(bolas),
+        'decenas': np.stack([(decenas == d).sum(axis=1) for d in range(4)], axis=1),
+    }
+
+
+def mascara_filtros(rasgos, rango_suma, descartar_pares, descartar_terminaciones,
+                    descartar_consecutivos, spread_decenas=True):
+    """Máscara booleana de las jugadas que pasan los filtros, a partir de sus rasgos."""
+    suma = rasgos['suma']
+    ok = (suma >= rango_suma[0]) & (suma <= rango_suma[1])
+    if descartar_pares:
+        ok &= (rasgos['pares'] != 0) & (rasgos['pares'] != 6)
+    if descartar_terminaciones:
+        ok &= rasgos['terminaciones'] < 4
+    if descartar_consecutivos:
+        ok &= rasgos['consecutivos'] < 4
+    ok &= (rasgos['bajos'] != 0) & (rasgos['bajos'] != 6)
+    if spread_decenas:
+        ok &= rasgos['decenas'].max(axis=1) < 4
+    return ok
+
+
+def evaluar_lote(bolas, rango_suma, descartar_pares, descartar_terminaciones,
+                 descartar_consecutivos, spread_decenas=True):
+    """
+    Versión vectorizada de los filtros de forma de evaluar_combinacion.
+    bolas: matriz (n, 6) con cada fila ordenada. Devuelve máscara booleana (n,).
+    El anti-clones se aplica aparte (ver generar_predicciones).
+    """
+    return mascara_filtros(rasgos_lote(bolas), rango_suma, descartar_pares,
+                           descartar_terminaciones, descartar_consecutivos, spread_decenas)
+
+
 # ============ GENERADOR ============
 
-def generar_predicciones(df_historial, cantidad, rango_suma, descartar_pares,
-                         descartar_terminaciones, descartar_consecutivos,
-                         filtro_historico, jugadas_previas_sets,
-                         usar_gauss=True, spread_decenas=True):
-    jugadas_aprobadas = []
-    intentos = 0
-    historial_sets = []
+def _tomar(rng, elegidos, pool, k, excluir=True):
+    """
+    Marca en 'elegidos' (n x 41) k números al azar de 'pool'. Con excluir, solo
+    entre los que aún no estén en la fila; sin excluir el sorteo es
+    independiente de la fila (como random.sample) y un choque deja uno menos.
+    """
+    pool = np.asarray(pool, dtype=np.int64)
+    claves = rng.random((len(elegidos), len(pool)))
+    if excluir:
+        claves[elegidos[:, pool]] = 2.0  # los ya elegidos van al final
+    idx = np.argpartition(claves, k - 1, axis=1)[:, :k] if k < len(pool) else np.argsort(claves, axis=1)
+    filas = np.repeat(np.arange(len(elegidos)), idx.shape[1])
+    elegidos[filas, pool[idx].ravel()] = True
+
+
+def _rellenar(rng, elegidos):
+    """Completa cada fila hasta 6 con números al azar que no estén en ella."""
+    cuenta = elegidos.sum(axis=1)
+    for c in np.unique(cuenta):
+        if c < 6:
+            filas = np.flatnonzero(cuenta == c)
+            sub = elegidos[filas]
+            _tomar(rng, sub, np.arange(1, 41), 6 - int(c))
+            elegidos[filas] = sub
+
 
-    if filtro_historico and not df_historial.empty:
-        bolas_hist = df_historial[['Bola_1', 'Bola_2', 'Bola_3', 'Bola_4', 'Bola_5', 'Bola_6']].values
-        historial_sets = [set(int(x) for x in fila) for fila in bolas_hist]
+def _pools(calientes, atrasados):
+    """Pools de cada receta; los usan igual el muestreo por lotes y los pesos del exacto."""
+    todos = range(1, 41)
+    pools = {
+        'no_calientes': [x for x in todos if x not in calientes],
+        'no_atrasados': [x for x in todos if x not in atrasados],
+        'cal_pool': [x for x in calientes if x not in atrasados[:5]],
+        'atr_pool': list(atrasados[:10]),
+    }
+    pools['calientes'] = len(calientes) >= 5 and len(pools['no_calientes']) >= 1
+    pools['atrasados'] = len(atrasados) >= 3 and len(pools['no_atrasados']) >= 3
+    pools['mixta'] = len(pools['cal_pool']) >= 3 and len(pools['atr_pool']) >= 2
+    return pools
+
+
+def _muestrear_lote(rng, n, modo, calientes, atrasados):
+    """
+    Genera n candidatos de 6 números (ordenados) con la receta de cada modo:
+      calientes: 5 calientes + 1 que no sea caliente
+      atrasados: 3 atrasados + 3 que no sean atrasados
+      mixta:     3 de cal_pool + 2 de atr_pool (sorteos independientes) + relleno
+      libre:     6 cualesquiera
+    Si el modo no se puede armar con las listas dadas, sale como libre.
+    """
+    elegidos = np.zeros((n, 41), dtype=bool)
+    todos = np.arange(1, 41)
+    pools = _pools(calientes, atrasados)
+    if modo == 'calientes' and pools['calientes']:
+        _tomar(rng, elegidos, calientes, 5)
+        _tomar(rng, elegidos, pools['no_calientes'], 1)
+    elif modo == 'atrasados' and pools['atrasados']:
+        _tomar(rng, elegidos, atrasados, 3)
+        _tomar(rng, elegidos, pools['no_atrasados'], 3)
+    elif modo == 'mixta' and pools['mixta']:
+        _tomar(rng, elegidos, pools['cal_pool'], 3)
+        _tomar(rng, elegidos, pools['atr_pool'], 2, excluir=False)
+    _rellenar(rng, elegidos)
+    return np.sort(np.where(elegidos[:, 1:], todos, 99), axis=1)[:, :6]
 
+
+def _contexto(df_historial, juego=None):
+    """
+    Calientes (top 18 en 30 sorteos), atrasados (top 15) y stats de suma del historial.
+    juego: ver analizar_atrasados (None = en memoria).
+    """
     calientes = list(range(1, 41))
     atrasados = list(range(1, 41))
     stats = estadisticas_suma(df_historial)
-    mu, sigma = stats['media'], stats['std']
-
-    if not df_historial.empty:
+    if not historial.indexar(df_historial).vacio:
         df_frec = analizar_frecuencias(df_historial, ventana_dias=30)
         if not df_frec.empty:
             calientes = df_frec.sort_values(by='Apariciones', ascending=False)['Bola'].head(18).astype(int).tolist()
-        df_atr = analizar_atrasados(df_historial)
+        df_atr = analizar_atrasados(df_historial, juego)
         if not df_atr.empty:
             atrasados = df_atr['Bola'].head(15).astype(int).tolist()
+    return calientes, atrasados, stats
 
-    todos = list(range(1, 41))
-
-    while len(jugadas_aprobadas) < cantidad and intentos < 250000:
-        intentos += 1
-        modo = random.choice(['calientes', 'mixta', 'atrasados', 'libre'])
-        try:
-            if modo == 'calientes':
-                otros = [x for x in todos if x not in calientes]
-                seleccion = random.sample(calientes, min(5, len(calientes))) + random.sample(otros, 1)
-            elif modo == 'atrasados':
-                otros = [x for x in todos if x not in atrasados]
-                seleccion = random.sample(atrasados, min(3, len(atrasados))) + random.sample(otros, 3)
-            elif modo == 'mixta':
-                cal_pool = [x for x in calientes if x not in atrasados[:5]]
-                atr_pool = atrasados[:10]
-                if len(cal_pool) >= 3 and len(atr_pool) >= 2:
-                    base = random.sample(cal_pool, 3) + random.sample(atr_pool, 2)
-                    resto = [x for x in todos if x not in base]
-                    seleccion = base + random.sample(resto, 1)
-                else:
-                    seleccion = random.sample(todos, 6)
-            else:
-                seleccion = random.sample(todos, 6)
-        except ValueError:
-            seleccion = random.sample(todos, 6)
-
-        seleccion = list(set(seleccion))
-        while len(seleccion) < 6:
-            extra = random.randint(1, 40)
-            if extra not in seleccion:
-                seleccion.append(extra)
-        seleccion = seleccion[:6]
-        bolas = sorted(seleccion)
-
-        if not evaluar_combinacion(bolas, rango_suma, descartar_pares, descartar_terminaciones,
-                                   descartar_consecutivos, historial_sets, jugadas_previas_sets,
-                                   spread_decenas):
+
+def _formas_mixta():
+    """
+    F[c, m, b]: suma, sobre los pares (3 de cal_pool, 2 de atr_pool) dentro de
+    una jugada con c números de cal_pool, m de atr_pool y b de ambos, de la
+    probabilidad del relleno. Si los dos sorteos comparten j números, la
+    unión tiene 5 - j y el relleno elige 1 + j de los 35 + j restantes.
+    """
+    def c_(n, k):
+        return binom(n, k) if 0 <= k <= n else 0
+
+    formas = np.zeros((7, 7, 7))
+    for c, m, b in np.ndindex(7, 7, 7):
+        if b > min(c, m):
             continue
+        for t in range(3):  # cuántos de los 2 atrasados caen también en cal_pool
+            pares_atr = c_(b, t) * c_(m - b, 2 - t)
+            for j in range(t + 1):  # cuántos de esos t repite el sorteo de calientes
+                formas[c, m, b] += pares_atr * c_(t, j) * c_(c - t, 3 - j) / binom(35 + j, 1 + j)
+    return formas
 
-        if usar_gauss and sigma > 0:
-            factor = math.exp(-((sum(bolas) - mu) ** 2) / (2 * (sigma ** 2)))
-            if random.random() > factor:
-                continue
 
-        loto_mas = random.randint(1, 12)
-        super_mas = random.randint(1, 15)
+_FORMAS_MIXTA = _formas_mixta()
+
+
+def _pesos_por_modo(masks, calientes, atrasados):
+    """Probabilidad exacta de cada jugada bajo la receta de cada modo de _muestrear_lote."""
+    libre = np.full(len(masks), 1.0 / binom(40, 6))
+    pools = _pools(calientes, atrasados)
+
+    def cuenta(nums):
+        return comb.popcount(masks & np.uint64(comb.codificar(nums))).astype(np.int64)
+
+    pesos = {'libre': libre}
+    if pools['calientes']:
+        pesos['calientes'] = (cuenta(calientes) == 5) / (binom(len(calientes), 5) * len(pools['no_calientes']))
+    if pools['atrasados']:
+        pesos['atrasados'] = (cuenta(atrasados) == 3) / (binom(len(atrasados), 3) * binom(len(pools['no_atrasados']), 3))
+    if pools['mixta']:
+        cal_pool, atr_pool = pools['cal_pool'], pools['atr_pool']
+        c, m = cuenta(cal_pool), cuenta(atr_pool)
+        b = cuenta(set(cal_pool) & set(atr_pool))
+        pesos['mixta'] = _FORMAS_MIXTA[c, m, b] / (binom(len(cal_pool), 3) * binom(len(atr_pool), 2))
+    return {modo: pesos.get(modo, libre) for modo in MODOS}
+
+
+def _pesos_modos(masks, calientes, atrasados):
+    """Probabilidad de que la mezcla de modos (1/4 cada uno) produzca cada jugada."""
+    return sum(_pesos_por_modo(masks, calientes, atrasados).values()) / len(MODOS)
+
+
+def muestrear_exacto(cantidad, rango_suma, descartar_pares, descartar_terminaciones,
+                     descartar_consecutivos, excluir, calientes, atrasados, stats,
+                     usar_gauss=True, spread_decenas=True, rng=None):
+    """
+    Muestreo sin rechazo sobre la tabla de todas las combinaciones: calcula el
+    conjunto exacto que pasa filtros y anti-clones (excluir: set de máscaras) y
+    sortea 'cantidad' distintas, con peso = mezcla de modos x factor de Gauss.
+    Devuelve matriz (k, 6) con k <= cantidad (menos solo si no hay tantas válidas).
+    """
+    import modulos.tabla_loto as tabla_loto
+    rng = rng if rng is not None else np.random.default_rng()
+    tabla = tabla_loto.abrir_tabla()
+    ok = tabla_loto.filtrar(tabla, rango_suma, descartar_pares, descartar_terminaciones,
+                            descartar_consecutivos, spread_decenas)
+    if excluir:
+        ok[tabla_loto.indice(tabla_loto.bolas_de(excluir))] = False
+    idx = np.flatnonzero(ok)
+    if len(idx) == 0 or cantidad <= 0:
+        return np.empty((0, 6), dtype=np.int64)
+
+    pesos = _pesos_modos(tabla['mask'][idx], calientes, atrasados)
+    if usar_gauss and stats['std'] > 0:
+        suma = tabla['suma'][idx].astype(np.float64)
+        pesos *= np.exp(-((suma - stats['media']) ** 2) / (2 * (stats['std'] ** 2)))
+
+    # Efraimidis-Spirakis: las k claves más altas son una muestra ponderada sin reemplazo
+    with np.errstate(divide='ignore'):
+        claves = np.log(rng.random(len(idx))) / pesos
+    k = min(cantidad, len(idx))
+    top = np.argpartition(-claves, k - 1)[:k]
+    top = top[np.argsort(-claves[top])]
+    return tabla['bolas'][idx[top]].astype(np.int64)
+
+
+def generar_predicciones(df_historial, cantidad, rango_suma, descartar_pares,
+                         descartar_terminaciones, descartar_consecutivos,
+                         filtro_historico, jugadas_previas_sets,
+                         usar_gauss=True, spread_decenas=True, exacto=False, semilla=None,
+                         juego=None, contexto=None):
+    """
+    df_historial: DataFrame del historial o HistorialIndex (se indexa una vez).
+    Genera jugadas por lotes de candidatos en NumPy (del tamaño que hace falta
+    para lo que queda, según la tasa de aprobación; tope TAM_LOTE): cada fila toma un
+    modo al azar (calientes/mixta/atrasados/libre), se filtra con máscaras y la
+    campana de Gauss se aplica como aceptación vectorizada.
+    Si los lotes no alcanzan (filtros muy estrictos) o exacto=True, el resto
+    sale de muestrear_exacto: si existen combinaciones válidas, se devuelven.
+    jugadas_previas_sets: set de máscaras (o lista de sets); se le añaden las nuevas.
+    semilla: entero o SeedSequence para resultados reproducibles.
+    juego: 'loto' usa el estado persistente de atrasados (historial completo);
+    None (por defecto) los calcula en memoria.
+    contexto: (calientes, atrasados, stats) ya calculados (ver _contexto); si
+    viene, juego no se usa.
+    """
+    df_historial = historial.indexar(df_historial)
+    historial_sets = set()
+
+    if filtro_historico and not df_historial.vacio:
+        historial_sets = set(comb.a_enteros(df_historial.mascaras))
+
+    calientes, atrasados, stats = contexto if contexto is not None else _contexto(df_historial, juego)
+    mu, sigma = stats['media'], stats['std']
+
+    rng = np.random.default_rng(semilla)
+    usadas = historial_sets | comb.conjunto(jugadas_previas_sets)
+    jugadas_aprobadas = []
+    intentos = 0
+    tasa = 0.1  # aprobados por candidato; se corrige con cada lote
+
+    def aprobar(fila, mask):
+        usadas.add(mask)
+        bolas = [int(x) for x in fila]
+        loto_mas = int(rng.integers(1, 13))
+        super_mas = int(rng.integers(1, 16))
         score = calcular_score(bolas, calientes, atrasados, stats)
         jugadas_aprobadas.append(bolas + [loto_mas, super_mas, sum(bolas), score])
-        jugadas_previas_sets.append(set(bolas))
+        comb.registrar(jugadas_previas_sets, bolas)
+
+    while not exacto and len(jugadas_aprobadas) < cantidad and intentos < MAX_INTENTOS:
+        faltan = cantidad - len(jugadas_aprobadas)
+        n = min(TAM_LOTE, MAX_INTENTOS - intentos, max(LOTE_MIN, int(1.25 * faltan / tasa)))
+        intentos += n
+        modos = rng.integers(len(MODOS), size=n)
+        lote = np.empty((n, 6), dtype=np.int64)
+        for m, modo in enumerate(MODOS):
+            filas = np.flatnonzero(modos == m)
+            if len(filas):
+                lote[filas] = _muestrear_lote(rng, len(filas), modo, calientes, atrasados)
+
+        codigos = comb.codificar_lote(lote)
+        ok = evaluar_lote(lote, rango_suma, descartar_pares, descartar_terminaciones,
+                          descartar_consecutivos, spread_decenas)
+        if usar_gauss and sigma > 0:
+            factor = np.exp(-((lote.sum(axis=1) - mu) ** 2) / (2 * (sigma ** 2)))
+            ok &= rng.random(n) <= factor
+        if not ok.any():
+            break  # filtros demasiado estrictos para el rechazo: pasamos al exacto
+        tasa = max(ok.mean(), 1 / TAM_LOTE)
+
+        for fila, mask in zip(lote[ok], codigos[ok]):
+            mask = int(mask)
+            if mask in usadas:  # ganadora histórica, ya jugada o repetida en el lote
+                continue
+            aprobar(fila, mask)
+            if len(jugadas_aprobadas) >= cantidad:
+                break
+
+    faltan = cantidad - len(jugadas_aprobadas)
+    if faltan > 0:
+        extra = muestrear_exacto(faltan, rango_suma, descartar_pares, descartar_terminaciones,
+                                 descartar_consecutivos, usadas, calientes, atrasados, stats,
+                                 usar_gauss, spread_decenas, rng)
+        for fila in extra:
+            aprobar(fila, comb.codificar(fila))
+
+    return pd.DataFrame(jugadas_aprobadas, columns=COLUMNAS_JUGADA)
+
+
+# ============ GENERADOR PARALELO ============
+
+MIN_POR_PROCESO = 1000  # con menos, abrir el pool y unir bloques (~0.05-0.1 s) cuesta más de lo que ahorra
+
+
+def _trabajador(args):
+    df_historial, cantidad, filtros_args, previas, kwargs = args
+    return generar_predicciones(df_historial, cantidad, *filtros_args, previas, **kwargs)
+
+
+def generar_predicciones_paralelo(df_historial, cantidad, rango_suma, descartar_pares,
+                                  descartar_terminaciones, descartar_consecutivos,
+                                  filtro_historico, jugadas_previas_sets,
+                                  usar_gauss=True, spread_decenas=True, exacto=False,
+                                  semilla=None, procesos=None, juego=None):
+    """
+    Igual que generar_predicciones pero repartiendo la cantidad en un pool de
+    procesos, cada uno con su semilla hija (SeedSequence.spawn): misma semilla,
+    mismo resultado. Los bloques se unen en orden de proceso; las repetidas
+    entre procesos se descartan y se reponen al final sin salir del anti-clones.
+    Con pocas jugadas o un solo núcleo cae al generador normal.
+    El proceso padre calcula calientes/atrasados (juego: ver generar_predicciones)
+    y se asegura de que la tabla de combinaciones exista antes de abrir el pool:
+    los trabajadores reciben el contexto en memoria y solo leen la tabla.
+    """
+    procesos = procesos or os.cpu_count() or 1
+    procesos = max(1, min(procesos, cantidad // MIN_POR_PROCESO))
+    kwargs = dict(usar_gauss=usar_gauss, spread_decenas=spread_decenas, exacto=exacto)
+    filtros_args = (rango_suma, descartar_pares, descartar_terminaciones,
+                    descartar_consecutivos, filtro_historico)
+    if procesos == 1:
+        return generar_predicciones(df_historial, cantidad, *filtros_args, jugadas_previas_sets,
+                                    semilla=semilla, juego=juego, **kwargs)
+
+    from concurrent.futures import ProcessPoolExecutor
+    import modulos.tabla_loto as tabla_loto
+    tabla_loto.abrir_tabla()  # si falta se construye aquí, una vez, y no en cada trabajador
+    df_historial = historial.indexar(df_historial)
+    kwargs['contexto'] = _contexto(df_historial, juego)
+    previas = comb.conjunto(jugadas_previas_sets)
+    semillas = np.random.SeedSequence(semilla).spawn(procesos + 1)
+    partes = [cantidad // procesos + (1 if i < cantidad % procesos else 0) for i in range(procesos)]
+    tareas = [(df_historial, partes[i], filtros_args, set(previas), dict(kwargs, semilla=semillas[i]))
+              for i in range(procesos)]
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        bloques = list(pool.map(_trabajador, tareas))
+
+    df = pd.concat(bloques, ignore_index=True)
+    masks = comb.a_enteros(comb.codificar_lote(df[BOLAS_COLS].values)) if not df.empty else []
+    df = df[~pd.Series(masks, dtype=object).duplicated().values].reset_index(drop=True)
+    previas.update(masks)
+
+    faltan = cantidad - len(df)
+    if faltan > 0:
+        extra = generar_predicciones(df_historial, faltan, *filtros_args, previas,
+                                     semilla=semillas[-1], **kwargs)
+        df = pd.concat([df, extra], ignore_index=True)
 
-    columnas = ['Bola_1', 'Bola_2', 'Bola_3', 'Bola_4', 'Bola_5', 'Bola_6',
-                'Loto_Mas', 'Super_Mas', 'Suma', 'Score']
-    return pd.DataFrame(jugadas_aprobadas, columns=columnas)
\ No newline at end of file
+    if isinstance(jugadas_previas_sets, set):
+        jugadas_previas_sets.update(comb.a_enteros(comb.codificar_lote(df[BOLAS_COLS].values)))
+    else:
+        for fila in df[BOLAS_COLS].values:
+            comb.registrar(jugadas_previas_sets, [int(x) for x in fila])
+    return df
@@ -5,10 +5,14 @@ import re
 import gspread
 from google.oauth2.service_account import Credentials
 
+import modulos.hojas as hojas
+
 SCOPES = [
     "https://www.googleapis.com/auth/spreadsheets",
     "https://www.googleapis.com/auth/drive",
 ]
+# Hoja con una fila [título, versión] por hoja; cada escritura de la app cambia su versión (ver hojas.marcar)
+HOJA_VERSIONES = "_versiones"
 
 
 def _extraer_sheet_id(url):
@@ -29,6 +33,18 @@ def _cliente():
     return gspread.authorize(creds)
 
 
+@st.cache_resource(ttl=300)
+def _hoja(sheet_id, nombre):
+    """Worksheet ya abierto: open_by_key y la metadata se piden una vez, no en cada rerun."""
+    sh = _cliente().open_by_key(sheet_id)
+    if nombre is None:
+        return sh.sheet1
+    try:
+        return sh.worksheet(nombre)
+    except gspread.exceptions.WorksheetNotFound:
+        return sh.add_worksheet(title=nombre, rows=2000, cols=25)
+
+
 def conectar_worksheet(nombre=None):
     """nombre=None -> primera hoja (Loto). Devuelve (ws, error)."""
     try:
@@ -36,15 +52,7 @@ def conectar_worksheet(nombre=None):
             return None, "Falta GSHEET_URL en Secrets"
         if "GCP_JSON" not in st.secrets:
             return None, "Falta GCP_JSON en Secrets"
-        client = _cliente()
-        sh = client.open_by_key(_extraer_sheet_id(st.secrets["GSHEET_URL"]))
-        if nombre is None:
-            return sh.sheet1, None
-        try:
-            return sh.worksheet(nombre), None
-        except gspread.exceptions.WorksheetNotFound:
-            ws = sh.add_worksheet(title=nombre, rows=2000, cols=25)
-            return ws, None
+        return _hoja(_extraer_sheet_id(st.secrets["GSHEET_URL"]), nombre), None
     except json.JSONDecodeError as e:
         return None, f"JSON mal formado en Secrets: {e}"
     except gspread.exceptions.APIError as e:
@@ -53,26 +61,42 @@ def conectar_worksheet(nombre=None):
         return None, f"{type(e).__name__}: {e}"
 
 
+def version_hoja(ws):
+    """Versión actual de la hoja (una lectura chica). None si no se pudo saber."""
+    try:
+        hv, _ = conectar_worksheet(HOJA_VERSIONES)
+        return None if hv is None else hojas.version(hv, ws.title)
+    except Exception:
+        return None
+
+
+def _subir_version(ws):
+    try:
+        hv, _ = conectar_worksheet(HOJA_VERSIONES)
+        if hv is not None:
+            hojas.marcar(hv, ws.title)
+    except Exception:
+        pass
+
+
 def leer_df(ws, columnas):
+    """La hoja como DataFrame; los reruns salen de la caché local mientras la versión no cambie (ver modulos.hojas)."""
     try:
-        registros = ws.get_all_records()
-        df = pd.DataFrame(registros)
-        if df.empty:
-            return pd.DataFrame(columns=columnas)
-        return df.reindex(columns=columnas)
+        return hojas.leer(ws, columnas, version=lambda: version_hoja(ws))
     except Exception:
         return pd.DataFrame(columns=columnas)
 
 
 def escribir_df(ws, df, columnas):
+    """Deja la hoja igual a df: agrega solo las filas que le faltan (ver modulos.hojas)."""
     try:
-        ws.clear()
-        if df.empty:
-            ws.update([columnas])
-        else:
-            data = [columnas] + df[columnas].astype(object).where(
-                pd.notnull(df[columnas]), "").values.tolist()
-            ws.update(data)
+        filas = [] if df.empty else df[columnas].astype(object).where(
+            pd.notnull(df[columnas]), "").values.tolist()
+        _, modo = hojas.escribir(ws, filas, columnas)
+        if modo != 'nada':
+            _subir_version(ws)
         return True, None
     except Exception as e:
-        return False, f"{type(e).__name__}: {e}"
\ No newline at end of file
+        hojas.olvidar(ws)
+        hojas.invalidar(ws)
+        return False, f"{type(e).__name__}: {e}"
@@ -0,0 +1,100 @@
+"""
+Índice del historial Loto: se construye una vez por versión del historial y
+lo comparten todas las funciones de análisis (fisica_filtros, generadores).
+Guarda fechas ya parseadas, la matriz de sorteos en uint8 y la matriz de
+incidencia sorteo x número, ordenado del sorteo más reciente al más viejo.
+"""
+import numpy as np
+import pandas as pd
+
+import modulos.combinaciones as comb
+
+BOLAS_COLS = ['Bola_1', 'Bola_2', 'Bola_3', 'Bola_4', 'Bola_5', 'Bola_6']
+ERA_MODERNA = np.datetime64('2024-03-01')
+
+_cache = {}
+
+
+class HistorialIndex:
+    """
+    fechas: datetime64[D] (n,), de más reciente a más viejo.
+    sorteos: uint8 (n, 6).
+    incidencia: bool (n, 40), columna j = número j + 1.
+    n_moderno: cuántas filas (las primeras) son de la era moderna (>= 2024-03-01).
+    """
+
+    def __init__(self, df, version=None):
+        self.version = version
+        if df is None or df.empty:
+            self.fechas = np.empty(0, dtype='datetime64[D]')
+            self.sorteos = np.empty((0, 6), dtype=np.uint8)
+        else:
+            fechas = pd.to_datetime(df['Fecha'], errors='coerce')
+            validas = fechas.notna().values
+            fechas = fechas.values[validas].astype('datetime64[D]')
+            bolas = (df.loc[validas, BOLAS_COLS].apply(pd.to_numeric, errors='coerce')
+                     .fillna(0).values.astype(np.int64))
+            orden = np.argsort(-fechas.astype(np.int64), kind='stable')
+            self.fechas = fechas[orden]
+            self.sorteos = bolas[orden].clip(0, 255).astype(np.uint8)
+
+        self.incidencia = np.zeros((len(self.fechas), 41), dtype=bool)
+        self.incidencia[np.arange(len(self.fechas))[:, None], self.sorteos] = True
+        self.incidencia = self.incidencia[:, 1:]
+        self.n_moderno = int((self.fechas >= ERA_MODERNA).sum())
+        self._mascaras = None
+
+    def __len__(self):
+        return len(self.fechas)
+
+    @property
+    def vacio(self):
+        return len(self.fechas) == 0
+
+    @property
+    def moderno(self):
+        """Filas de la era moderna (vista, sin copia)."""
+        return slice(0, self.n_moderno)
+
+    def previos(self, fecha):
+        """Índice con solo los sorteos anteriores a 'fecha' (vistas, sin copia). Para backtests."""
+        dias = -self.fechas.astype(np.int64)  # ascendente
+        inicio = int(np.searchsorted(dias, -np.datetime64(fecha, 'D').astype(np.int64), side='right'))
+        sub = object.__new__(HistorialIndex)
+        sub.version = (self.version, str(fecha))
+        sub.fechas = self.fechas[inicio:]
+        sub.sorteos = self.sorteos[inicio:]
+        sub.incidencia = self.incidencia[inicio:]
+        sub.n_moderno = max(0, self.n_moderno - inicio)
+        sub._mascaras = None if self._mascaras is None else self._mascaras[inicio:]
+        return sub
+
+    @property
+    def mascaras(self):
+        """Cada sorteo como máscara uint64 (ver combinaciones)."""
+        if self._mascaras is None:
+            self._mascaras = comb.codificar_lote(self.sorteos)
+        return self._mascaras
+
+
+def version_df(df):
+    """Huella barata del contenido del historial para invalidar el índice."""
+    if df is None or df.empty:
+        return None
+    cols = [c for c in ['Fecha'] + BOLAS_COLS if c in df.columns]
+    return (len(df), int(pd.util.hash_pandas_object(df[cols], index=False).sum()))
+
+
+def indexar(df):
+    """HistorialIndex del df (o el mismo si ya lo es). Reutiliza el de la última versión vista."""
+    if isinstance(df, HistorialIndex):
+        return df
+    version = version_df(df)
+    if version is None:
+        return HistorialIndex(None)
+    idx = _cache.get(version)
+    if idx is None:
+        idx = HistorialIndex(df, version)
+        _cache.clear()
+        _cache[version] = idx
+    return idx
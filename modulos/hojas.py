@@ -0,0 +1,161 @@
+"""
+Lectura con caché y escritura incremental a Google Sheets. Al guardar se
+mandan solo las filas que faltan (append_rows si van al final, insert_rows
+bajo el encabezado si van al principio); la hoja se reescribe solo si el df
+no es la hoja más filas en un extremo. Las lecturas salen de una copia
+local mientras la versión de la hoja no cambie (ver leer).
+"""
+import time
+import uuid
+import threading
+import pandas as pd
+
+TTL = 30        # segundos en que la copia local se usa sin preguntar
+TTL_MAX = 600   # pasado esto se relee entera (cambios hechos a mano en Sheets)
+
+# Del proceso: las comparten todas las sesiones de Streamlit, por eso la clave es libro + hoja.
+_registros = {}  # clave de hoja -> {'encabezado': [...], 'filas': lista de tuplas, en orden}
+_lecturas = {}   # clave de hoja -> {'df', 'columnas', 'version', 'leida', 'validada'}
+_candado = threading.Lock()
+
+
+def clave_hoja(ws):
+    libro = getattr(ws, 'spreadsheet_id', None) or getattr(getattr(ws, 'spreadsheet', None), 'id', None)
+    return (libro, getattr(ws, 'id', None), getattr(ws, 'title', None))
+
+
+def _celda(v):
+    """Como la muestra Sheets: 5, 5.0 y '5' son la misma celda; NaN/None es vacía."""
+    if v is None or (isinstance(v, float) and v != v):
+        return ""
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return str(v).strip()
+
+
+def _clave_fila(fila, ancho):
+    celdas = [_celda(v) for v in fila][:ancho]
+    return tuple(celdas + [""] * (ancho - len(celdas)))
+
+
+def registrar(ws, encabezado, filas):
+    """Anota que la hoja contiene exactamente estas filas (lo recién leído)."""
+    encabezado = [_celda(c) for c in encabezado]
+    _registros[clave_hoja(ws)] = {
+        'encabezado': encabezado,
+        'filas': [_clave_fila(f, len(encabezado)) for f in filas],
+    }
+
+
+def olvidar(ws):
+    _registros.pop(clave_hoja(ws), None)
+
+
+def _registro(ws):
+    registro = _registros.get(clave_hoja(ws))
+    if registro is None:
+        valores = ws.get_all_values()
+        registrar(ws, valores[0] if valores else [], valores[1:])
+        registro = _registros[clave_hoja(ws)]
+    return registro
+
+
+def escribir(ws, filas, encabezado):
+    """
+    Deja la hoja con encabezado + filas (listas de valores), en ese orden.
+    Devuelve (filas enviadas, modo) con modo 'nada', 'append', 'inicio' o
+    'completa'. Filas repetidas cuentan cada una (dos jugadas iguales son
+    dos filas).
+    """
+    with _candado:
+        return _escribir(ws, filas, encabezado)
+
+
+def _escribir(ws, filas, encabezado):
+    encabezado = list(encabezado)
+    registro = _registro(ws)
+    claves = [_clave_fila(f, len(encabezado)) for f in filas]
+    previas = registro['filas']
+    n_nuevas = len(claves) - len(previas)
+
+    modo = 'completa'
+    if registro['encabezado'] == [_celda(c) for c in encabezado] and n_nuevas >= 0:
+        if n_nuevas == 0 and claves == previas:
+            return 0, 'nada'
+        if claves[:len(previas)] == previas:
+            modo, nuevas = 'append', filas[len(previas):]
+        elif claves[n_nuevas:] == previas:
+            modo, nuevas = 'inicio', filas[:n_nuevas]
+
+    invalidar(ws)
+    if modo == 'completa':
+        ws.clear()
+        ws.update([encabezado] + [list(f) for f in filas])
+        registrar(ws, encabezado, filas)
+        return len(filas), modo
+    nuevas = [list(f) for f in nuevas]
+    if modo == 'append':
+        ws.append_rows(nuevas, value_input_option='RAW', table_range='A1')
+    else:
+        ws.insert_rows(nuevas, row=2, value_input_option='RAW')
+    registro['filas'] = claves
+    return len(nuevas), modo
+
+
+def invalidar(ws):
+    """Descarta la copia local de la hoja: la próxima lectura baja de la red."""
+    _lecturas.pop(clave_hoja(ws), None)
+
+
+def leer(ws, columnas, version=None, ahora=None):
+    """
+    DataFrame de la hoja con esas columnas, desde la caché si sigue vigente.
+    version: función sin argumentos que devuelve la versión actual de la hoja
+    (None si no se sabe); sin ella la copia vale solo TTL segundos.
+    """
+    columnas = list(columnas)
+    ahora = time.time() if ahora is None else ahora
+    clave = clave_hoja(ws)
+    copia = _lecturas.get(clave)
+    if copia is not None and copia['columnas'] == columnas:
+        if ahora - copia['validada'] < TTL:
+            return copia['df'].copy()
+        if ahora - copia['leida'] < TTL_MAX and version is not None:
+            actual = version()
+            if actual is not None and actual == copia['version']:
+                copia['validada'] = ahora
+                return copia['df'].copy()
+
+    v = version() if version is not None else None  # antes de leer: un cambio en medio fuerza otra lectura
+    registros = ws.get_all_records()
+    if registros:
+        registrar(ws, list(registros[0].keys()), [list(r.values()) for r in registros])
+    else:
+        olvidar(ws)
+    df = pd.DataFrame(registros)
+    df = pd.DataFrame(columns=columnas) if df.empty else df.reindex(columns=columnas)
+    _lecturas[clave] = {'df': df, 'columnas': columnas, 'version': v, 'leida': ahora, 'validada': ahora}
+    return df.copy()
+
+
+def version(hv, titulo):
+    """Versión de la hoja 'titulo' según la hoja de versiones hv ("0" si nunca se marcó)."""
+    valores = [f[1] for f in hv.get_all_values() if len(f) >= 2 and f[0] == titulo]
+    return "|".join(valores) or "0"
+
+
+def marcar(hv, titulo):
+    """
+    Cambia la versión de 'titulo' por un uuid (no un contador: dos
+    escrituras a la vez no pueden dejar un valor que un lector ya vio),
+    tocando solo su celda. Si no tiene fila se agrega; si dos la agregaron a
+    la vez quedan dos filas, y version las junta.
+    """
+    valor = uuid.uuid4().hex
+    filas = hv.get_all_values()
+    fila = next((i for i, f in enumerate(filas, 1) if f and f[0] == titulo), None)
+    if fila is None:
+        hv.append_rows([[titulo, valor]], value_input_option='RAW', table_range='A1')
+    else:
+        hv.update_cell(fila, 2, valor)
+    return valor
@@ -1,6 +1,8 @@
 import random
 import pandas as pd
 from collections import Counter
+import modulos.combinaciones as comb
+import modulos.atrasados as atrasados
 
 BOLAS_KINO_COLS = [f"B{i}" for i in range(1, 21)]
 
@@ -21,24 +23,18 @@ def analizar_frecuencias_kino(df, ventana=30):
     return out.sort_values('Numero').reset_index(drop=True)
 
 
-def analizar_atrasados_kino(df):
+def analizar_atrasados_kino(df, juego=None):
+    """
+    Por defecto se calcula en memoria. juego='kino' usa el estado persistente
+    (data/atrasados_kino.json): solo para el historial completo.
+    """
     if df is None or df.empty:
         return pd.DataFrame(columns=['Numero', 'Sorteos_Sin_Salir'])
-    df = df.sort_values('Fecha', ascending=False)
-    sin_salir = {i: 0 for i in range(1, 81)}
-    visto = set()
-    for _, fila in df.iterrows():
-        bolas = {int(fila[c]) for c in BOLAS_KINO_COLS}
-        for n in range(1, 81):
-            if n not in visto:
-                if n in bolas:
-                    visto.add(n)
-                else:
-                    sin_salir[n] += 1
-        if len(visto) == 80:
-            break
-    out = pd.DataFrame(sin_salir.items(), columns=['Numero', 'Sorteos_Sin_Salir'])
-    return out.sort_values('Sorteos_Sin_Salir', ascending=False).reset_index(drop=True)
+    if juego:
+        estado = atrasados.sincronizar(juego, df['Fecha'].values, df[BOLAS_KINO_COLS].values)
+    else:
+        estado = atrasados.reconstruir(df['Fecha'].values, df[BOLAS_KINO_COLS].values, 80)
+    return atrasados.ranking(estado, 'Numero')
 
 
 def evaluar_kino(sel):
@@ -61,48 +57,57 @@ def evaluar_kino(sel):
     return True
 
 
-def generar_kino(df_hist, cantidad, jugadas_previas):
+def generar_kino(df_hist, cantidad, jugadas_previas, juego=None, rng=None):
+    """
+    jugadas_previas: set de máscaras de 80 bits (o lista de sets); se le añaden las nuevas.
+    juego: 'kino' usa el estado persistente de atrasados (historial completo);
+    None (por defecto) los calcula en memoria.
+    rng: random.Random para resultados reproducibles (por defecto el módulo random).
+    """
+    rng = rng if rng is not None else random
     calientes = list(range(1, 81))
     atrasados = list(range(1, 81))
 
     if df_hist is not None and not df_hist.empty:
         f = analizar_frecuencias_kino(df_hist, 30)
         calientes = f.sort_values('Apariciones', ascending=False)['Numero'].head(30).astype(int).tolist()
-        a = analizar_atrasados_kino(df_hist)
+        a = analizar_atrasados_kino(df_hist, juego)
         atrasados = a['Numero'].head(25).astype(int).tolist()
 
     todos = list(range(1, 81))
+    usadas = comb.conjunto(jugadas_previas)
     jugadas = []
     intentos = 0
 
     while len(jugadas) < cantidad and intentos < 150000:
         intentos += 1
-        modo = random.choice(['calientes', 'atrasados', 'mixta', 'libre'])
+        modo = rng.choice(['calientes', 'atrasados', 'mixta', 'libre'])
         try:
             if modo == 'calientes':
                 otros = [x for x in todos if x not in calientes]
-                sel = random.sample(calientes, 7) + random.sample(otros, 3)
+                sel = rng.sample(calientes, 7) + rng.sample(otros, 3)
             elif modo == 'atrasados':
                 otros = [x for x in todos if x not in atrasados]
-                sel = random.sample(atrasados, 5) + random.sample(otros, 5)
+                sel = rng.sample(atrasados, 5) + rng.sample(otros, 5)
             elif modo == 'mixta':
-                base = random.sample(calientes, 5) + random.sample(atrasados, 3)
+                base = rng.sample(calientes, 5) + rng.sample(atrasados, 3)
                 base = list(set(base))
                 resto = [x for x in todos if x not in base]
-                sel = base + random.sample(resto, 10 - len(base))
+                sel = base + rng.sample(resto, 10 - len(base))
             else:
-                sel = random.sample(todos, 10)
+                sel = rng.sample(todos, 10)
         except ValueError:
-            sel = random.sample(todos, 10)
+            sel = rng.sample(todos, 10)
 
         sel = list(set(sel))
         while len(sel) < 10:
-            x = random.randint(1, 80)
+            x = rng.randint(1, 80)
             if x not in sel:
                 sel.append(x)
         sel = sorted(sel[:10])
 
-        if set(sel) in jugadas_previas:
+        mask = comb.codificar(sel)
+        if mask in usadas:
             continue
         if not evaluar_kino(sel):
             continue
@@ -112,7 +117,8 @@ def generar_kino(df_hist, cantidad, jugadas_previas):
         score = min(100, n_cal * 8 + (20 if 2 <= n_atr <= 4 else 5))
 
         jugadas.append(sel + [score])
-        jugadas_previas.append(set(sel))
+        usadas.add(mask)
+        comb.registrar(jugadas_previas, sel)
 
     cols = [f"N{i}" for i in range(1, 11)] + ['Score']
     return pd.DataFrame(jugadas, columns=cols)
@@ -0,0 +1,399 @@
+"""
+Oráculo: cruce de la bóveda de jugadas contra los sorteos oficiales.
+Jugadas y sorteos se codifican como máscaras (ver combinaciones) y la
+matriz jugada x sorteo de aciertos sale de un AND + popcount. Solo cuentan
+los sorteos con Fecha >= Fecha Generada de la jugada.
+
+El radar es incremental: un libro guarda los aciertos ya detectados de cada
+jugada (en Loto también su máximo y bolas acertadas, para resaltar la
+bóveda) y hasta qué fecha de sorteo se revisó (marca). En cada corrida solo
+se cruzan jugadas nuevas y sorteos nuevos. Cada sesión ve su propia bóveda
+(Sheets + jugadas en memoria), así que hay un libro por conjunto de jugadas,
+en data/oraculo_<juego>_<huella>.json: dos sesiones no se pisan el libro.
+Un conjunto nuevo arranca de una copia del último libro usado del juego
+(las jugadas que comparten no se vuelven a cruzar). Se guardan los
+LIBROS_MAX más recientes por juego.
+"""
+import os
+import glob
+import json
+import copy
+import hashlib
+import numpy as np
+import pandas as pd
+
+import modulos.combinaciones as comb
+
+BOLAS_COLS = ['Bola_1', 'Bola_2', 'Bola_3', 'Bola_4', 'Bola_5', 'Bola_6']
+MAX_CELDAS = 4_000_000  # jugadas x sorteos por bloque
+RUTA_DATA = os.path.join(os.path.dirname(__file__), '..', 'data')
+LIBROS_MAX = 8
+VERSION_LIBRO = 2  # libros de otra versión se rehacen
+
+_libros = {}   # (juego, huella) -> libro
+_ultimo = {}   # juego -> huella del último libro usado
+
+
+def a_fechas(serie):
+    """Columna de fechas en cualquier formato -> datetime64[D] (NaT si no se entiende)."""
+    texto = pd.Series(serie).astype(str)
+    fechas = pd.to_datetime(texto, errors='coerce', format='mixed')
+    return fechas.values.astype('datetime64[D]')
+
+
+def codificar_df(df, columnas, maximo=comb.MAX_LOTO):
+    """
+    Filas de números -> (máscaras, válidas). Filas con celdas vacías o no
+    numéricas quedan inválidas (máscara 0). Loto: (n,) uint64; Kino: (n, 2).
+    """
+    nums = df[columnas].apply(pd.to_numeric, errors='coerce')
+    validas = nums.notna().all(axis=1).values
+    mascaras = comb.codificar_lote(nums.fillna(1).values.astype(np.int64), maximo)
+    mascaras[~validas] = 0
+    return mascaras, validas
+
+
+def _aciertos(jugadas, sorteos):
+    """Matriz (jugadas, sorteos) de números en común."""
+    cruce = comb.popcount(jugadas[:, None] & sorteos[None, :])
+    return cruce if cruce.ndim == 2 else cruce.sum(axis=-1, dtype=np.uint8)
+
+
+def cruzar(jugadas, fechas_jugadas, sorteos, fechas_sorteos, minimo=3):
+    """
+    Pares (jugada, sorteo) con >= minimo aciertos y sorteo en o después de
+    la fecha de la jugada. Devuelve (i_jugada, i_sorteo, aciertos) en orden
+    jugada por jugada y, dentro, en el orden de los sorteos.
+    """
+    filas, cols, valores = [], [], []
+    paso = max(1, MAX_CELDAS // max(len(sorteos), 1))
+    for i in range(0, len(jugadas), paso):
+        ac = _aciertos(jugadas[i:i + paso], sorteos)
+        vale = (ac >= minimo) & (fechas_jugadas[i:i + paso, None] <= fechas_sorteos[None, :])
+        f, c = np.nonzero(vale)
+        filas.append(f + i)
+        cols.append(c)
+        valores.append(ac[f, c])
+    if not filas:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.uint8)
+    return np.concatenate(filas), np.concatenate(cols), np.concatenate(valores)
+
+
+def _detectar_loto(df_boveda, df_historial, minimo=3):
+    """(posición de jugada, posición de sorteo, registro) de cada acierto Loto."""
+    jugadas, validas = codificar_df(df_boveda, BOLAS_COLS)
+    fechas_j = a_fechas(df_boveda['Fecha Generada'])
+    validas &= ~np.isnat(fechas_j)
+    sorteos, sorteos_ok = codificar_df(df_historial, BOLAS_COLS)
+    fechas_s = a_fechas(df_historial['Fecha'])
+    sorteos_ok &= ~np.isnat(fechas_s)
+
+    idx_j = np.flatnonzero(validas)
+    idx_s = np.flatnonzero(sorteos_ok)
+    fj, fs, ac = cruzar(jugadas[idx_j], fechas_j[idx_j], sorteos[idx_s], fechas_s[idx_s], minimo)
+
+    socios = df_boveda['Socio'].values if 'Socio' in df_boveda.columns else np.full(len(df_boveda), 'Tommy')
+    fechas_txt = df_historial['Fecha'].values
+    out = []
+    for j, s, a in zip(idx_j[fj], idx_s[fs], ac):
+        out.append((int(j), int(s), {
+            "Fecha Sorteo": fechas_txt[s],
+            "Socio": socios[j],
+            "Aciertos": int(a),
+            "Números": comb.decodificar(int(jugadas[j] & sorteos[s])),
+        }))
+    return out
+
+
+def aciertos_loto(df_boveda, df_historial, minimo=3):
+    """
+    Radar de aciertos Loto: lista de dicts {'Fecha Sorteo', 'Socio',
+    'Aciertos', 'Números'} por cada jugada de la bóveda que pegó 'minimo' o
+    más en un sorteo desde su Fecha Generada.
+    """
+    if df_boveda is None or df_historial is None or df_boveda.empty or df_historial.empty:
+        return []
+    return [r for _, _, r in _detectar_loto(df_boveda, df_historial, minimo)]
+
+
+def _resumir_loto(df_boveda, df_historial):
+    """
+    Por fila y en su orden: (máximo de aciertos en un solo sorteo, máscara
+    de las bolas que salieron en algún sorteo), ambos contando solo sorteos
+    desde su Fecha Generada. Celdas vacías no cuentan. Ver marcas_loto.
+    """
+    n = len(df_boveda)
+    maximo = np.zeros(n, dtype=np.uint8)
+    bolas = np.zeros(n, dtype=np.uint64)
+    if df_historial is None or df_historial.empty or not n:
+        return maximo, bolas
+    nums = df_boveda[BOLAS_COLS].apply(pd.to_numeric, errors='coerce').fillna(0)
+    jugadas = comb.codificar_lote(nums.values.astype(np.int64))  # 0 -> sin bit
+    fechas_j = a_fechas(df_boveda['Fecha Generada'])
+    validas = ~np.isnat(fechas_j)
+
+    sorteos, ok = codificar_df(df_historial, BOLAS_COLS)
+    fechas_s = a_fechas(df_historial['Fecha'])
+    ok &= ~np.isnat(fechas_s)
+    orden = np.argsort(fechas_s[ok])[::-1]  # del más reciente al más viejo
+    sorteos, fechas_s = sorteos[ok][orden], fechas_s[ok][orden]
+    if not len(sorteos):
+        return maximo, bolas
+
+    # OR acumulado: fila i = todas las bolas de los i + 1 sorteos más recientes
+    acumulado = np.bitwise_or.accumulate(sorteos)
+    dias_s = -fechas_s.astype(np.int64)  # ascendente
+    cuantos = np.zeros(n, dtype=np.int64)
+    cuantos[validas] = np.searchsorted(dias_s, -fechas_j[validas].astype(np.int64), side='right')
+    con = cuantos > 0
+    bolas[con] = jugadas[con] & acumulado[cuantos[con] - 1]
+
+    paso = max(1, MAX_CELDAS // len(sorteos))
+    for i in range(0, n, paso):
+        ac = _aciertos(jugadas[i:i + paso], sorteos)
+        ac[np.arange(ac.shape[1])[None, :] >= cuantos[i:i + paso, None]] = 0
+        maximo[i:i + paso] = ac.max(axis=1)
+    return maximo, bolas
+
+
+def incidencia(df, columnas, maximo=comb.MAX_KINO):
+    """
+    Filas de números -> (matriz bool (n, maximo), válidas). Columna j = número
+    j + 1. Filas con celdas vacías o no numéricas quedan inválidas.
+    """
+    nums = df[columnas].apply(pd.to_numeric, errors='coerce')
+    validas = nums.notna().all(axis=1).values
+    valores = nums.fillna(0).values.astype(np.int64)
+    out = np.zeros((len(df), maximo + 1), dtype=bool)
+    out[np.arange(len(df))[:, None], np.clip(valores, 0, maximo)] = True
+    out[~validas] = False
+    return out[:, 1:], validas
+
+
+def _detectar_kino(df_boveda, df_hist):
+    """
+    (posición de jugada, posición de sorteo, registro) de cada jugada Kino
+    con premio. Aciertos = producto boletos (n, 80) x sorteos (80, m); el
+    premio sale de indexar una tabla aciertos -> RD$ con PREMIOS_KINO.
+    """
+    import modulos.kino_filtros as kf
+    boletos, validas = incidencia(df_boveda, [f"N{i}" for i in range(1, 11)])
+    fechas_j = a_fechas(df_boveda['Fecha Generada'])
+    validas &= ~np.isnat(fechas_j)
+    sorteos, sorteos_ok = incidencia(df_hist, [f"B{i}" for i in range(1, 21)])
+    fechas_s = a_fechas(df_hist['Fecha'])
+    sorteos_ok &= ~np.isnat(fechas_s)
+    idx_j, idx_s = np.flatnonzero(validas), np.flatnonzero(sorteos_ok)
+    if not len(idx_j) or not len(idx_s):
+        return []
+
+    premios = np.zeros(comb.MAX_KINO + 1, dtype=np.int64)
+    for aciertos, premio in kf.PREMIOS_KINO.items():
+        premios[aciertos] = premio
+    sorteos_t = sorteos[idx_s].T.astype(np.float32)
+    fechas_s = fechas_s[idx_s]
+
+    socios = df_boveda['Socio'].values if 'Socio' in df_boveda.columns else np.full(len(df_boveda), 'Tommy')
+    fechas_txt = df_hist['Fecha'].values
+    out = []
+    paso = max(1, MAX_CELDAS // len(idx_s))
+    for i in range(0, len(idx_j), paso):
+        filas = idx_j[i:i + paso]
+        ac = (boletos[filas].astype(np.float32) @ sorteos_t).astype(np.int64)
+        pago = np.where(fechas_j[filas, None] <= fechas_s[None, :], premios[ac], 0)
+        f, c = np.nonzero(pago)
+        for j, s, a, p in zip(filas[f], idx_s[c], ac[f, c], pago[f, c]):
+            out.append((int(j), int(s), {"Fecha": fechas_txt[s], "Socio": socios[j],
+                                         "Aciertos": int(a), "Premio": int(p)}))
+    return out
+
+
+def _ruta(juego, huella='*'):
+    return os.path.join(RUTA_DATA, f"oraculo_{juego}_{huella}.json")
+
+
+def huella(claves):
+    """Hash corto del conjunto de jugadas (claves de _claves): nombra su libro."""
+    texto = "\n".join(sorted({c for c in claves if c is not None}))
+    return hashlib.sha1(texto.encode('utf-8')).hexdigest()[:16]
+
+
+def cargar_libro(juego, huella):
+    clave = (juego, huella)
+    if clave not in _libros:
+        try:
+            with open(_ruta(juego, huella), encoding='utf-8') as fh:
+                _libros[clave] = json.load(fh)
+        except (OSError, ValueError):
+            _libros[clave] = None
+    return _libros[clave]
+
+
+def guardar_libro(juego, huella, libro):
+    _libros[(juego, huella)] = libro
+    try:
+        os.makedirs(RUTA_DATA, exist_ok=True)
+        tmp = _ruta(juego, huella) + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as fh:
+            json.dump(libro, fh, default=lambda x: x.item() if hasattr(x, 'item') else str(x))
+        os.replace(tmp, _ruta(juego, huella))
+        viejos = sorted(glob.glob(_ruta(juego)), key=os.path.getmtime, reverse=True)[LIBROS_MAX:]
+        for ruta in viejos:
+            os.remove(ruta)
+            _libros.pop((juego, os.path.basename(ruta)[len(f"oraculo_{juego}_"):-len(".json")]), None)
+    except OSError:
+        pass
+
+
+def _claves(df_boveda, columnas):
+    """Identidad de cada jugada: fecha generada + socio + números. None si no se puede leer."""
+    fechas = a_fechas(df_boveda['Fecha Generada'])
+    socios = df_boveda['Socio'].astype(str).values if 'Socio' in df_boveda.columns else None
+    nums = df_boveda[columnas].apply(pd.to_numeric, errors='coerce').values
+    out = []
+    for i in range(len(df_boveda)):
+        if np.isnat(fechas[i]) or np.isnan(nums[i]).any():
+            out.append(None)
+            continue
+        socio = socios[i] if socios is not None else 'Tommy'
+        out.append(f"{fechas[i]}|{socio}|{'-'.join(str(int(x)) for x in sorted(nums[i]))}")
+    return out
+
+
+def _al_dia(juego, df_boveda, df_sorteos, columnas, detectar, resumir=None):
+    """
+    Pone al día el libro de ese conjunto de jugadas (ver huella) y devuelve
+    (libro, claves de df_boveda, fechas de df_sorteos), o None si no hay
+    nada que cruzar. Cada jugada guarda su marca (última fecha de sorteo
+    revisada): solo se cruzan los sorteos posteriores a su marca, y una
+    jugada nueva solo los sorteos desde su Fecha Generada. Si cambian
+    sorteos ya revisados (más o menos filas hasta la marca), el libro se
+    rehace. 'detectar' es la función de cruce del juego (_detectar_loto /
+    _detectar_kino); 'resumir', si viene, da por jugada (máximo de aciertos,
+    máscara de bolas acertadas) en esos mismos sorteos y el libro lo acumula.
+    """
+    if df_boveda is None or df_sorteos is None or df_boveda.empty or df_sorteos.empty:
+        return None
+    fechas_s = a_fechas(df_sorteos['Fecha'])
+    validos = ~np.isnat(fechas_s)
+    if not validos.any():
+        return None
+    ultima = str(fechas_s[validos].max())
+
+    claves = _claves(df_boveda, columnas)
+    propia = huella(claves)
+    libro = cargar_libro(juego, propia)
+    if libro is None and juego in _ultimo:
+        base = cargar_libro(juego, _ultimo[juego])
+        libro = copy.deepcopy(base) if base is not None else None
+    _ultimo[juego] = propia
+    if libro is not None and libro.get('version') != VERSION_LIBRO:
+        libro = None
+    if libro is not None and libro['marca'] is not None:
+        hasta_marca = int((fechas_s[validos] <= np.datetime64(libro['marca'])).sum())
+        if hasta_marca != libro['n_hasta_marca']:
+            libro = None
+    if libro is None:
+        libro = {'version': VERSION_LIBRO, 'marca': None, 'n_hasta_marca': 0, 'jugadas': {}}
+    jugadas = libro['jugadas']
+
+    actuales = {c for c in claves if c is not None}
+    cambio = set(jugadas) != actuales or libro['marca'] != ultima
+
+    # Agrupar por marca: cada grupo se cruza solo con los sorteos posteriores
+    grupos = {}
+    for i, c in enumerate(claves):
+        if c is None:
+            continue
+        marca = jugadas[c]['marca'] if c in jugadas else None
+        if marca != ultima:
+            grupos.setdefault(marca, {})[c] = i  # una fila por clave basta
+    for marca, filas in grupos.items():
+        nuevos = validos if marca is None else validos & (fechas_s > np.datetime64(marca))
+        pos_s = np.flatnonzero(nuevos)
+        pos_j = list(filas.values())
+        for c in filas:
+            jugadas.setdefault(c, {'marca': None, 'aciertos': [], 'maximo': 0, 'bolas': 0})
+        if len(pos_s):
+            sub_j = df_boveda.iloc[pos_j].reset_index(drop=True)
+            sub_s = df_sorteos.iloc[pos_s].reset_index(drop=True)
+            for j, s, registro in detectar(sub_j, sub_s):
+                jugadas[claves[pos_j[j]]]['aciertos'].append([str(fechas_s[pos_s[s]]), registro])
+            if resumir is not None:
+                maximo, bolas = resumir(sub_j, sub_s)
+                for c, m, b in zip(filas, maximo, bolas):
+                    jugadas[c]['maximo'] = max(jugadas[c]['maximo'], int(m))
+                    jugadas[c]['bolas'] |= int(b)
+        for c in filas:
+            jugadas[c]['marca'] = ultima
+
+    for c in set(jugadas) - actuales:
+        del jugadas[c]
+    libro['marca'] = ultima
+    libro['n_hasta_marca'] = int(validos.sum())
+    if cambio:
+        guardar_libro(juego, propia, libro)
+    return libro, claves, fechas_s
+
+
+def radar(juego, df_boveda, df_sorteos, columnas, detectar, resumir=None):
+    """
+    Aciertos de toda la bóveda (Sheets + memoria local) con el libro de ese
+    conjunto de jugadas (ver _al_dia). Devuelve los registros en el mismo
+    orden que detectar sobre todo.
+    """
+    al_dia = _al_dia(juego, df_boveda, df_sorteos, columnas, detectar, resumir)
+    if al_dia is None:
+        return []
+    libro, claves, fechas_s = al_dia
+
+    # Salida en orden bóveda x sorteo (filas repetidas repiten sus aciertos)
+    posicion = {}
+    for p, f in enumerate(fechas_s):
+        if not np.isnat(f):
+            posicion.setdefault(str(f), p)
+    out = []
+    for c in claves:
+        if c is None:
+            continue
+        for _, registro in sorted(libro['jugadas'][c]['aciertos'], key=lambda a: posicion.get(a[0], -1)):
+            out.append(dict(registro))
+    return out
+
+
+def radar_loto(df_boveda, df_historial):
+    """Radar Loto incremental (mismos registros que aciertos_loto)."""
+    return radar('loto', df_boveda, df_historial, BOLAS_COLS, _detectar_loto, _resumir_loto)
+
+
+def marcas_loto(df_filas, df_historial, df_boveda=None):
+    """
+    Para resaltar la bóveda, por fila de df_filas y en su orden: (máximo de
+    aciertos en un solo sorteo, máscara de las bolas que salieron en algún
+    sorteo), contando solo sorteos desde su Fecha Generada. Sale del libro
+    del radar de df_boveda (la bóveda completa de la que df_filas es un
+    filtro; por defecto df_filas): no se vuelve a cruzar nada. Las filas que
+    el libro no conoce (celdas vacías) se cruzan aparte.
+    """
+    n = len(df_filas)
+    maximo = np.zeros(n, dtype=np.uint8)
+    bolas = np.zeros(n, dtype=np.uint64)
+    if df_historial is None or df_historial.empty or not n:
+        return maximo, bolas
+    df_boveda = df_filas if df_boveda is None else df_boveda
+    al_dia = _al_dia('loto', df_boveda, df_historial, BOLAS_COLS, _detectar_loto, _resumir_loto)
+    jugadas = al_dia[0]['jugadas'] if al_dia is not None else {}
+    faltan = []
+    for i, c in enumerate(_claves(df_filas, BOLAS_COLS)):
+        if c in jugadas:
+            maximo[i], bolas[i] = jugadas[c]['maximo'], jugadas[c]['bolas']
+        else:
+            faltan.append(i)
+    if faltan:
+        maximo[faltan], bolas[faltan] = _resumir_loto(df_filas.iloc[faltan], df_historial)
+    return maximo, bolas
+
+
+def radar_kino(df_boveda, df_hist):
+    """Radar Kino incremental: {'Fecha', 'Socio', 'Aciertos', 'Premio'} de cada jugada con premio."""
+    return radar('kino', df_boveda, df_hist, [f"N{i}" for i in range(1, 11)], _detectar_kino)
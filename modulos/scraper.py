@@ -5,6 +5,8 @@ import os
 import re
 from datetime import datetime, timedelta
 
+import modulos.almacen as almacen
+
 RUTA_CSV = os.path.join(os.path.dirname(__file__), '..', 'data', 'historial_loto.csv')
 
 URL_YELU = "https://www.yelu.do/leidsa/results/loto-mas"
@@ -77,6 +79,31 @@ def extraer_de_yelu():
     return historial
 
 
+def _actualizar_atrasados(df):
+    """
+    Lleva el estado de atrasados al día con lo recién guardado (incremental).
+    Devuelve un aviso para el mensaje de la sync si no se pudo ('' si todo bien).
+    """
+    import modulos.atrasados as atrasados
+    bolas = ['Bola_1', 'Bola_2', 'Bola_3', 'Bola_4', 'Bola_5', 'Bola_6']
+    try:
+        atrasados.sincronizar('loto', df['Fecha'].astype(str).values, df[bolas].values)
+    except (KeyError, ValueError, TypeError) as e:
+        return f" ⚠️ Atrasados sin actualizar: {e}"
+    return ""
+
+
+def _guardar(df):
+    """Sorteos nuevos al almacén binario; el CSV se reescribe desde él como exportación."""
+    try:
+        almacen.agregar('loto', df)
+        if almacen.exportar_csv('loto', RUTA_CSV):
+            return
+    except (OSError, ValueError):
+        pass
+    df.to_csv(RUTA_CSV, index=False)
+
+
 def actualizar_csv():
     try:
         resultados = extraer_de_yelu()
@@ -94,20 +121,25 @@ def actualizar_csv():
             if not df_filtrado.empty:
                 df_final = pd.concat([df_filtrado, df_hist], ignore_index=True)
                 df_final = df_final.drop_duplicates(subset=['Fecha']).sort_values(by='Fecha', ascending=False)
-                df_final.to_csv(RUTA_CSV, index=False)
+                _guardar(df_final)
+                aviso = _actualizar_atrasados(df_final)
                 fechas = ", ".join(df_filtrado['Fecha'].head(5).tolist())
                 extra = f" (+{len(df_filtrado)-5} más)" if len(df_filtrado) > 5 else ""
-                return True, f"✅ {len(df_filtrado)} sorteos nuevos: {fechas}{extra}"
+                return True, f"✅ {len(df_filtrado)} sorteos nuevos: {fechas}{extra}{aviso}"
             return True, f"Todo al día ({len(df_nuevos)} en web, ya estaban)."
         else:
             df_nuevos = df_nuevos.sort_values(by='Fecha', ascending=False)
-            df_nuevos.to_csv(RUTA_CSV, index=False)
-            return True, f"Archivo creado con {len(df_nuevos)} sorteos."
+            _guardar(df_nuevos)
+            aviso = _actualizar_atrasados(df_nuevos)
+            return True, f"Archivo creado con {len(df_nuevos)} sorteos.{aviso}"
     except Exception as e:
         return False, f"Error al extraer: {e}"
 
 
 def cargar_datos():
+    df = almacen.abrir_df('loto', RUTA_CSV)
+    if df is not None:
+        return df
     if not os.path.exists(RUTA_CSV):
         return pd.DataFrame()
     df = pd.read_csv(RUTA_CSV)
@@ -5,6 +5,8 @@ import os
 import re
 from datetime import datetime, timedelta
 
+import modulos.almacen as almacen
+
 RUTA_CSV_KINO = os.path.join(os.path.dirname(__file__), '..', 'data', 'historial_kino.csv')
 URL_YELU_KINO = "https://www.yelu.do/leidsa/results/super-kino-tv"
 HOJA_NUBE_KINO = "Historial_Kino"
@@ -74,11 +76,9 @@ def _leer_nube():
         ws, _ = gsh.conectar_worksheet(HOJA_NUBE_KINO)
         if ws is None:
             return pd.DataFrame()
-        regs = ws.get_all_records()
-        df = pd.DataFrame(regs)
+        df = gsh.leer_df(ws, COLS_KINO)
         if df.empty:
             return pd.DataFrame()
-        df = df.reindex(columns=COLS_KINO)
         df['Fecha'] = df['Fecha'].astype(str).str.strip()
         return df
     except Exception:
@@ -91,13 +91,36 @@ def _escribir_nube(df):
         ws, _ = gsh.conectar_worksheet(HOJA_NUBE_KINO)
         if ws is None:
             return False
-        ws.clear()
-        ws.update([COLS_KINO] + df[COLS_KINO].astype(str).values.tolist())
-        return True
+        ok, _ = gsh.escribir_df(ws, df[COLS_KINO].astype(str), COLS_KINO)  # solo las filas nuevas
+        return ok
     except Exception:
         return False
 
 
+def _actualizar_atrasados(df):
+    """
+    Lleva el estado de atrasados al día con lo recién guardado (incremental).
+    Devuelve un aviso para el mensaje de la sync si no se pudo ('' si todo bien).
+    """
+    import modulos.atrasados as atrasados
+    try:
+        atrasados.sincronizar('kino', df['Fecha'].values, df[COLS_KINO[1:]].values)
+    except (KeyError, ValueError, TypeError) as e:
+        return f" ⚠️ Atrasados sin actualizar: {e}"
+    return ""
+
+
+def _guardar(df):
+    """Sorteos nuevos al almacén binario; el CSV se reescribe desde él como exportación."""
+    try:
+        almacen.agregar('kino', df)
+        if almacen.exportar_csv('kino', RUTA_CSV_KINO):
+            return
+    except (OSError, ValueError):
+        pass
+    df.to_csv(RUTA_CSV_KINO, index=False)
+
+
 # ============ SYNC PRINCIPAL ============
 
 def actualizar_csv_kino():
@@ -139,17 +162,21 @@ def actualizar_csv_kino():
     df = df.drop_duplicates(subset=['Fecha']).sort_values(by='Fecha', ascending=False).reset_index(drop=True)
 
     os.makedirs(os.path.dirname(RUTA_CSV_KINO), exist_ok=True)
-    df.to_csv(RUTA_CSV_KINO, index=False)
+    _guardar(df)
+    aviso = _actualizar_atrasados(df)
     nube_ok = _escribir_nube(df)
 
     nuevos = len([f for f in df['Fecha'] if f not in previas])
     icono_nube = "☁️" if nube_ok else "⚠️ nube no disponible"
     if nuevos > 0:
-        return True, f"✅ {nuevos} sorteos Kino nuevos. Total: {len(df)} {icono_nube}{nota_web}"
-    return True, f"Kino al día. Total: {len(df)} sorteos {icono_nube}{nota_web}"
+        return True, f"✅ {nuevos} sorteos Kino nuevos. Total: {len(df)} {icono_nube}{nota_web}{aviso}"
+    return True, f"Kino al día. Total: {len(df)} sorteos {icono_nube}{nota_web}{aviso}"
 
 
 def cargar_datos_kino():
+    df = almacen.abrir_df('kino', RUTA_CSV_KINO)
+    if df is not None:
+        return df
     if not os.path.exists(RUTA_CSV_KINO):
         return pd.DataFrame()
     df = pd.read_csv(RUTA_CSV_KINO)
@@ -0,0 +1,207 @@
+"""
+Tabla precalculada de las C(40,6) = 3,838,380 combinaciones del Loto.
+Cada filtro de fisica_filtros depende solo de la combinación, así que se
+calculan una vez y se guardan como .npy (una columna por archivo). Abrirla
+es un np.load en modo memmap: instantáneo y compartido entre procesos.
+
+Las filas están en orden colexicográfico, así que la posición de una
+combinación se calcula directo con indice() sin buscar.
+
+Construcción única:  python -m modulos.tabla_loto
+"""
+import os
+import time
+import numpy as np
+from itertools import combinations
+
+import modulos.combinaciones as comb
+import modulos.fisica_filtros as filtros
+
+RUTA_TABLA = os.path.join(os.path.dirname(__file__), '..', 'data', 'tabla_loto')
+TOTAL = 3838380
+CAMPOS = {
+    'bolas': np.uint8, 'mask': np.uint64, 'suma': np.uint8, 'pares': np.uint8,
+    'bajos': np.uint8, 'terminaciones': np.uint8, 'consecutivos': np.uint8,
+    'decenas': np.uint8,
+}
+
+# BINOM[n, k] = C(n, k) para n <= 40, k <= 6
+BINOM = np.zeros((41, 7), dtype=np.int64)
+BINOM[:, 0] = 1
+for _n in range(1, 41):
+    for _k in range(1, 7):
+        BINOM[_n, _k] = BINOM[_n - 1, _k - 1] + BINOM[_n - 1, _k]
+
+# Filtros de forma como bits, para el resumen de conteos (suma x banderas)
+BANDERAS = ['pares', 'terminaciones', 'consecutivos', 'bajos', 'decenas']
+SUMA_MAX = 225
+
+_tabla = None
+_resumen = None
+
+
+def indice(bolas):
+    """Posición (rango colex) de jugadas ordenadas. Acepta una jugada o una matriz (n, 6)."""
+    b = np.asarray(bolas, dtype=np.int64)
+    return (BINOM[b - 1, np.arange(1, 7)]).sum(axis=-1)
+
+
+def bolas_de(mascaras):
+    """
+    Máscaras -> matriz (k, 6) de números de las que son jugadas Loto (6
+    números del 1 al 40). Las demás se ignoran: un sorteo con una bola vacía
+    (0 al importar) o repetida no es una combinación de la tabla.
+    """
+    validas = [int(m) for m in mascaras if 0 < int(m) < 1 << 40 and int(m).bit_count() == 6]
+    m = np.array(validas, dtype=np.uint64)
+    bits = (m[:, None] >> np.arange(40, dtype=np.uint64)) & np.uint64(1)
+    return np.nonzero(bits)[1].reshape(-1, 6).astype(np.int64) + 1
+
+
+def construir_tabla(ruta=RUTA_TABLA, bloque=500000):
+    """Enumera todas las combinaciones y escribe sus rasgos a disco. Devuelve segundos."""
+    t0 = time.time()
+    os.makedirs(ruta, exist_ok=True)
+    todas = np.fromiter(combinations(range(1, 41), 6), dtype=np.dtype((np.uint8, 6)), count=TOTAL)
+    todas[indice(todas)] = todas.copy()  # de orden lexicográfico a colex
+
+    columnas = {
+        'bolas': np.empty((TOTAL, 6), np.uint8),
+        'mask': np.empty(TOTAL, np.uint64),
+        'decenas': np.empty((TOTAL, 4), np.uint8),
+    }
+    for campo in ('suma', 'pares', 'bajos', 'terminaciones', 'consecutivos'):
+        columnas[campo] = np.empty(TOTAL, np.uint8)
+
+    for i in range(0, TOTAL, bloque):
+        trozo = todas[i:i + bloque]
+        columnas['bolas'][i:i + bloque] = trozo
+        columnas['mask'][i:i + bloque] = comb.codificar_lote(trozo)
+        for campo, valores in filtros.rasgos_lote(trozo).items():
+            columnas[campo][i:i + bloque] = valores
+
+    columnas['resumen'] = calcular_resumen(columnas)
+    for campo, valores in columnas.items():
+        tmp = os.path.join(ruta, f"{campo}.{os.getpid()}.tmp.npy")  # por proceso: nunca dos escritores en el mismo tmp
+        np.save(tmp, valores)
+        os.replace(tmp, os.path.join(ruta, f"{campo}.npy"))
+    return round(time.time() - t0, 1)
+
+
+def _banderas(rasgos):
+    """Bit i encendido = la jugada cae en el filtro BANDERAS[i]."""
+    pares = rasgos['pares']
+    bajos = rasgos['bajos']
+    dec = rasgos['decenas']
+    fuera = [
+        (pares == 0) | (pares == 6),
+        rasgos['terminaciones'] >= 4,
+        rasgos['consecutivos'] >= 4,
+        (bajos == 0) | (bajos == 6),
+        (dec >= 4).any(axis=1) if dec.ndim == 2 else dec >= 4,
+    ]
+    out = np.zeros(len(pares), dtype=np.int64)
+    for i, f in enumerate(fuera):
+        out |= f.astype(np.int64) << i
+    return out
+
+
+def calcular_resumen(tabla, bloque=500000):
+    """Conteo de combinaciones por (suma, banderas): matriz (SUMA_MAX + 1, 32)."""
+    celdas = (SUMA_MAX + 1) * (1 << len(BANDERAS))
+    out = np.zeros(celdas, dtype=np.int64)
+    for i in range(0, TOTAL, bloque):
+        trozo = {c: np.asarray(tabla[c][i:i + bloque]) for c in ('suma', 'pares', 'bajos', 'terminaciones', 'consecutivos', 'decenas')}
+        clave = trozo['suma'].astype(np.int64) * (1 << len(BANDERAS)) + _banderas(trozo)
+        out += np.bincount(clave, minlength=celdas)
+    return out.reshape(SUMA_MAX + 1, -1)
+
+
+def abrir_resumen(ruta=RUTA_TABLA):
+    """Resumen (suma x banderas) guardado junto a la tabla; se calcula la primera vez."""
+    global _resumen
+    if _resumen is not None and ruta == RUTA_TABLA:
+        return _resumen
+    archivo = os.path.join(ruta, "resumen.npy")
+    if os.path.exists(archivo):
+        resumen = np.load(archivo)
+    else:
+        resumen = calcular_resumen(abrir_tabla(ruta))
+        np.save(archivo, resumen)
+    if ruta == RUTA_TABLA:
+        _resumen = resumen
+    return resumen
+
+
+def _contar(resumen, rango_suma, activos):
+    bits = sum(1 << BANDERAS.index(f) for f in activos)
+    permitidas = (np.arange(resumen.shape[1]) & bits) == 0
+    s0, s1 = max(int(rango_suma[0]), 0), min(int(rango_suma[1]), SUMA_MAX)
+    if s1 < s0:
+        return 0
+    return int(resumen[s0:s1 + 1, permitidas].sum())
+
+
+def contar_validas(rango_suma, descartar_pares, descartar_terminaciones,
+                   descartar_consecutivos, spread_decenas=True, excluir=None):
+    """
+    Cuántas combinaciones exactas pasan los filtros (y anti-clones, si se da
+    'excluir': set de máscaras), y cuántas más habría si se afloja cada filtro.
+    Trabaja sobre el resumen precalculado: microsegundos por llamada.
+    """
+    resumen = abrir_resumen()
+    activos = ['bajos']
+    if descartar_pares:
+        activos.append('pares')
+    if descartar_terminaciones:
+        activos.append('terminaciones')
+    if descartar_consecutivos:
+        activos.append('consecutivos')
+    if spread_decenas:
+        activos.append('decenas')
+
+    validas = _contar(resumen, rango_suma, activos)
+    quita = {'suma': _contar(resumen, (0, SUMA_MAX), activos) - validas}
+    for f in activos:
+        quita[f] = _contar(resumen, rango_suma, [a for a in activos if a != f]) - validas
+
+    clones = 0
+    if excluir:
+        bolas = bolas_de(excluir)
+        clones = int(filtros.evaluar_lote(bolas, rango_suma, descartar_pares, descartar_terminaciones,
+                                          descartar_consecutivos, spread_decenas).sum())
+        quita['anticlones'] = clones
+    return {'total': TOTAL, 'validas': validas - clones, 'quita': quita}
+
+
+def existe_tabla(ruta=RUTA_TABLA):
+    return all(os.path.exists(os.path.join(ruta, f"{c}.npy")) for c in CAMPOS)
+
+
+def abrir_tabla(ruta=RUTA_TABLA, construir=True):
+    """
+    Dict campo -> array memmap (solo lectura). Si no existe y construir=True,
+    la genera primero (unos segundos, una sola vez). Sin tabla devuelve None.
+    """
+    global _tabla
+    if _tabla is not None and ruta == RUTA_TABLA:
+        return _tabla
+    if not existe_tabla(ruta):
+        if not construir:
+            return None
+        construir_tabla(ruta)
+    tabla = {c: np.load(os.path.join(ruta, f"{c}.npy"), mmap_mode='r') for c in CAMPOS}
+    if ruta == RUTA_TABLA:
+        _tabla = tabla
+    return tabla
+
+
+def filtrar(tabla, rango_suma, descartar_pares, descartar_terminaciones,
+            descartar_consecutivos, spread_decenas=True):
+    """Máscara (TOTAL,) de las combinaciones que pasan los filtros de forma del sidebar."""
+    return filtros.mascara_filtros(tabla, rango_suma, descartar_pares, descartar_terminaciones,
+                                   descartar_consecutivos, spread_decenas)
+
+
+if __name__ == "__main__":
+    print(f"Tabla construida en {construir_tabla()} s -> {os.path.abspath(RUTA_TABLA)}")
@@ -6,95 +6,602 @@ SI cierta cantidad de tus números sale, se garantiza al menos un premio.
 Importante: NO aumenta la probabilidad de que tus números salgan (sigue
 siendo azar). Optimiza cómo cubres la inversión que ya vas a gastar.
 """
+import math
 import random
-from itertools import combinations
+import time
+from itertools import combinations, product
 
+import numpy as np
 
-def _cubre(boleto, combos_ganadores, garantia):
-    """Marca qué combinaciones-objetivo quedan cubiertas por un boleto."""
-    set_b = set(boleto)
-    cubiertos = set()
-    for i, combo in enumerate(combos_ganadores):
-        if len(set_b & combo) >= garantia:
-            cubiertos.add(i)
-    return cubiertos
+import modulos.combinaciones as comb
+import modulos.cache_ruedas as cache_ruedas
 
+MAX_CELDAS = 4_000_000  # boletos x objetivos por bloque al calcular cobertura
 
-def generar_rueda(numeros, garantia=3, aciertos_objetivo=4, max_boletos=60):
+
+def _tipo(n):
+    """Entero más chico que guarda n bits: con uint32 el popcount rinde ~2.5x más."""
+    return np.uint32 if n <= 32 else np.uint64
+
+
+def _mascaras(combos, tipo=np.uint64):
+    """Tuplas de índices locales (0..n-1) -> array de máscaras con un bit por índice."""
+    if not isinstance(combos, np.ndarray):
+        combos = list(combos)
+    combos = np.asarray(combos, dtype=np.int64)
+    return np.bitwise_or.reduce(np.left_shift(tipo(1), combos.astype(tipo)), axis=1)
+
+
+def _binomiales(n, k):
+    """Tabla C(a, b) para a <= n, b <= k."""
+    return np.array([[math.comb(a, b) for b in range(k + 1)] for a in range(n + 1)], dtype=np.int64)
+
+
+def _desrango(rangos, n, k):
     """
-    numeros: lista de números favoritos (7 a 20 recomendado).
-    garantia: cuántos aciertos garantizamos en al menos 1 boleto (3, 4 o 5).
-    aciertos_objetivo: SI salen esta cantidad de tus números...
-    max_boletos: tope de boletos a generar.
+    Rangos colex -> matriz (m, k) de índices locales ordenados: el inverso
+    de sum(C(x_i, i + 1)). Por columna, el mayor x con C(x, i) <= resto.
+    """
+    binom = _binomiales(n, k)
+    resto = np.array(rangos, dtype=np.int64)
+    out = np.empty((len(resto), k), dtype=np.int64)
+    for i in range(k, 0, -1):
+        x = np.searchsorted(binom[:, i], resto, side='right') - 1
+        out[:, i - 1] = x
+        resto -= binom[x, i]
+    return out
 
-    Devuelve (boletos, info). Usa algoritmo greedy de covering design.
+
+def _enumerar(n, k, tipo=np.uint64, bloque=1 << 18):
+    """Todos los k-subconjuntos de 0..n-1 como máscaras, en orden colex y por bloques."""
+    total = math.comb(n, k)
+    for desde in range(0, total, bloque):
+        yield _mascaras(_desrango(np.arange(desde, min(desde + bloque, total)), n, k), tipo)
+
+
+def _todas(n, k, tipo=np.uint64):
+    """Array compacto con los C(n, k) subconjuntos (4 u 8 bytes cada uno)."""
+    out = np.empty(math.comb(n, k), dtype=tipo)
+    i = 0
+    for trozo in _enumerar(n, k, tipo):
+        out[i:i + len(trozo)] = trozo
+        i += len(trozo)
+    return out
+
+
+def _empaquetar(filas_bool):
+    """Matriz bool (m, T) -> bitset (m, ceil(T/64)) uint64."""
+    m, t = filas_bool.shape
+    palabras = (t + 63) // 64
+    bytes_ = np.packbits(filas_bool, axis=1, bitorder='little')
+    relleno = np.zeros((m, palabras * 8), dtype=np.uint8)
+    relleno[:, :bytes_.shape[1]] = bytes_
+    return relleno.view(np.uint64)
+
+
+def _cubre(boletos, objetivos, garantia):
     """
-    numeros = sorted(set(int(n) for n in numeros))
-    n = len(numeros)
+    Bitset de objetivos cubiertos por cada boleto: fila i, bit j encendido si
+    el boleto i comparte >= garantia números con el objetivo j.
+    boletos y objetivos son máscaras (índices locales del grupo, ver _mascaras).
+    """
+    boletos = np.atleast_1d(np.asarray(boletos, dtype=objetivos.dtype))
+    palabras = (len(objetivos) + 63) // 64
+    out = np.empty((len(boletos), palabras), dtype=np.uint64)
+    paso = max(1, MAX_CELDAS // max(len(objetivos), 1))
+    for i in range(0, len(boletos), paso):
+        b = boletos[i:i + paso]
+        out[i:i + paso] = _empaquetar(comb.popcount(b[:, None] & objetivos[None, :]) >= garantia)
+    return out
 
-    if n < 6:
-        return [], {"error": "Necesitas al menos 6 números."}
-    if garantia > aciertos_objetivo:
-        return [], {"error": "La garantía no puede ser mayor que los aciertos objetivo."}
-    if aciertos_objetivo > n:
-        return [], {"error": f"Los aciertos objetivo ({aciertos_objetivo}) no pueden superar tu grupo ({n})."}
 
-    # Todas las formas en que pueden salir 'aciertos_objetivo' de tus números
-    combos_ganadores = [set(c) for c in combinations(numeros, aciertos_objetivo)]
-    # Todos los boletos posibles (6 números de tu grupo)
-    todos_boletos = list(combinations(numeros, 6))
+def _ganancias(boletos, objetivos, garantia):
+    """Cuántos de 'objetivos' cubre cada boleto (sin armar el bitset)."""
+    boletos = np.atleast_1d(np.asarray(boletos, dtype=objetivos.dtype))
+    out = np.empty(len(boletos), dtype=np.int64)
+    paso = max(1, MAX_CELDAS // max(len(objetivos), 1))
+    for i in range(0, len(boletos), paso):
+        b = boletos[i:i + paso]
+        out[i:i + paso] = _bits(_empaquetar(comb.popcount(b[:, None] & objetivos[None, :]) >= garantia))
+    return out
+
+
+def _indices(bitset, total):
+    """Índices de los bits encendidos de un bitset (palabras,)."""
+    return np.flatnonzero(np.unpackbits(bitset.view(np.uint8), bitorder='little')[:total])
+
+
+def _bits(bitset):
+    """Cantidad de bits encendidos por fila de un bitset (m, palabras)."""
+    return comb.popcount(bitset).sum(axis=-1, dtype=np.int64)
+
+
+def _a_numeros(mask, numeros):
+    """Máscara local -> lista ordenada de números del grupo."""
+    return [numeros[i] for i in range(len(numeros)) if (int(mask) >> i) & 1]
+
 
+def _greedy_muestreo(n, combos_ganadores, garantia, max_boletos, tam=6):
+    """
+    Greedy clásico: cada ronda elige el boleto que más objetivos pendientes
+    cubre. En grupos grandes evalúa 3000 boletos al azar por ronda (se
+    sortean rangos y se desrankean: no se arma la lista de boletos).
+    Devuelve (máscaras de boletos, bitset de objetivos pendientes).
+    """
+    tipo = combos_ganadores.dtype.type
+    total_boletos = math.comb(n, tam)
     total_objetivos = len(combos_ganadores)
-    pendientes = set(range(total_objetivos))
+    pendientes = _empaquetar(np.ones((1, total_objetivos), dtype=bool))[0]
+    n_pendientes = total_objetivos
     boletos = []
 
-    # Cobertura pre-calculada por boleto
-    cache = {}
+    # Grupo chico: la cobertura de todos los boletos se calcula una sola vez
+    cobertura_todos = None
+    if total_boletos <= 3000:
+        todos_boletos = _todas(n, tam, tipo)
+        cobertura_todos = _cubre(todos_boletos, combos_ganadores, garantia)
 
     intentos_sin_mejora = 0
-    while pendientes and len(boletos) < max_boletos:
-        mejor_boleto = None
-        mejor_cobertura = set()
-
+    while n_pendientes and len(boletos) < max_boletos:
         # Muestreo para no explotar en grupos grandes
-        candidatos = todos_boletos
-        if len(todos_boletos) > 3000:
-            candidatos = random.sample(todos_boletos, 3000)
-
-        for boleto in candidatos:
-            if boleto in cache:
-                cubiertos = cache[boleto]
-            else:
-                cubiertos = _cubre(boleto, combos_ganadores, garantia)
-                cache[boleto] = cubiertos
-            nuevos = cubiertos & pendientes
-            if len(nuevos) > len(mejor_cobertura):
-                mejor_cobertura = nuevos
-                mejor_boleto = boleto
-                if len(nuevos) == len(pendientes):
-                    break
-
-        if mejor_boleto is None or not mejor_cobertura:
+        if cobertura_todos is not None:
+            candidatos = todos_boletos
+            nuevos = _bits(cobertura_todos & pendientes)
+        else:
+            # Solo contra los objetivos aún pendientes: el costo baja con cada ronda
+            rangos = random.sample(range(total_boletos), 3000)
+            candidatos = _mascaras(_desrango(rangos, n, tam), tipo)
+            objetivos_pend = combos_ganadores[_indices(pendientes, total_objetivos)]
+            nuevos = _ganancias(candidatos, objetivos_pend, garantia)
+        mejor = int(nuevos.argmax())
+        if nuevos[mejor] == 0:
             intentos_sin_mejora += 1
             if intentos_sin_mejora > 3:
                 break
             continue
 
-        boletos.append(sorted(mejor_boleto))
-        pendientes -= mejor_cobertura
+        elegido = candidatos[mejor]
+        boletos.append(elegido)
+        pendientes &= ~_cubre(elegido, combos_ganadores, garantia)[0]
+        n_pendientes -= int(nuevos[mejor])
         intentos_sin_mejora = 0
+    return boletos, pendientes
+
+
+def _greedy_perezoso(candidatos, combos_ganadores, garantia, max_boletos, lote=256):
+    """
+    Greedy perezoso (lazy greedy) sobre TODOS los candidatos (máscaras uint64).
+    La cobertura es submodular: la ganancia de un boleto solo baja cuando se
+    eligen otros, así que la ganancia vieja es una cota superior. Las
+    ganancias son enteras: la cola de prioridad son cubetas (array de
+    ganancias viejas) y en cada paso solo se re-evalúan los candidatos de la
+    cubeta más alta, por lotes. Se elige uno cuando su ganancia fresca es la
+    mayor de todas. Empates -> el de menor índice: resultado reproducible.
+    Devuelve (máscaras de boletos, bitset de objetivos pendientes).
+    """
+    total_objetivos = len(combos_ganadores)
+    pendientes = _empaquetar(np.ones((1, total_objetivos), dtype=bool))[0]
+    objetivos_pend = combos_ganadores
+    boletos = []
+    if len(candidatos) == 0:
+        return boletos, pendientes
+
+    # Al inicio todos los boletos cubren lo mismo (simetría): una sola evaluación
+    inicial = int(_ganancias(candidatos[:1], combos_ganadores, garantia)[0])
+    vieja = np.full(len(candidatos), inicial, dtype=np.int32)
+    fresca = np.zeros(len(candidatos), dtype=bool)  # evaluada en esta ronda
+
+    while len(objetivos_pend) and len(boletos) < max_boletos:
+        tope = int(vieja.max())
+        if tope == 0:
+            break
+        arriba = np.flatnonzero(vieja == tope)
+        listos = arriba[fresca[arriba]]
+        if len(listos) == 0:
+            # Re-evaluar un lote de la cubeta más alta contra los pendientes
+            idx = arriba[:lote]
+            vieja[idx] = _ganancias(candidatos[idx], objetivos_pend, garantia)
+            fresca[idx] = True
+            continue
+
+        elegido = candidatos[listos[0]]
+        boletos.append(elegido)
+        cubiertos = _cubre(elegido, combos_ganadores, garantia)[0]
+        pendientes &= ~cubiertos
+        objetivos_pend = combos_ganadores[_indices(pendientes, total_objetivos)]
+        vieja[listos[0]] = 0
+        fresca[:] = False
+    return boletos, pendientes
+
+
+TEMPERATURA = 0.3  # recocido a temperatura fija: rindió mejor que enfriar en ruedas de 12-18 números
+PACIENCIA = 20000  # movidas sin bajar los descubiertos antes de dar la búsqueda por estancada
+
+
+class _Cobertura:
+    """
+    Qué objetivos cubre un boleto, sin recorrer todos los objetivos.
+    Los objetivos (k-subconjuntos del grupo) se numeran por rango colex, y
+    los que cubre un boleto se arman con patrones fijos: j índices del
+    boleto (j >= garantia) + k - j de afuera. Costo O(objetivos afectados).
+    """
+
+    def __init__(self, n, k, garantia, tam=6):
+        self.n, self.k, self.tam = n, k, tam
+        self.binom = _binomiales(n, k)
+        self.objetivos = _desrango(np.arange(math.comb(n, k)), n, k)  # fila = rango colex
+        patrones = []
+        for j in range(garantia, min(tam, k) + 1):
+            for dentro, fuera in product(combinations(range(tam), j),
+                                         combinations(range(tam, n), k - j)):
+                patrones.append(dentro + fuera)
+        self.patrones = np.array(patrones, dtype=np.int64).reshape(-1, k)
+
+    def rango(self, subconjuntos):
+        """Rango colex de k-subconjuntos ordenados (filas de índices locales)."""
+        return self.binom[subconjuntos, np.arange(1, self.k + 1)].sum(axis=-1)
+
+    def lista(self, boleto):
+        """Rangos de los objetivos que cubre el boleto (índices locales ordenados)."""
+        fuera = np.ones(self.n, dtype=bool)
+        fuera[boleto] = False
+        elementos = np.concatenate([boleto, np.flatnonzero(fuera)])
+        return self.rango(np.sort(elementos[self.patrones], axis=1))
+
+
+def optimizar_rueda(mascaras, n, aciertos_objetivo, garantia, tiempo_max=2.0,
+                    semilla=0, tam=6, paciencia=None):
+    """
+    Achica una rueda que ya cubre todo (salida del greedy) con búsqueda local.
+    1) Quita boletos redundantes. 2) Saca el boleto que menos cubre solo y
+    repara con recocido simulado: se toma un objetivo descubierto y un boleto
+    al azar, y se cambian los números justos para que lo cubra. El costo es
+    la cantidad de objetivos descubiertos; 'cuenta' guarda cuántos boletos
+    cubren cada objetivo, así cada movida toca solo sus objetivos.
+    Si llega a 0, la rueda quedó con un boleto menos y se repite.
+    Devuelve la mejor rueda completa encontrada en tiempo_max segundos, o
+    antes si pasan 'paciencia' movidas (PACIENCIA) sin bajar el mínimo de
+    objetivos descubiertos: la búsqueda se estancó.
+    """
+    paciencia = PACIENCIA if paciencia is None else paciencia
+    t0 = time.time()
+    cob = _Cobertura(n, aciertos_objetivo, garantia, tam)
+    boletos = [np.array([i for i in range(n) if (int(m) >> i) & 1], dtype=np.int64)
+               for m in mascaras]
+    listas = [cob.lista(b) for b in boletos]
+    cuenta = np.zeros(len(cob.objetivos), dtype=np.int32)
+    for lista in listas:
+        cuenta[lista] += 1
+    if (cuenta == 0).any():
+        return list(mascaras)  # rueda parcial: no hay cobertura que conservar
+
+    # Redundantes: todo lo que cubren ya lo cubre otro boleto
+    for i in sorted(range(len(boletos)), key=lambda i: int((cuenta[listas[i]] == 1).sum())):
+        if (cuenta[listas[i]] >= 2).all():
+            cuenta[listas[i]] -= 1
+            boletos[i] = None
+    listas = [l for b, l in zip(boletos, listas) if b is not None]
+    boletos = [b for b in boletos if b is not None]
+    mejor = list(boletos)
+
+    rng = random.Random(semilla)
+    while len(boletos) > 1 and time.time() - t0 < tiempo_max:
+        unicos = [int((cuenta[l] == 1).sum()) for l in listas]
+        quitar = int(np.argmin(unicos))
+        cuenta[listas[quitar]] -= 1
+        descubiertos = unicos[quitar]
+        del boletos[quitar], listas[quitar]
+
+        ceros = np.flatnonzero(cuenta == 0)
+        movidas = 0
+        minimo, ultima_mejora = descubiertos, 0
+        while descubiertos:
+            movidas += 1
+            if movidas - ultima_mejora > paciencia:
+                break
+            if movidas % 256 == 0 and time.time() - t0 >= tiempo_max:
+                break
+            objetivo = set(cob.objetivos[ceros[rng.randrange(len(ceros))]].tolist())
+            i = rng.randrange(len(boletos))
+            actual = boletos[i].tolist()
+            falta = garantia - len(objetivo.intersection(actual))
+            salen = rng.sample([x for x in actual if x not in objetivo], falta)
+            entran = rng.sample(sorted(objetivo.difference(actual)), falta)
+            nuevo = np.array(sorted(set(actual).difference(salen).union(entran)), dtype=np.int64)
+            lista_nueva = cob.lista(nuevo)
+
+            cuenta[listas[i]] -= 1
+            delta = int((cuenta[listas[i]] == 0).sum()) - int((cuenta[lista_nueva] == 0).sum())
+            if delta <= 0 or rng.random() < math.exp(-delta / TEMPERATURA):
+                cuenta[lista_nueva] += 1
+                boletos[i], listas[i] = nuevo, lista_nueva
+                descubiertos += delta
+                ceros = np.flatnonzero(cuenta == 0)
+                if descubiertos < minimo:
+                    minimo, ultima_mejora = descubiertos, movidas
+            else:
+                cuenta[listas[i]] += 1
+
+        if descubiertos:
+            break
+        mejor = list(boletos)
+
+    return [int(np.left_shift(1, b).sum()) for b in mejor]
+
+
+def cobertura_diseno(boletos, n, garantia, aciertos_objetivo):
+    """Cuántos objetivos cubre un diseño dado en índices locales (0..n-1)."""
+    tipo = _tipo(n)
+    objetivos = _todas(n, aciertos_objetivo, tipo)
+    if not len(boletos):
+        return 0
+    cubiertos = np.bitwise_or.reduce(_cubre(_mascaras(boletos, tipo), objetivos, garantia), axis=0)
+    return int(_bits(cubiertos))
+
+
+def verificar_rueda(boletos, bloque=1 << 19):
+    """
+    Perfil exacto de premios de cualquier conjunto de boletos (números 1-40)
+    contra las C(40,6) jugadas posibles, por bloques de la tabla precalculada.
+    Devuelve dict con:
+      matriz: (7, 7) sorteos por [aciertos del grupo, aciertos del mejor boleto]
+      minimo: {aciertos del grupo: aciertos garantizados en el mejor boleto}
+      al_menos: {a: sorteos en que algún boleto tiene >= a aciertos}
+    """
+    import modulos.tabla_loto as tabla_loto
+    t0 = time.time()
+    boletos = [sorted(int(x) for x in b) for b in boletos]
+    mascaras = np.array([comb.codificar(b) for b in boletos], dtype=np.uint64)
+    grupo = sorted(set().union(*boletos)) if boletos else []
+    mask_grupo = np.uint64(comb.codificar(grupo))
+
+    todas = tabla_loto.abrir_tabla()['mask']
+    matriz = np.zeros(49, dtype=np.int64)
+    for i in range(0, len(todas), bloque):
+        sorteos = np.asarray(todas[i:i + bloque])
+        mejor = np.zeros(len(sorteos), dtype=np.uint8)
+        for m in mascaras:
+            np.maximum(mejor, comb.popcount(sorteos & m), out=mejor)
+        del_grupo = comb.popcount(sorteos & mask_grupo)
+        matriz += np.bincount(del_grupo.astype(np.int64) * 7 + mejor, minlength=49)
+    matriz = matriz.reshape(7, 7)
+
+    return {
+        "grupo": grupo,
+        "n_boletos": len(boletos),
+        "sorteos": int(matriz.sum()),
+        "matriz": matriz,
+        "minimo": {h: int(np.flatnonzero(matriz[h])[0]) for h in range(7) if matriz[h].any()},
+        "al_menos": {a: int(matriz[:, a:].sum()) for a in range(2, 7)},
+        "segundos": round(time.time() - t0, 2),
+    }
+
+
+ESTRATEGIAS = ("perezosa", "muestreo")
+COSTO_LOTO = 50  # RD$ por boleto Loto
+COSTO_KINO = 25  # RD$ por boleto Super Kino: referencial, verifica en tu banca
+TAM_KINO = 10
+# El greedy perezoso recorre todos los boletos mientras boletos x objetivos
+# quepa en TRABAJO_KINO (hasta 18 números con "5 si salen 7", ~3 s). Más
+# arriba el costo crece como C(n, 10) * C(n, k): con 20 números ya son 35 s
+# y con 30, 30 millones de boletos contra 2 millones de objetivos. Ahí se
+# sortea un pool de POOL_KINO boletos. Lo que cuesta, medido sin búsqueda
+# local (todos vs pool): 18 números "5 si 7" 10 vs 11 boletos; 20 números
+# "5 si 7" 23 vs 24, "4 si 6" 6 vs 8. Pools de 10-50 mil no achican más que
+# el de 3000, y la búsqueda local recupera parte de la diferencia.
+TRABAJO_KINO = 1_500_000_000
+POOL_KINO = 3000
+# Aun con el pool el greedy tarda ~4.5 s por cada 1e9 de trabajo: 22 números
+# "5 si 7" 2 s, 25 números 6 s, 30 números 28 s (y con 30 boletos cubre el
+# 61%: ningún relleno llega al 100% con tan pocos boletos). La página solo
+# corre ruedas que pasan kino_interactiva.
+TRABAJO_INTERACTIVO = 600_000_000
+# Loto: "perezosa" por defecto mientras boletos x objetivos quepa aquí
+# (22 números "3 si 4" 1.4 s, 20 "4 si 5" 1 s). Más arriba crece a 12 s con
+# 25 números "4 si 5" y ~60 s con 30 "3 si 4"; ahí se usa "muestreo".
+TRABAJO_LOTO = 2_000_000_000
+
+
+def trabajo_kino(n, aciertos_objetivo, pool=None):
+    """
+    (boletos candidatos, candidatos x objetivos) del greedy de
+    generar_rueda_kino: el pool que usaría (None = todos) y su costo.
+    """
+    total = math.comb(n, TAM_KINO)
+    objetivos = math.comb(n, aciertos_objetivo)
+    if pool is None and total * objetivos > TRABAJO_KINO:
+        pool = POOL_KINO
+    return pool, (total if pool is None else min(pool, total)) * objetivos
+
+
+def kino_interactiva(n, aciertos_objetivo):
+    """
+    True si la rueda Kino sale en pocos segundos: recorre todos los boletos
+    (dentro de TRABAJO_KINO) o el pool cabe en TRABAJO_INTERACTIVO.
+    """
+    pool, trabajo = trabajo_kino(n, aciertos_objetivo)
+    return pool is None or trabajo <= TRABAJO_INTERACTIVO
+
+
+def _candidatos(n, tam, tipo, pool=None, semilla=0):
+    """Todos los boletos del grupo, o 'pool' rangos sorteados (reproducible) si son más."""
+    total = math.comb(n, tam)
+    if pool is None or total <= pool:
+        return _todas(n, tam, tipo)
+    rangos = sorted(random.Random(semilla).sample(range(total), pool))
+    return _mascaras(_desrango(rangos, n, tam), tipo)
+
+
+def _completar(mascaras, pendientes, combos_ganadores, garantia, max_boletos, n, tam):
+    """
+    Si el greedy sobre un pool dejó objetivos sin cubrir, arma boletos a mano:
+    el primer objetivo pendiente + los siguientes que quepan + relleno con
+    los índices más bajos. Cada boleto cubre al menos un pendiente.
+    """
+    total_objetivos = len(combos_ganadores)
+    tipo = combos_ganadores.dtype.type
+    mascaras = list(mascaras)
+    while len(mascaras) < max_boletos:
+        faltan = _indices(pendientes, total_objetivos)
+        if not len(faltan):
+            break
+        boleto = 0
+        for objetivo in combos_ganadores[faltan[:256]]:
+            if (boleto | int(objetivo)).bit_count() <= tam:
+                boleto |= int(objetivo)
+        for i in range(n):
+            if boleto.bit_count() >= tam:
+                break
+            boleto |= 1 << i
+        mascaras.append(tipo(boleto))
+        pendientes &= ~_cubre(tipo(boleto), combos_ganadores, garantia)[0]
+    return mascaras, pendientes
+
+
+def _resolver(n, garantia, aciertos_objetivo, max_boletos, tam, estrategia,
+              tiempo_optimizacion, usar_cache, mejorar, pool=None):
+    """
+    Núcleo común de las ruedas Loto y Kino, en índices locales 0..n-1.
+    Devuelve (máscaras, objetivos pendientes, boletos antes de optimizar,
+    origen, segundos de optimización, estrategia con que se calculó el diseño).
+    La caché no distingue estrategia (guarda el mejor diseño de la forma): si
+    el diseño sale de ahí se informa la estrategia que lo produjo. Con
+    mejorar, una rueda parcial guardada no se usa: se recalcula y la caché se
+    queda con la que más cubra.
+    """
+    total_objetivos = math.comb(n, aciertos_objetivo)
+    guardada = (cache_ruedas.buscar(n, garantia, aciertos_objetivo, max_boletos, tam)
+                if usar_cache else None)
+    if guardada is not None and mejorar and guardada['cubiertos'] < total_objetivos:
+        guardada = None
 
-    cobertura_pct = round(100 * (total_objetivos - len(pendientes)) / total_objetivos, 1)
-    info = {
+    if guardada is not None:
+        mascaras = [sum(1 << i for i in b) for b in guardada['boletos']]
+        n_pendientes = total_objetivos - guardada['cubiertos']
+        estrategia = guardada.get('estrategia', 'desconocida')
+    else:
+        # Todas las formas en que pueden salir 'aciertos_objetivo' de tus números,
+        # como máscaras de bits locales (bit i = numeros[i])
+        combos_ganadores = _todas(n, aciertos_objetivo, _tipo(n))
+        if estrategia == "perezosa":
+            candidatos = _candidatos(n, tam, _tipo(n), pool)
+            mascaras, pendientes = _greedy_perezoso(candidatos, combos_ganadores, garantia, max_boletos)
+            mascaras, pendientes = _completar(mascaras, pendientes, combos_ganadores,
+                                              garantia, max_boletos, n, tam)
+        else:
+            mascaras, pendientes = _greedy_muestreo(n, combos_ganadores, garantia, max_boletos, tam)
+        n_pendientes = int(_bits(pendientes))
+
+    n_greedy = len(mascaras)
+    t0 = time.time()
+    if n_pendientes == 0 and tiempo_optimizacion > 0 and (guardada is None or mejorar):
+        mascaras = optimizar_rueda(mascaras, n, aciertos_objetivo, garantia, tiempo_optimizacion, tam=tam)
+    if usar_cache and (guardada is None or len(mascaras) < n_greedy):
+        cache_ruedas.registrar(n, garantia, aciertos_objetivo, max_boletos,
+                               [_a_numeros(m, list(range(n))) for m in mascaras],
+                               total_objetivos - n_pendientes, tam, estrategia)
+    origen = "guardada" if guardada is not None else "calculada"
+    return mascaras, n_pendientes, n_greedy, origen, round(time.time() - t0, 1), estrategia
+
+
+def _info(numeros, garantia, aciertos_objetivo, resuelta, costo):
+    mascaras, n_pendientes, n_greedy, origen, segundos, estrategia = resuelta
+    total_objetivos = math.comb(len(numeros), aciertos_objetivo)
+    return {
         "grupo": numeros,
-        "n_numeros": n,
+        "n_numeros": len(numeros),
         "garantia": garantia,
         "aciertos_objetivo": aciertos_objetivo,
-        "n_boletos": len(boletos),
-        "costo": len(boletos) * 50,  # RD$50 por boleto Loto
-        "cobertura_pct": cobertura_pct,
+        "estrategia": estrategia,
+        "origen": origen,
+        "n_boletos": len(mascaras),
+        "n_boletos_greedy": n_greedy,
+        "segundos_optimizacion": segundos,
+        "costo": len(mascaras) * costo,
+        "cobertura_pct": round(100 * (total_objetivos - n_pendientes) / total_objetivos, 1),
         "objetivos_totales": total_objetivos,
-        "objetivos_cubiertos": total_objetivos - len(pendientes),
-        "completa": len(pendientes) == 0,
+        "objetivos_cubiertos": total_objetivos - n_pendientes,
+        "completa": n_pendientes == 0,
     }
-    return boletos, info
\ No newline at end of file
+
+
+def generar_rueda(numeros, garantia=3, aciertos_objetivo=4, max_boletos=60,
+                  estrategia=None, tiempo_optimizacion=0, usar_cache=True,
+                  mejorar=False):
+    """
+    numeros: lista de números favoritos (7 a 30 recomendado).
+    garantia: cuántos aciertos garantizamos en al menos 1 boleto (3, 4 o 5).
+    aciertos_objetivo: SI salen esta cantidad de tus números...
+    max_boletos: tope de boletos a generar.
+    estrategia: "perezosa" (lazy greedy sobre todos los boletos, reproducible)
+                o "muestreo" (greedy clásico con 3000 boletos al azar por ronda).
+                None: "perezosa" si el trabajo cabe en TRABAJO_LOTO, si no "muestreo".
+    tiempo_optimizacion: tope en segundos de búsqueda local para quitar boletos
+                a una rueda completa (0, por defecto = solo greedy). Termina
+                antes si se estanca. Ver optimizar_rueda.
+    usar_cache: si ya se calculó una rueda con la misma forma (n, garantía,
+                objetivo, tope), se re-etiqueta al instante (ver cache_ruedas).
+    mejorar: con una rueda guardada completa, igual corre la búsqueda local
+                y guarda el resultado si sale más chica; una parcial guardada
+                se recalcula (queda la que más cubra).
+
+    info['estrategia'] es la que produjo el diseño devuelto: con origen
+    'guardada' o sin estrategia pedida puede no ser "perezosa".
+
+    Devuelve (boletos, info). Usa algoritmo greedy de covering design.
+    """
+    numeros = sorted(set(int(n) for n in numeros))
+    n = len(numeros)
+
+    if n < 6:
+        return [], {"error": "Necesitas al menos 6 números."}
+    if garantia > aciertos_objetivo:
+        return [], {"error": "La garantía no puede ser mayor que los aciertos objetivo."}
+    if aciertos_objetivo > n:
+        return [], {"error": f"Los aciertos objetivo ({aciertos_objetivo}) no pueden superar tu grupo ({n})."}
+    if estrategia is None:
+        trabajo = math.comb(n, 6) * math.comb(n, aciertos_objetivo)
+        estrategia = "perezosa" if trabajo <= TRABAJO_LOTO else "muestreo"
+    if estrategia not in ESTRATEGIAS:
+        return [], {"error": f"Estrategia desconocida: {estrategia}"}
+
+    resuelta = _resolver(n, garantia, aciertos_objetivo, max_boletos, 6, estrategia,
+                         tiempo_optimizacion, usar_cache, mejorar)
+    boletos = [_a_numeros(m, numeros) for m in resuelta[0]]
+    return boletos, _info(numeros, garantia, aciertos_objetivo, resuelta, COSTO_LOTO)
+
+
+def generar_rueda_kino(numeros, garantia=5, aciertos_objetivo=7, max_boletos=30,
+                       tiempo_optimizacion=0, usar_cache=True, mejorar=False, pool=None):
+    """
+    Rueda Super Kino: reparte un grupo de 12 a 30 números (1-80) en boletos
+    de 10, de forma que SI salen 'aciertos_objetivo' de tus números entre
+    los 20 del sorteo, al menos un boleto tiene 'garantia' aciertos.
+    Mismo núcleo que generar_rueda (máscaras locales del grupo, greedy
+    perezoso + búsqueda local). El greedy recorre todos los boletos posibles
+    si el trabajo cabe en TRABAJO_KINO; si no, un pool de POOL_KINO sorteado
+    con semilla fija (reproducible). 'pool' fuerza el tamaño del pool.
+
+    Devuelve (boletos, info) como generar_rueda; info['candidatos'] y
+    info['candidatos_totales'] dicen sobre cuántos boletos trabajó el greedy.
+    """
+    numeros = sorted(set(int(n) for n in numeros if 1 <= int(n) <= 80))
+    n = len(numeros)
+
+    if not 12 <= n <= 30:
+        return [], {"error": "El grupo Kino debe tener entre 12 y 30 números."}
+    if garantia > aciertos_objetivo:
+        return [], {"error": "La garantía no puede ser mayor que los aciertos objetivo."}
+    if garantia > TAM_KINO or aciertos_objetivo > min(n, 20):
+        return [], {"error": f"Los aciertos objetivo ({aciertos_objetivo}) no pueden superar "
+                             f"tu grupo ({n}) ni los 20 números del sorteo."}
+
+    total_boletos = math.comb(n, TAM_KINO)
+    pool, _ = trabajo_kino(n, aciertos_objetivo, pool)
+    resuelta = _resolver(n, garantia, aciertos_objetivo, max_boletos, TAM_KINO, "perezosa",
+                         tiempo_optimizacion, usar_cache, mejorar, pool)
+    boletos = [_a_numeros(m, numeros) for m in resuelta[0]]
+    info = _info(numeros, garantia, aciertos_objetivo, resuelta, COSTO_KINO)
+    info["candidatos"] = total_boletos if pool is None else min(pool, total_boletos)
+    info["candidatos_totales"] = total_boletos
+    return boletos, info
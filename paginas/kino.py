@@ -6,6 +6,9 @@ import pytz
 import modulos.scraper_kino as sk
 import modulos.kino_filtros as kf
 import modulos.gsheets_helper as gsh
+import modulos.combinaciones as comb
+import modulos.wheeling as wheeling
+import modulos.oraculo as oraculo
 
 COLS_BOVEDA_K = ['Fecha Generada', 'Socio'] + [f"N{i}" for i in range(1, 11)]
 NUM_COLS = [f"N{i}" for i in range(1, 11)]
@@ -86,24 +89,7 @@ with st.sidebar:
 
 # --- ORÁCULO KINO ---
 st.subheader("👁️ Oráculo Kino: Radar de Premios")
-aciertos_k = []
-if not df_hist.empty and not df_boveda.empty:
-    for _, j in df_boveda.iterrows():
-        try:
-            mis = [int(j[c]) for c in NUM_COLS]
-            f_gen = str(j['Fecha Generada']).split(' ')[0]
-            for _, s in df_hist[df_hist['Fecha'] >= f_gen].iterrows():
-                sorteo = [int(s[c]) for c in sk.COLS_KINO[1:]]
-                ac = kf.contar_aciertos(mis, sorteo)
-                premio = kf.premio_por_aciertos(ac)
-                if premio > 0:
-                    aciertos_k.append({
-                        "Fecha": s['Fecha'], "Socio": j.get('Socio', 'Tommy'),
-                        "Aciertos": ac, "Premio": premio
-                    })
-        except Exception:
-            continue
-
+aciertos_k = oraculo.radar_kino(df_boveda, df_hist)
 if aciertos_k:
     aciertos_k.sort(key=lambda x: x['Premio'], reverse=True)
     total_premios = sum(a['Premio'] for a in aciertos_k)
@@ -117,7 +103,7 @@ else:
     st.info("Radar vigilando... sin premios detectados aún.")
 
 st.divider()
-t1, t2, t3 = st.tabs(["🎲 Generador", "📂 Bóveda", "📊 Análisis"])
+t1, t_rueda, t2, t3 = st.tabs(["🎲 Generador", "🎡 Rueda", "📂 Bóveda", "📊 Análisis"])
 
 with t1:
     st.subheader("Generar Jugadas Kino (10 de 80)")
@@ -129,7 +115,7 @@ with t1:
 
     if st.button("🚀 Generar Kino", width='stretch', type="primary"):
         with st.spinner("Generando..."):
-            df_nuevas = kf.generar_kino(df_hist, cant_k, [])
+            df_nuevas = kf.generar_kino(df_hist, cant_k, comb.conjunto_df(df_boveda, NUM_COLS), juego='kino')
         if df_nuevas.empty:
             st.error("No se pudieron generar jugadas.")
         else:
@@ -166,6 +152,78 @@ with t1:
         st.dataframe(df_premios, hide_index=True, width='stretch')
         st.caption("⚠️ Montos referenciales. Verifica en tu banca — pueden cambiar.")
 
+with t_rueda:
+    st.subheader("🎡 Rueda Kino (boletos de 10)")
+    st.caption("⚠️ No aumenta la probabilidad de que salgan tus números. Reparte tu grupo "
+               "para asegurar un mínimo de aciertos SI salen suficientes de ellos entre los 20.")
+    nums_txt_k = st.text_input("Tu grupo (12 a 30 números del 1 al 80)",
+                               "3 8 11 17 22 25 31 36 40 44 52 58 63 69 71 77", key="grupo_kino")
+    try:
+        grupo_k = sorted(set(int(x) for x in nums_txt_k.replace(",", " ").split() if 1 <= int(x) <= 80))
+    except ValueError:
+        grupo_k = []
+    cA, cB = st.columns(2)
+    with cA:
+        objetivo_k = st.selectbox("SI salen esta cantidad de mis números...", list(range(5, 11)),
+                                  index=2, key="objetivo_kino")
+    with cB:
+        garantia_k = st.selectbox("...garantízame al menos", list(range(4, 9)), index=1, key="garantia_kino")
+    max_bol_k = st.slider("Máximo de boletos", 5, 100, 30, key="max_bol_kino")
+    seg_opt_k = st.slider("Segundos para achicar la rueda", 0, 30, 3, key="seg_opt_kino")
+
+    interactiva = wheeling.kino_interactiva(len(grupo_k), objetivo_k)
+    if not interactiva:
+        tope_k = max(n for n in range(12, 31) if wheeling.kino_interactiva(n, objetivo_k))
+        st.warning(f"Con {objetivo_k} aciertos objetivo el cálculo tarda demasiado para {len(grupo_k)} "
+                   f"números: usa hasta {tope_k} o baja los aciertos objetivo.")
+
+    if st.button("🎡 Generar Rueda Kino", width='stretch', type="primary", disabled=not interactiva):
+        with st.spinner("Calculando cobertura..."):
+            boletos_k, info_k = wheeling.generar_rueda_kino(
+                grupo_k, garantia=garantia_k, aciertos_objetivo=objetivo_k,
+                max_boletos=max_bol_k, tiempo_optimizacion=seg_opt_k)
+        st.session_state.rueda_kino = (boletos_k, info_k)
+
+    if 'rueda_kino' in st.session_state:
+        boletos_k, info_k = st.session_state.rueda_kino
+        if info_k.get("error"):
+            st.error(info_k["error"])
+        else:
+            m1, m2, m3 = st.columns(3)
+            m1.metric("Boletos", info_k["n_boletos"])
+            m2.metric("Costo (referencial)", f"RD$ {info_k['costo']:,}")
+            m3.metric("Cobertura", f"{info_k['cobertura_pct']}%")
+            if info_k["completa"]:
+                st.success(f"✅ Si salen {info_k['aciertos_objetivo']} de tus {info_k['n_numeros']} números, "
+                           f"un boleto tiene mínimo {info_k['garantia']} aciertos.")
+            else:
+                st.warning("Cobertura parcial. Sube el máximo de boletos para garantía completa.")
+            if info_k["n_boletos"] < info_k["n_boletos_greedy"]:
+                st.caption(f"🔧 Optimización: {info_k['n_boletos_greedy']} → {info_k['n_boletos']} boletos.")
+            if info_k["origen"] == "calculada" and info_k["candidatos"] < info_k["candidatos_totales"]:
+                st.caption(f"🎲 Grupo grande: el greedy probó {info_k['candidatos']:,} de "
+                           f"{info_k['candidatos_totales']:,} boletos posibles (muestra fija). "
+                           "La rueda puede salir 1-2 boletos más grande que con todos.")
+            df_rueda_k = pd.DataFrame(boletos_k, columns=NUM_COLS)
+            st.dataframe(df_rueda_k, hide_index=True, width='stretch')
+            st.caption(f"⚠️ Costo con RD$ {wheeling.COSTO_KINO} por boleto: referencial, verifica en tu banca.")
+
+            if st.button("💾 Guardar rueda en bóveda", key="guardar_rueda_kino"):
+                df_append = pd.DataFrame([[hoy_str, "Rueda"] + list(b) for b in boletos_k],
+                                         columns=COLS_BOVEDA_K)
+                st.session_state.memoria_kino = pd.concat(
+                    [st.session_state.memoria_kino, df_append], ignore_index=True)
+                if not modo_celular and ws is not None:
+                    df_final = pd.concat([df_gsheets, st.session_state.memoria_kino],
+                                         ignore_index=True).drop_duplicates().reset_index(drop=True)
+                    ok, err = gsh.escribir_df(ws, df_final, COLS_BOVEDA_K)
+                    if ok:
+                        st.success(f"✅ {len(df_append)} boletos de rueda guardados en Google Sheets.")
+                    else:
+                        st.warning(f"⚠️ Local. Error: {err}")
+                else:
+                    st.warning("⚠️ Modo Celular: en memoria.")
+
 with t2:
     st.subheader("📂 Bóveda Kino")
     if df_boveda.empty:
@@ -189,7 +247,7 @@ with t3:
     with a2:
         st.subheader("❄️ Top 15 Atrasados")
         if not df_hist.empty:
-            st.dataframe(kf.analizar_atrasados_kino(df_hist).head(15),
+            st.dataframe(kf.analizar_atrasados_kino(df_hist, juego='kino').head(15),
                          hide_index=True, width='stretch')
 
     st.divider()
@@ -8,6 +8,10 @@ import modulos.fisica_filtros as filtros
 import modulos.gsheets_helper as gsh
 import modulos.wheeling as wheeling
 import modulos.analisis_avanzado as av
+import modulos.combinaciones as comb
+import modulos.tabla_loto as tabla_loto
+import modulos.historial as historial
+import modulos.oraculo as oraculo
 
 COLS_BOVEDA = ['Fecha Generada', 'Socio', 'Bola_1', 'Bola_2', 'Bola_3',
                'Bola_4', 'Bola_5', 'Bola_6', 'Loto_Mas', 'Super_Mas', 'Suma']
@@ -72,9 +76,12 @@ else:
     st.caption("☁️ Conectado a Google Sheets")
 
 df_historial = scraper.cargar_datos()
-if not df_historial.empty:
+# El almacén ya entrega fechas ISO; solo el CSV de respaldo puede traer otros formatos
+if not df_historial.empty and not df_historial['Fecha'].str.fullmatch(r'\d{4}-\d{2}-\d{2}').all():
     df_historial['Fecha'] = df_historial['Fecha'].apply(normalizar_fecha_iso)
     df_historial = df_historial.dropna(subset=['Fecha'])
+# Índice único del historial: lo comparten stats, análisis y generadores
+idx_hist = historial.indexar(df_historial)
 
 # --- BANNER DE SORTEO ---
 prox = proximo_sorteo(ahora)
@@ -104,7 +111,7 @@ with st.sidebar:
     st.divider()
     st.subheader("📊 Stats en vivo")
     if not df_historial.empty:
-        stats = filtros.estadisticas_suma(df_historial)
+        stats = filtros.estadisticas_suma(idx_hist)
         st.metric("Suma media", f"{stats['media']}")
         st.metric("Rango típico (±1σ)",
                   f"{int(stats['media']-stats['std'])} - {int(stats['media']+stats['std'])}")
@@ -114,7 +121,7 @@ with st.sidebar:
     st.subheader("🛡️ Filtros de Generación")
     suma_default = (80, 150)
     if not df_historial.empty:
-        stats = filtros.estadisticas_suma(df_historial)
+        stats = filtros.estadisticas_suma(idx_hist)
         suma_default = (max(60, int(stats['media'] - stats['std'])),
                         min(200, int(stats['media'] + stats['std'])))
     rango_suma = st.slider("Rango de Suma", 60, 200, suma_default)
@@ -125,6 +132,22 @@ with st.sidebar:
     descartar_consecutivos = st.checkbox("Filtro Consecutivos", value=True)
     filtro_historico = st.checkbox("Anti-Clones (no repetir ganadores)", value=True)
 
+    with st.spinner("Preparando tabla de combinaciones (solo la primera vez)..."):
+        conteo = tabla_loto.contar_validas(
+            rango_suma, descartar_pares, descartar_terminaciones, descartar_consecutivos,
+            spread_decenas,
+            set(comb.a_enteros(idx_hist.mascaras)) if filtro_historico else None)
+    st.metric("Combinaciones válidas", f"{conteo['validas']:,}",
+              f"{100 * conteo['validas'] / conteo['total']:.1f}% de {conteo['total']:,}",
+              delta_color="off")
+    nombres_filtro = {'suma': 'Rango de suma', 'pares': 'Paridad', 'terminaciones': 'Terminaciones',
+                      'consecutivos': 'Consecutivos', 'bajos': 'Bajos/Altos 6-0',
+                      'decenas': 'Decenas', 'anticlones': 'Anti-Clones'}
+    st.caption("Aflojando cada filtro ganarías: " + " · ".join(
+        f"{nombres_filtro[k]} +{v:,}" for k, v in conteo['quita'].items() if v > 0))
+    if conteo['validas'] == 0:
+        st.error("Ninguna combinación pasa estos filtros.")
+
     st.divider()
     if st.button("🧹 Limpiar memoria temporal", width='stretch'):
         st.session_state.memoria_loto = pd.DataFrame(columns=COLS_BOVEDA)
@@ -132,26 +155,7 @@ with st.sidebar:
 
 # --- ORÁCULO ---
 st.subheader("👁️ El Oráculo: Radar de Aciertos")
-aciertos_detectados = []
-if not df_historial.empty and not df_boveda.empty:
-    for _, mi_j in df_boveda.iterrows():
-        try:
-            mis_nums = {int(mi_j[c]) for c in BOLAS_COLS}
-            f_gen = normalizar_fecha_iso(mi_j['Fecha Generada'])
-            if not f_gen:
-                continue
-            for _, oficial in df_historial[df_historial['Fecha'] >= f_gen].iterrows():
-                hits = mis_nums & {int(oficial[c]) for c in BOLAS_COLS}
-                if len(hits) >= 3:
-                    aciertos_detectados.append({
-                        "Fecha Sorteo": oficial['Fecha'],
-                        "Socio": mi_j.get('Socio', 'Tommy'),
-                        "Aciertos": len(hits),
-                        "Números": sorted(hits)
-                    })
-        except Exception:
-            continue
-
+aciertos_detectados = oraculo.radar_loto(df_boveda, df_historial)
 if aciertos_detectados:
     aciertos_detectados.sort(key=lambda x: x['Aciertos'], reverse=True)
     for a in aciertos_detectados[:10]:
@@ -182,6 +186,12 @@ def guardar_jugadas(df_append, etiqueta="jugadas"):
         st.warning("⚠️ Modo Celular: en memoria. Toma screenshot.")
 
 
+@st.cache_data(show_spinner=False)
+def test_chi_cacheado(version, _idx):
+    """El Monte Carlo tarda ~2 s: se calcula una vez por versión del historial."""
+    return av.test_chi_cuadrado(_idx, semilla=0)
+
+
 def mostrar_con_score(df):
     def color_score(v):
         if v >= 75:
@@ -194,6 +204,28 @@ def mostrar_con_score(df):
     st.caption("🎯 Score: 🟢 75+ alineada con el análisis | 🟡 50-74 | 🔴 <50")
 
 
+@st.cache_data(show_spinner=False)
+def verificar_cacheado(boletos):
+    return wheeling.verificar_rueda(boletos)
+
+
+def mostrar_verificacion(boletos):
+    """Perfil exacto de la rueda contra las 3,838,380 jugadas posibles."""
+    with st.spinner("Verificando contra todas las jugadas posibles..."):
+        res = verificar_cacheado(tuple(tuple(int(x) for x in b) for b in boletos))
+    filas = []
+    for h, minimo in res["minimo"].items():
+        fila = res["matriz"][h]
+        filas.append({"Salen del grupo": h, "Sorteos": int(fila.sum()),
+                      "Mínimo garantizado": minimo,
+                      **{f"Mejor={a}": int(fila[a]) for a in range(7) if res["matriz"][:, a].any()}})
+    st.markdown(f"**🔍 Verificación exacta** ({res['n_boletos']} boletos, grupo de "
+                f"{len(res['grupo'])} números, {res['sorteos']:,} jugadas en {res['segundos']} s)")
+    st.dataframe(pd.DataFrame(filas), hide_index=True, width='stretch')
+    st.caption(" | ".join(f"{a}+ aciertos: {n / res['sorteos']:.3%}" for a, n in res["al_menos"].items()
+                          if a >= 3))
+
+
 with tab1:
     st.subheader("Modo Francotirador")
     c1, c2 = st.columns([2, 1])
@@ -205,9 +237,10 @@ with tab1:
     if st.button("🚀 Generar Jugadas", width='stretch', type="primary"):
         with st.spinner("Procesando matrices..."):
             df_nuevas = filtros.generar_predicciones(
-                df_historial, cant_jug, rango_suma, descartar_pares,
-                descartar_terminaciones, descartar_consecutivos, filtro_historico, [],
-                usar_gauss=usar_gauss, spread_decenas=spread_decenas)
+                idx_hist, cant_jug, rango_suma, descartar_pares,
+                descartar_terminaciones, descartar_consecutivos, filtro_historico,
+                comb.conjunto_df(df_boveda, BOLAS_COLS),
+                usar_gauss=usar_gauss, spread_decenas=spread_decenas, juego='loto')
         if df_nuevas.empty:
             st.error("⚠️ No se pudieron generar jugadas. Afloja los filtros.")
         else:
@@ -226,10 +259,11 @@ with tab2:
     if st.button("🔥 Forjar Bloque", width='stretch', type="primary"):
         total = len(lista_socios) * cant_in
         with st.spinner(f"Generando {total} jugadas..."):
-            df_nuevas = filtros.generar_predicciones(
-                df_historial, total, rango_suma, descartar_pares,
-                descartar_terminaciones, descartar_consecutivos, filtro_historico, [],
-                usar_gauss=usar_gauss, spread_decenas=spread_decenas)
+            df_nuevas = filtros.generar_predicciones_paralelo(
+                idx_hist, total, rango_suma, descartar_pares,
+                descartar_terminaciones, descartar_consecutivos, filtro_historico,
+                comb.conjunto_df(df_boveda, BOLAS_COLS),
+                usar_gauss=usar_gauss, spread_decenas=spread_decenas, juego='loto')
         if len(df_nuevas) < total:
             st.error(f"⚠️ Solo salieron {len(df_nuevas)} de {total}. Afloja filtros.")
         else:
@@ -268,6 +302,11 @@ with tab3:
         garantia = st.selectbox("...garantízame al menos", [3, 4, 5], index=0)
 
     max_bol = st.slider("Máximo de boletos", 5, 100, 40)
+    seg_opt = st.slider("Segundos para achicar la rueda", 0, 30, 3,
+                        help="Búsqueda local después del greedy: intenta quitar boletos sin perder la garantía.")
+    mejorar_rueda = st.checkbox("Seguir mejorando la rueda guardada", value=False,
+                                help="Las ruedas con la misma forma salen al instante de la caché; "
+                                     "marcado, igual se corre la búsqueda local por si baja de boletos.")
 
     if st.button("🎡 Generar Rueda", width='stretch', type="primary"):
         if len(nums_grupo) < 6:
@@ -278,7 +317,8 @@ with tab3:
             with st.spinner("Calculando cobertura óptima..."):
                 boletos, info = wheeling.generar_rueda(
                     nums_grupo, garantia=garantia,
-                    aciertos_objetivo=objetivo, max_boletos=max_bol)
+                    aciertos_objetivo=objetivo, max_boletos=max_bol,
+                    tiempo_optimizacion=seg_opt, mejorar=mejorar_rueda)
 
             if info.get("error"):
                 st.error(info["error"])
@@ -287,6 +327,16 @@ with tab3:
                 m1.metric("Boletos", info["n_boletos"])
                 m2.metric("Costo total", f"RD$ {info['costo']:,}")
                 m3.metric("Cobertura", f"{info['cobertura_pct']}%")
+                if info["origen"] == "guardada":
+                    st.caption(f"⚡ Rueda guardada: misma forma ya calculada antes (estrategia "
+                               f"{info['estrategia']}), re-etiquetada con tus números.")
+                elif info["estrategia"] == "muestreo":
+                    st.caption("🎲 Grupo grande: greedy por muestreo (más rápido que recorrer todos "
+                               "los boletos; la rueda puede salir algo más grande).")
+                if info["n_boletos"] < info["n_boletos_greedy"]:
+                    ahorro = (info["n_boletos_greedy"] - info["n_boletos"]) * 50
+                    st.caption(f"🔧 Optimización: {info['n_boletos_greedy']} → {info['n_boletos']} boletos "
+                               f"(ahorras RD$ {ahorro:,}) en {info['segundos_optimizacion']} s.")
 
                 if info["completa"]:
                     st.success(f"✅ Garantía COMPLETA: si salen {objetivo} de tus "
@@ -298,6 +348,7 @@ with tab3:
                 df_bol = pd.DataFrame(boletos, columns=[f"N{i}" for i in range(1, 7)])
                 df_bol.index = [f"Boleto {i+1}" for i in range(len(boletos))]
                 st.dataframe(df_bol, width='stretch')
+                mostrar_verificacion(boletos)
 
                 # Guardar a bóveda opcional
                 if st.button("💾 Guardar rueda en bóveda"):
@@ -336,29 +387,33 @@ with tab4:
 
         st.caption(f"Mostrando {len(df_filtrado)} jugadas")
 
+        df_show = df_filtrado.sort_values(by="Fecha Generada", ascending=False)
+        # Máximo de aciertos y bolas acertadas por fila, del libro del radar
+        max_ac, bolas_ac = oraculo.marcas_loto(df_show, df_historial, df_boveda)
+        fila_pos = {etiqueta: i for i, etiqueta in enumerate(df_show.index)}
+
         def resaltar(row):
-            f_gen = normalizar_fecha_iso(row['Fecha Generada'])
-            if not f_gen or df_historial.empty:
-                return [''] * len(row)
-            sorteos = df_historial[df_historial['Fecha'] >= f_gen]
-            estilos = [''] * len(row)
-            max_ac = 0
-            for _, s in sorteos.iterrows():
-                gan = {int(s[c]) for c in BOLAS_COLS}
-                ac = 0
-                for i, col in enumerate(row.index):
-                    if col in BOLAS_COLS and pd.notnull(row[col]) and int(row[col]) in gan:
-                        estilos[i] = 'background-color: #FFD700; color: black; font-weight: bold'
-                        ac += 1
-                max_ac = max(max_ac, ac)
-            if max_ac >= 6:
+            i = fila_pos[row.name]
+            if max_ac[i] >= 6:
                 return ['background-color: #FF4B4B; color: white; font-weight: bold'] * len(row)
-            return estilos
+            acertadas = int(bolas_ac[i])
+            return ['background-color: #FFD700; color: black; font-weight: bold'
+                    if col in BOLAS_COLS and pd.notnull(row[col]) and int(row[col]) > 0
+                    and (acertadas >> (int(row[col]) - 1)) & 1
+                    else '' for col in row.index]
 
-        df_show = df_filtrado.sort_values(by="Fecha Generada", ascending=False)
         st.dataframe(df_show.style.apply(resaltar, axis=1), width='stretch', height=400)
         st.caption("🟡 Acierto | 🔴 MATRIZ GANADORA")
 
+        ruedas = df_boveda[df_boveda['Socio'] == "Rueda"]
+        if not ruedas.empty:
+            with st.expander("🎡 Verificar ruedas guardadas"):
+                fecha_rueda = st.selectbox("Rueda del día",
+                    sorted(ruedas['Fecha Generada'].astype(str).unique().tolist(), reverse=True))
+                sel = ruedas[ruedas['Fecha Generada'].astype(str) == fecha_rueda]
+                boletos_sel = sel[BOLAS_COLS].apply(pd.to_numeric, errors='coerce').dropna().astype(int)
+                mostrar_verificacion(boletos_sel.values.tolist())
+
         st.divider()
         st.subheader("📈 Stats por socio")
         stats_socio = df_boveda.groupby('Socio').size().reset_index(name='Jugadas')
@@ -374,33 +429,34 @@ with tab5:
     with a1:
         st.subheader("🔥 Top 10 Calientes (30 sorteos)")
         if not df_historial.empty:
-            df_frec = filtros.analizar_frecuencias(df_historial, ventana_dias=30)
+            df_frec = filtros.analizar_frecuencias(idx_hist, ventana_dias=30)
             st.dataframe(df_frec.sort_values('Apariciones', ascending=False).head(10),
                          hide_index=True, width='stretch')
     with a2:
         st.subheader("❄️ Top 10 Atrasados")
         if not df_historial.empty:
-            st.dataframe(filtros.analizar_atrasados(df_historial).head(10),
+            st.dataframe(filtros.analizar_atrasados(idx_hist, juego='loto').head(10),
                          hide_index=True, width='stretch')
 
     st.divider()
     st.subheader("📊 Mapa de Frecuencias Histórico")
     if not df_historial.empty:
-        df_ft = filtros.analizar_frecuencias(df_historial)
+        df_ft = filtros.analizar_frecuencias(idx_hist)
         df_ft['Bola'] = df_ft['Bola'].astype(str)
         st.bar_chart(df_ft.set_index('Bola'))
 
     st.divider()
     st.subheader("🔗 Pares que más salen juntos")
     if not df_historial.empty:
-        df_pares = av.pares_frecuentes(df_historial, top=15)
+        df_pares = av.pares_frecuentes(idx_hist, top=15)
         st.dataframe(df_pares, hide_index=True, width='stretch')
         st.caption("Parejas de números que más veces han coincidido en un mismo sorteo (por azar, pero curioso).")
 
     st.divider()
     st.subheader("🧪 Test de Imparcialidad (Chi-cuadrado)")
     if not df_historial.empty:
-        res = av.test_chi_cuadrado(df_historial)
+        with st.spinner("Simulando sorteos justos..."):
+            res = test_chi_cacheado(idx_hist.version, idx_hist)
         if res.get("error"):
             st.info(res["error"])
         else:
@@ -409,12 +465,13 @@ with tab5:
                 st.metric("Veredicto", res["veredicto"])
                 st.metric("Estadístico χ²", f"{res['chi2']}")
             with cc2:
-                st.metric("Umbral 'justo' (95%)", f"< {res['critico_95']}")
-                st.caption(f"Basado en {res['sorteos']} sorteos. "
-                           f"Cada número debería salir ~{res['esperado']} veces.")
+                st.metric("p-valor (Monte Carlo)", f"{res['p_chi2']:.3f}")
+                st.caption(f"Basado en {res['sorteos']} sorteos y {res['simulaciones']:,} historias "
+                           f"simuladas. Cada número debería salir ~{res['esperado']} veces.")
             st.info(res["detalle"])
-            st.caption(f"📈 Más frecuente: número {res['mas_sale'][0]} ({res['mas_sale'][1]} veces) · "
-                       f"📉 Menos frecuente: número {res['menos_sale'][0]} ({res['menos_sale'][1]} veces)")
+            st.caption(f"📈 Más frecuente: número {res['mas_sale'][0]} ({res['mas_sale'][1]} veces, p={res['p_mas_sale']:.3f}) · "
+                       f"📉 Menos frecuente: número {res['menos_sale'][0]} ({res['menos_sale'][1]} veces, p={res['p_menos_sale']:.3f}) · "
+                       f"🔗 Par más repetido: {res['par_max']} veces (p={res['p_par']:.3f})")
 
     st.divider()
     st.subheader("📜 Últimos 30 sorteos oficiales")
@@ -85,11 +85,9 @@ def _leer_nube():
         ws, _ = gsh.conectar_worksheet(HOJA_NUBE)
         if ws is None:
             return pd.DataFrame()
-        regs = ws.get_all_records()
-        df = pd.DataFrame(regs)
+        df = gsh.leer_df(ws, COLUMNAS)
         if df.empty:
             return pd.DataFrame()
-        df = df.reindex(columns=COLUMNAS)
         df['Fecha'] = df['Fecha'].astype(str).str.strip()
         return df
     except Exception:
@@ -102,9 +100,8 @@ def _escribir_nube(df):
         ws, _ = gsh.conectar_worksheet(HOJA_NUBE)
         if ws is None:
             return False
-        ws.clear()
-        ws.update([COLUMNAS] + df[COLUMNAS].astype(str).values.tolist())
-        return True
+        ok, _ = gsh.escribir_df(ws, df[COLUMNAS].astype(str), COLUMNAS)  # solo las filas nuevas
+        return ok
     except Exception:
         return False
 
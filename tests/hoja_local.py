@@ -0,0 +1,50 @@
+import itertools
+
+import modulos.hojas as hojas
+
+_ids = itertools.count(1)
+
+
+class HojaLocal:
+    """Hoja en memoria con la parte de la API de gspread que usa modulos.hojas; anota cada llamada."""
+
+    def __init__(self, valores=None, title="Hoja1"):
+        self.valores = [list(f) for f in (valores or [])]
+        self.title = title
+        self.id = next(_ids)
+        self.llamadas = []
+
+    def get_all_values(self):
+        self.llamadas.append(('get_all_values',))
+        return [[hojas._celda(v) for v in f] for f in self.valores]
+
+    def get_all_records(self):
+        self.llamadas.append(('get_all_records',))
+        if not self.valores:
+            return []
+        encabezado = self.valores[0]
+        return [dict(zip(encabezado, f + [""] * (len(encabezado) - len(f)))) for f in self.valores[1:]]
+
+    def append_rows(self, values, value_input_option='RAW', table_range=None):
+        self.llamadas.append(('append_rows', len(values)))
+        self.valores.extend(list(f) for f in values)
+
+    def insert_rows(self, values, row=1, value_input_option='RAW'):
+        self.llamadas.append(('insert_rows', len(values)))
+        self.valores[row - 1:row - 1] = [list(f) for f in values]
+
+    def update_cell(self, row, col, value):
+        self.llamadas.append(('update_cell', row, col))
+        while len(self.valores) < row:
+            self.valores.append([])
+        fila = self.valores[row - 1]
+        fila.extend([""] * (col - len(fila)))
+        fila[col - 1] = value
+
+    def clear(self):
+        self.llamadas.append(('clear',))
+        self.valores = []
+
+    def update(self, values):
+        self.llamadas.append(('update', len(values)))
+        self.valores = [list(f) for f in values]
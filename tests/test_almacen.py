@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+
+import modulos.almacen as almacen
+
+COLS = almacen.columnas('loto')
+
+
+@pytest.fixture
+def data_tmp(tmp_path, monkeypatch):
+    monkeypatch.setattr(almacen, 'RUTA_DATA', str(tmp_path))
+    monkeypatch.setattr(almacen, '_abiertos', {})
+    monkeypatch.setattr(almacen, '_dfs', {})
+    return tmp_path
+
+
+def _csv(ruta, filas):
+    pd.DataFrame(filas, columns=COLS).to_csv(ruta, index=False)
+
+
+def test_importa_fechas_no_iso_y_bolas_vacias(data_tmp):
+    ruta = data_tmp / 'historial_loto.csv'
+    _csv(ruta, [['2026-01-03', 1, 2, 3, 4, 5, 6, 7, 8],
+                ['01/07/2026', 11, 12, 13, 14, 15, 16, 9, 10],
+                ['2026-01-10', 21, 22, None, 24, 25, 26, 1, None],
+                ['sin fecha', 31, 32, 33, 34, 35, 36, 1, 1]])
+    df = almacen.abrir_df('loto', str(ruta))
+    assert list(df['Fecha']) == ['2026-01-10', '2026-01-07', '2026-01-03']
+    assert list(df.iloc[0]) == ['2026-01-10', 21, 22, 0, 24, 25, 26, 1, 0]
+
+
+def test_abrir_df_reparte_copias_y_toma_lo_nuevo_del_csv(data_tmp):
+    ruta = data_tmp / 'historial_loto.csv'
+    filas = [['2026-01-03', 1, 2, 3, 4, 5, 6, 7, 8]]
+    _csv(ruta, filas)
+    df = almacen.abrir_df('loto', str(ruta))
+    df.loc[0, 'Bola_1'] = 40
+    assert almacen.abrir_df('loto', str(ruta)).loc[0, 'Bola_1'] == 1
+
+    _csv(ruta, filas + [['2026-01-07', 11, 12, 13, 14, 15, 16, 9, 10]])
+    assert list(almacen.abrir_df('loto', str(ruta))['Fecha']) == ['2026-01-07', '2026-01-03']
+
+
+def test_csv_editado_a_mano_rehace_el_almacen(data_tmp):
+    ruta = data_tmp / 'historial_loto.csv'
+    filas = [['2026-01-03', 1, 2, 3, 4, 5, 6, 7, 8],
+             ['2026-01-07', 11, 12, 13, 14, 15, 16, 9, 10],
+             ['2026-01-10', 21, 22, 23, 24, 25, 26, 1, 2]]
+    _csv(ruta, filas)
+    almacen.abrir_df('loto', str(ruta))
+
+    # corrige una bola y borra un sorteo
+    _csv(ruta, [['2026-01-03', 1, 2, 3, 4, 5, 9, 7, 8], filas[2]])
+    df = almacen.abrir_df('loto', str(ruta))
+    assert list(df['Fecha']) == ['2026-01-10', '2026-01-03']
+    assert df.loc[1, 'Bola_6'] == 9
+
+    # y exportar no le devuelve lo viejo al CSV
+    assert almacen.exportar_csv('loto', str(ruta))
+    assert pd.read_csv(ruta).values.tolist() == df.values.tolist()
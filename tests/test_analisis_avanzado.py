@@ -0,0 +1,63 @@
+import os
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import modulos.analisis_avanzado as aa
+
+RUTA_CSV = os.path.join(os.path.dirname(__file__), '..', 'data', 'historial_loto.csv')
+
+
+@pytest.fixture(scope="module")
+def historial():
+    return pd.read_csv(RUTA_CSV)
+
+
+def _pares_a_mano(df, vida_media=None):
+    m = np.zeros((40, 40))
+    df = df.assign(_f=pd.to_datetime(df['Fecha'])).sort_values('_f', ascending=False, kind='stable')
+    for edad, (_, fila) in enumerate(df.iterrows()):
+        peso = 0.5 ** (edad / vida_media) if vida_media else 1
+        for a, b in combinations(sorted(int(fila[c]) for c in aa.BOLAS), 2):
+            m[a - 1, b - 1] += peso
+            m[b - 1, a - 1] += peso
+    return m
+
+
+def test_coocurrencia_igual_a_contar_pares(historial):
+    np.testing.assert_array_equal(aa.coocurrencia(historial), _pares_a_mano(historial))
+    np.testing.assert_allclose(aa.coocurrencia(historial, vida_media=25), _pares_a_mano(historial, 25))
+    fechas = pd.to_datetime(historial['Fecha'])
+    ventana = historial[(fechas >= '2025-01-01') & (fechas <= '2025-06-30')]
+    np.testing.assert_array_equal(aa.coocurrencia(historial, '2025-01-01', '2025-06-30'),
+                                  _pares_a_mano(ventana))
+
+
+def _estadisticos_a_mano(sorteos):
+    conteo = np.zeros(40)
+    pares = {}
+    for s in sorteos:
+        for x in s:
+            conteo[x] += 1
+        for par in combinations(sorted(s), 2):
+            pares[par] = pares.get(par, 0) + 1
+    esperado = len(sorteos) * 6 / 40.0
+    return ((conteo - esperado) ** 2 / esperado).sum(), conteo.max(), conteo.min(), max(pares.values())
+
+
+def test_pvalores_igual_a_simular_historia_por_historia(historial):
+    X, _ = aa._incidencia(historial)
+    X = X[:60]
+    res = aa.pvalores_montecarlo(X, simulaciones=300, tiempo_max=60, tolerancia=0, semilla=5)
+
+    obs = _estadisticos_a_mano([np.flatnonzero(f) for f in X])
+    claves = np.random.default_rng(5).random((300, len(X), 40))
+    extremos = np.zeros(4)
+    for historia in claves:
+        chi2, mx, mn, pm = _estadisticos_a_mano([np.argsort(c)[:6] for c in historia])
+        extremos += [chi2 >= obs[0] - 1e-9, mx >= obs[1], mn <= obs[2], pm >= obs[3]]
+    p = (1 + extremos) / 301
+    assert res['simulaciones'] == 300 and res['par_max'] == obs[3]
+    assert [res[k] for k in ('p_chi2', 'p_mas_sale', 'p_menos_sale', 'p_par')] == list(np.round(p, 4))
@@ -0,0 +1,66 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import modulos.atrasados as atrasados
+import modulos.fisica_filtros as filtros
+import modulos.historial as historial
+
+RUTA_CSV = os.path.join(os.path.dirname(__file__), '..', 'data', 'historial_loto.csv')
+
+
+@pytest.fixture
+def data_tmp(tmp_path, monkeypatch):
+    monkeypatch.setattr(atrasados, 'RUTA_DATA', str(tmp_path))
+    monkeypatch.setattr(atrasados, '_estados', {})
+    return tmp_path
+
+
+@pytest.fixture(scope="module")
+def df():
+    return pd.read_csv(RUTA_CSV)
+
+
+def _a_fuerza_bruta(df):
+    """Sorteos sin salir de cada número, recorriendo del más reciente al más viejo."""
+    idx = historial.indexar(df)
+    return np.array([next((i for i, s in enumerate(idx.sorteos) if n in s), len(idx))
+                     for n in range(1, 41)])
+
+
+def test_analisis_por_defecto_no_toca_disco(data_tmp, df):
+    filtros.analizar_atrasados(df.iloc[50:])
+    filtros.generar_predicciones(df.iloc[50:], 5, (90, 160), True, True, True, True, set(), semilla=0)
+    assert list(data_tmp.iterdir()) == []
+
+
+def test_recorte_no_pisa_el_estado_guardado(data_tmp, df):
+    filtros.analizar_atrasados(df, juego='loto')
+    filtros.analizar_atrasados(df.iloc[50:])
+    atrasados._estados.clear()
+    assert atrasados.cargar('loto')['total'] == len(df)
+
+
+def test_incremental_igual_a_reconstruir(data_tmp, df):
+    df = df.sort_values('Fecha').reset_index(drop=True)
+    bolas = df[filtros.BOLAS_COLS].values
+    atrasados.sincronizar('loto', df['Fecha'].values[:150], bolas[:150])
+    estado = atrasados.sincronizar('loto', df['Fecha'].values, bolas)
+    completo = atrasados.reconstruir(df['Fecha'].values, bolas, 40)
+    assert estado == completo
+    np.testing.assert_array_equal(atrasados.sin_salir(estado), _a_fuerza_bruta(df))
+
+
+def test_fechas_vacias_no_fuerzan_reconstruir(data_tmp, df, monkeypatch):
+    fechas = df['Fecha'].astype(object).values.copy()
+    fechas[[3, 40]] = [None, 'sin fecha']
+    bolas = df[filtros.BOLAS_COLS].values
+    estado = atrasados.sincronizar('loto', fechas, bolas)
+    assert estado['total'] == len(df) - 2
+
+    def no_guardar(*args):
+        raise AssertionError("sincronizar volvió a escribir un estado al día")
+    monkeypatch.setattr(atrasados, 'guardar', no_guardar)
+    assert atrasados.sincronizar('loto', fechas, bolas) is estado
@@ -0,0 +1,56 @@
+import os
+import random
+
+import numpy as np
+import pandas as pd
+
+import modulos.backtest as bt
+
+RUTA_CSV = os.path.join(os.path.dirname(__file__), '..', 'data', 'historial_loto.csv')
+AZAR = dict(bt.CONFIG_LOTO, generador='azar', cantidad=5, premios={'3': 100})
+
+
+def _kino(n=40):
+    rng = np.random.default_rng(1)
+    bolas = np.argsort(rng.random((n, 80)), axis=1)[:, :20] + 1
+    df = pd.DataFrame(np.sort(bolas, axis=1), columns=bt.BOLAS_KINO)
+    df.insert(0, 'Fecha', pd.date_range('2024-01-01', periods=n).strftime('%Y-%m-%d'))
+    return df
+
+
+def test_retoma_y_resume(tmp_path):
+    df = pd.read_csv(RUTA_CSV)
+    salida = str(tmp_path / 'loto.jsonl')
+    configs = [AZAR, dict(AZAR, cantidad=3)]
+    fechas = sorted(df['Fecha'])[30:42]
+    args = dict(min_previos=30, procesos=1, hasta=fechas[-1])
+
+    assert bt.correr('loto', df, configs, salida, hasta=fechas[5], min_previos=30, procesos=1) == 12
+    with open(salida, 'a', encoding='utf-8') as fh:
+        fh.write('{"config": "cortada')  # corte a mitad de escritura
+    assert bt.correr('loto', df, configs, salida, **args) == 12  # solo las fechas que faltaban
+    assert bt.correr('loto', df, configs, salida, **args) == 0
+
+    res = bt.resumen(salida).set_index('cantidad')
+    assert list(res['pasos']) == [12, 12]
+    assert res.loc[5, 'boletos'] == 60 and res.loc[3, 'boletos'] == 36
+    niveles = [f"A{a}" for a in range(7)]
+    assert (res[niveles].sum(axis=1) == res['boletos']).all()
+    assert (res['premios'] == res['A3'] * 100).all()
+    assert (res['costo'] == res['boletos'] * 50).all()
+    assert res.loc[5, 'roi'] == round((res.loc[5, 'premios'] - res.loc[5, 'costo']) / res.loc[5, 'costo'], 4)
+    media = (res[niveles].values @ np.arange(7)) / res['boletos'].values
+    assert np.allclose(res['media_aciertos'], media.round(4))
+
+
+def test_kino_no_toca_el_random_global(tmp_path):
+    df = _kino()
+    random.seed(123)
+    esperado = random.random()
+    random.seed(123)
+    salidas = [str(tmp_path / f'kino{i}.jsonl') for i in range(2)]
+    for salida in salidas:
+        assert bt.correr('kino', df, [bt.CONFIG_KINO], salida, min_previos=35, procesos=1) == 5
+    assert random.random() == esperado
+    a, b = (bt.resumen(s) for s in salidas)
+    pd.testing.assert_frame_equal(a, b)
@@ -0,0 +1,98 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import modulos.combinaciones as comb
+import modulos.fisica_filtros as filtros
+import modulos.wheeling as wheeling
+
+# atrasados[5:10] comparte 5, 6 y 7 con calientes: ejercita el choque en 'mixta'
+CALIENTES = list(range(1, 19))
+ATRASADOS = [30, 31, 32, 33, 34, 5, 6, 7, 35, 36, 37, 38, 39, 40, 8]
+MUESTRAS = 200000
+
+
+@pytest.fixture(scope="module")
+def todas():
+    return wheeling._todas(40, 6)
+
+
+def _llave(masks):
+    """Resumen de una jugada: cuántos números tiene de cada lista/pool."""
+    pools = filtros._pools(CALIENTES, ATRASADOS)
+    llave = np.zeros(len(masks), dtype=np.int64)
+    for nums in (CALIENTES, ATRASADOS, pools['cal_pool'], pools['atr_pool']):
+        llave = llave * 7 + comb.popcount(masks & np.uint64(comb.codificar(nums))).astype(np.int64)
+    return llave
+
+
+def test_muestreo_respeta_recetas():
+    rng = np.random.default_rng(0)
+    hot = comb.codificar(CALIENTES)
+    atr = comb.codificar(ATRASADOS)
+    for modo in filtros.MODOS:
+        lote = filtros._muestrear_lote(rng, 5000, modo, CALIENTES, ATRASADOS)
+        assert (np.diff(lote, axis=1) > 0).all() and lote.min() >= 1 and lote.max() <= 40
+        masks = comb.codificar_lote(lote)
+        if modo == 'calientes':
+            assert (comb.popcount(masks & np.uint64(hot)) == 5).all()
+        if modo == 'atrasados':
+            assert (comb.popcount(masks & np.uint64(atr)) == 3).all()
+
+
+@pytest.mark.parametrize("modo", filtros.MODOS)
+def test_pesos_coinciden_con_muestreo(todas, modo):
+    pesos = filtros._pesos_por_modo(todas, CALIENTES, ATRASADOS)[modo]
+    assert pesos.sum() == pytest.approx(1.0)
+
+    llaves = _llave(todas)
+    esperado = np.bincount(llaves, weights=pesos, minlength=7 ** 4)
+    lote = filtros._muestrear_lote(np.random.default_rng(1), MUESTRAS, modo, CALIENTES, ATRASADOS)
+    observado = np.bincount(_llave(comb.codificar_lote(lote)), minlength=7 ** 4) / MUESTRAS
+
+    tolerancia = 5 * np.sqrt(esperado * (1 - esperado) / MUESTRAS) + 1e-4
+    assert (np.abs(observado - esperado) <= tolerancia).all()
+
+
+def test_pesos_modos_es_la_mezcla(todas):
+    masks = todas[::997]
+    por_modo = filtros._pesos_por_modo(masks, CALIENTES, ATRASADOS)
+    np.testing.assert_allclose(filtros._pesos_modos(masks, CALIENTES, ATRASADOS),
+                               sum(por_modo.values()) / 4)
+
+
+def test_evaluar_combinacion_acepta_sets_de_numeros():
+    jugada = [3, 11, 17, 24, 32, 38]
+    args = ((90, 160), True, True, True)
+    assert filtros.evaluar_combinacion(jugada, *args, set(), set())
+    # formato viejo: lista de sets; y máscaras como enteros de NumPy
+    assert not filtros.evaluar_combinacion(jugada, *args, [set(jugada)], [])
+    assert not filtros.evaluar_combinacion(jugada, *args, set(), {np.uint64(comb.codificar(jugada))})
+
+
+def test_muestrear_exacto_ignora_mascaras_incompletas():
+    jugada = [3, 11, 17, 24, 32, 38]
+    excluir = {comb.codificar(jugada), comb.codificar([5, 9, 21, 30, 33])}
+    stats = {'media': 123.0, 'std': 25.0}
+    lote = filtros.muestrear_exacto(50, (90, 160), True, True, True, excluir,
+                                    CALIENTES, ATRASADOS, stats, rng=np.random.default_rng(0))
+    assert len(lote) == 50
+    assert jugada not in lote.tolist()
+
+
+def test_paralelo_sin_repetidas_y_registra_previas():
+    df = pd.read_csv(os.path.join(os.path.dirname(__file__), '..', 'data', 'historial_loto.csv'))
+    previas = set()
+    out = filtros.generar_predicciones_paralelo(df, 2 * filtros.MIN_POR_PROCESO, (90, 160), True, True,
+                                                True, True, previas, semilla=3, procesos=2)
+    masks = comb.a_enteros(comb.codificar_lote(out[filtros.BOLAS_COLS].values))
+    assert len(out) == len(set(masks)) == 2 * filtros.MIN_POR_PROCESO
+    assert previas == set(masks)
+
+
+def test_como_conjunto_no_copia_sets_de_mascaras():
+    mascaras = {comb.codificar([1, 2, 3, 4, 5, 6])}
+    assert comb.como_conjunto(mascaras) is mascaras
+    assert comb.como_conjunto([{1, 2, 3, 4, 5, 6}]) == mascaras
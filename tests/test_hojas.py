@@ -0,0 +1,53 @@
+import modulos.hojas as hojas
+from hoja_local import HojaLocal
+
+ENCABEZADO = ['Fecha', 'N1']
+
+
+def test_boveda_agrega_al_final_y_cuenta_repetidas():
+    ws = HojaLocal([ENCABEZADO, ['2026-01-01', 5]])
+    # la misma jugada dos veces el mismo día son dos filas
+    filas = [['2026-01-01', 5], ['2026-01-02', 7], ['2026-01-02', 7]]
+    assert hojas.escribir(ws, filas, ENCABEZADO) == (2, 'append')
+    assert hojas.escribir(ws, filas, ENCABEZADO) == (0, 'nada')
+    assert ws.valores[1:] == filas
+    assert ws.llamadas == [('get_all_values',), ('append_rows', 2)]
+
+
+def test_historial_reciente_primero_inserta_arriba():
+    ws = HojaLocal([ENCABEZADO, ['2026-01-03', 9], ['2026-01-01', 5]])
+    filas = [['2026-01-07', 2], ['2026-01-05', 4], ['2026-01-03', 9], ['2026-01-01', 5]]
+    assert hojas.escribir(ws, filas, ENCABEZADO) == (2, 'inicio')
+    assert ws.valores[1:] == filas
+
+
+def test_borrar_o_reordenar_reescribe():
+    ws = HojaLocal([ENCABEZADO, ['2026-01-01', 5], ['2026-01-01', 5], ['2026-01-02', 7]])
+    assert hojas.escribir(ws, [['2026-01-01', 5], ['2026-01-02', 7]], ENCABEZADO) == (2, 'completa')
+    assert hojas.escribir(ws, [['2026-01-02', 7], ['2026-01-01', 5]], ENCABEZADO) == (2, 'completa')
+    assert ws.valores == [ENCABEZADO, ['2026-01-02', 7], ['2026-01-01', 5]]
+
+
+def test_marcar_da_versiones_nuevas_sin_tocar_otras_hojas():
+    hv = HojaLocal([['Kino', '7']], title='_versiones')
+    assert hojas.version(hv, 'Loto') == "0"
+    vistas = {hojas.version(hv, 'Loto')}
+    for _ in range(3):
+        hojas.marcar(hv, 'Loto')
+        assert hojas.version(hv, 'Loto') not in vistas
+        vistas.add(hojas.version(hv, 'Loto'))
+    assert hojas.version(hv, 'Kino') == '7'
+    assert [f[0] for f in hv.valores] == ['Kino', 'Loto']
+
+
+def test_leer_relee_solo_si_cambia_la_version():
+    hv = HojaLocal(title='_versiones')
+    ws = HojaLocal([ENCABEZADO, ['2026-01-01', 5]])
+    version = lambda: hojas.version(hv, ws.title)
+    assert len(hojas.leer(ws, ENCABEZADO, version, ahora=0)) == 1
+    assert len(hojas.leer(ws, ENCABEZADO, version, ahora=hojas.TTL + 1)) == 1
+    assert ws.llamadas.count(('get_all_records',)) == 1
+
+    ws.valores.append(['2026-01-02', 7])  # otra instancia escribe y marca
+    hojas.marcar(hv, ws.title)
+    assert len(hojas.leer(ws, ENCABEZADO, version, ahora=2 * hojas.TTL + 2)) == 2
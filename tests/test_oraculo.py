@@ -0,0 +1,130 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import modulos.oraculo as oraculo
+
+RUTA_CSV = os.path.join(os.path.dirname(__file__), '..', 'data', 'historial_loto.csv')
+
+
+@pytest.fixture
+def data_tmp(tmp_path, monkeypatch):
+    monkeypatch.setattr(oraculo, 'RUTA_DATA', str(tmp_path))
+    monkeypatch.setattr(oraculo, '_libros', {})
+    monkeypatch.setattr(oraculo, '_ultimo', {})
+    return tmp_path
+
+
+@pytest.fixture(scope="module")
+def historial():
+    return pd.read_csv(RUTA_CSV)
+
+
+def _boveda(historial, filas, socio):
+    df = historial.iloc[filas][['Fecha'] + oraculo.BOLAS_COLS].rename(columns={'Fecha': 'Fecha Generada'})
+    df.insert(1, 'Socio', socio)
+    return df.reset_index(drop=True)
+
+
+def test_cada_sesion_tiene_su_libro(data_tmp, historial):
+    sheets = _boveda(historial, range(0, 40, 4), 'Tommy')
+    sesion_a = sheets
+    sesion_b = pd.concat([sheets, _boveda(historial, [60], 'Ana')], ignore_index=True)
+
+    cruzadas = []
+
+    def detectar(df_boveda, df_historial):
+        cruzadas.append(len(df_boveda))
+        return oraculo._detectar_loto(df_boveda, df_historial)
+
+    for boveda in (sesion_a, sesion_b, sesion_a, sesion_b):
+        assert (oraculo.radar('loto', boveda, historial, oraculo.BOLAS_COLS, detectar)
+                == oraculo.aciertos_loto(boveda, historial))
+    # B arranca del libro de A y solo cruza su jugada extra; después nadie recalcula
+    assert cruzadas == [len(sesion_a), 1]
+    assert len(list(data_tmp.iterdir())) == 2
+
+    oraculo._libros.clear()
+    claves_a = oraculo._claves(sesion_a, oraculo.BOLAS_COLS)
+    libro_a = oraculo.cargar_libro('loto', oraculo.huella(claves_a))
+    assert set(libro_a['jugadas']) == set(claves_a)
+
+
+def test_marcas_salen_del_libro(data_tmp, historial, monkeypatch):
+    boveda = _boveda(historial, range(0, 60, 3), 'Tommy')
+    boveda.loc[3, 'Bola_3'] = None  # celda vacía: el libro no la conoce
+    esperado = oraculo._resumir_loto(boveda, historial)
+    oraculo.radar_loto(boveda, historial)
+
+    def no_cruzar(*args):
+        raise AssertionError("marcas_loto volvió a cruzar toda la bóveda")
+    monkeypatch.setattr(oraculo, '_detectar_loto', no_cruzar)
+    filas = boveda.iloc[::-2]
+    maximo, bolas = oraculo.marcas_loto(filas, historial, boveda)
+    np.testing.assert_array_equal(maximo, esperado[0][::-2])
+    np.testing.assert_array_equal(bolas, esperado[1][::-2])
+    assert maximo.max() == 6
+
+
+def _aciertos_a_mano(df_boveda, df_historial):
+    sorteos = [(f, pd.to_datetime(f), set(b)) for f, *b in
+               df_historial[['Fecha'] + oraculo.BOLAS_COLS].itertuples(index=False)]
+    out = []
+    for _, jugada in df_boveda.iterrows():
+        nums = pd.to_numeric(jugada[oraculo.BOLAS_COLS], errors='coerce')
+        generada = pd.to_datetime(jugada['Fecha Generada'], errors='coerce')
+        if nums.isna().any() or pd.isna(generada):
+            continue
+        for fecha, dia, bolas in sorteos:
+            comunes = set(nums.astype(int)) & bolas
+            if dia >= generada.normalize() and len(comunes) >= 3:
+                out.append({"Fecha Sorteo": fecha, "Socio": jugada['Socio'],
+                            "Aciertos": len(comunes), "Números": sorted(comunes)})
+    return out
+
+
+def _boveda_azar(historial, n, semilla):
+    rng = np.random.default_rng(semilla)
+    azar = np.sort(np.argsort(rng.random((n, 40)), axis=1)[:, :6] + 1, axis=1)
+    boveda = pd.DataFrame(azar, columns=oraculo.BOLAS_COLS)
+    boveda.insert(0, 'Fecha Generada', rng.choice(historial['Fecha'].values, n))
+    boveda.insert(1, 'Socio', rng.choice(['Tommy', 'Ana'], n))
+    return pd.concat([boveda, _boveda(historial, range(5, 150, 10), 'Ana')], ignore_index=True)
+
+
+def test_aciertos_loto_igual_al_doble_bucle(historial):
+    boveda = _boveda_azar(historial, 150, 11)
+    boveda.loc[2, 'Bola_4'] = None
+    boveda.loc[7, 'Fecha Generada'] = 'sin fecha'
+    boveda.loc[9, 'Fecha Generada'] = '2024-05-01 18:30:00'
+
+    esperado = _aciertos_a_mano(boveda, historial)
+    assert oraculo.aciertos_loto(boveda, historial) == esperado
+    assert {r['Aciertos'] for r in esperado} == {3, 4, 5, 6}
+
+
+def test_radar_incremental_igual_a_recalcular(data_tmp, historial, monkeypatch):
+    boveda = _boveda_azar(historial, 120, 12)
+    reciente = historial.sort_values('Fecha').tail(40)
+    viejo = historial.drop(reciente.index)
+    pasos = [(boveda.iloc[:100], viejo),
+             (boveda, historial),                              # jugadas y sorteos nuevos
+             (boveda, historial.drop(viejo.index[10])),        # sorteo viejo borrado: se rehace
+             (pd.concat([boveda.iloc[20:], boveda.iloc[[30]]]), historial)]  # quitadas y repetida
+    esperados = [oraculo.aciertos_loto(b, h) for b, h in pasos]
+
+    cruces = []
+    original = oraculo._detectar_loto
+
+    def detectar(df_boveda, df_historial):
+        cruces.append((len(df_boveda), len(df_historial)))
+        return original(df_boveda, df_historial)
+    monkeypatch.setattr(oraculo, '_detectar_loto', detectar)
+
+    for i, ((b, h), esperado) in enumerate(zip(pasos, esperados)):
+        del cruces[:]
+        assert oraculo.radar_loto(b, h) == esperado
+        if i == 1:
+            assert cruces and all(n_j <= len(boveda) - 100 or n_s <= len(reciente) for n_j, n_s in cruces)
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+import modulos.combinaciones as comb
+import modulos.historial as historial
+import modulos.tabla_loto as tabla_loto
+
+FILTROS = ((90, 160), True, True, True, True)
+
+
+def test_contar_validas_ignora_sorteos_con_bola_vacia():
+    df = pd.DataFrame([['2026-01-03', 3, 11, 17, 24, 32, 38], ['2026-01-07', 5, 9, 0, 21, 30, 33]],
+                      columns=['Fecha'] + [f"Bola_{i}" for i in range(1, 7)])
+    excluir = set(comb.a_enteros(historial.indexar(df).mascaras))
+    conteo = tabla_loto.contar_validas(*FILTROS, excluir)
+    assert conteo['quita']['anticlones'] == 1
+    assert conteo['validas'] == tabla_loto.contar_validas(*FILTROS)['validas'] - 1
+
+
+def test_bolas_de_solo_jugadas_completas():
+    mascaras = [comb.codificar([1, 2, 3, 4, 5, 6]), comb.codificar([1, 2, 3, 4, 5]), 0]
+    np.testing.assert_array_equal(tabla_loto.bolas_de(mascaras), [[1, 2, 3, 4, 5, 6]])
+    assert tabla_loto.bolas_de([]).shape == (0, 6)
+
+
+def test_indice_es_la_fila_de_la_tabla():
+    tabla = tabla_loto.abrir_tabla()
+    rng = np.random.default_rng(7)
+    jugadas = np.sort(np.argsort(rng.random((500, 40)), axis=1)[:, :6] + 1, axis=1)
+    jugadas = np.vstack([[1, 2, 3, 4, 5, 6], [35, 36, 37, 38, 39, 40], jugadas])
+    filas = tabla_loto.indice(jugadas)
+    assert filas[0] == 0 and filas[1] == tabla_loto.TOTAL - 1
+    np.testing.assert_array_equal(tabla['bolas'][filas], jugadas)
+    np.testing.assert_array_equal(tabla['mask'][filas], comb.codificar_lote(jugadas))
+    assert tabla_loto.indice(jugadas[2]) == filas[2]
@@ -0,0 +1,107 @@
+import math
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+import modulos.cache_ruedas as cache_ruedas
+import modulos.wheeling as wheeling
+
+NUMEROS = [3, 7, 11, 15, 19, 23, 27, 31, 35, 39]
+
+
+@pytest.fixture(autouse=True)
+def cache_tmp(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_ruedas, 'RUTA', str(tmp_path / 'ruedas.json'))
+    monkeypatch.setattr(cache_ruedas, '_disenos', None)
+
+
+def test_rueda_completa_cubre_todo():
+    boletos, info = wheeling.generar_rueda(NUMEROS, 3, 4, 60, tiempo_optimizacion=0)
+    assert info["completa"]
+    indices = [[NUMEROS.index(x) for x in b] for b in boletos]
+    assert wheeling.cobertura_diseno(indices, len(NUMEROS), 3, 4) == info["objetivos_totales"]
+
+
+def test_guardada_informa_la_estrategia_que_la_produjo():
+    wheeling.generar_rueda(NUMEROS, 3, 4, 60, estrategia="perezosa", tiempo_optimizacion=0)
+    _, info = wheeling.generar_rueda(NUMEROS, 3, 4, 60, estrategia="muestreo", tiempo_optimizacion=0)
+    assert info["origen"] == "guardada"
+    assert info["estrategia"] == "perezosa"
+
+
+def test_mejorar_recalcula_la_parcial_guardada():
+    # parcial mala a mano: un boleto que cubre poco
+    cache_ruedas.registrar(len(NUMEROS), 3, 4, 3, [[0, 1, 2, 3, 4, 5]], 1, estrategia="muestreo")
+    _, info = wheeling.generar_rueda(NUMEROS, 3, 4, 3, tiempo_optimizacion=0)
+    assert info["origen"] == "guardada"
+    _, info = wheeling.generar_rueda(NUMEROS, 3, 4, 3, tiempo_optimizacion=0, mejorar=True)
+    assert info["origen"] == "calculada"
+    guardada = cache_ruedas.buscar(len(NUMEROS), 3, 4, 3)
+    assert guardada['cubiertos'] > 1 and guardada['estrategia'] == "perezosa"
+
+
+def test_kino_recorre_todos_los_boletos_si_cabe():
+    grupo = list(range(2, 80, 5))[:16]
+    boletos, info = wheeling.generar_rueda_kino(grupo, 5, 7, 30, tiempo_optimizacion=0, usar_cache=False)
+    assert info["candidatos"] == info["candidatos_totales"] == 8008
+    indices = [[grupo.index(x) for x in b] for b in boletos]
+    assert wheeling.cobertura_diseno(indices, len(grupo), 5, 7) == info["objetivos_totales"]
+    _, info = wheeling.generar_rueda_kino(list(range(1, 26)), 5, 7, 1, tiempo_optimizacion=0,
+                                          usar_cache=False)
+    assert info["candidatos"] == wheeling.POOL_KINO
+
+
+def test_grupo_grande_cae_a_muestreo():
+    _, info = wheeling.generar_rueda(NUMEROS, 3, 4, 60, tiempo_optimizacion=0)
+    assert info["estrategia"] == "perezosa"
+    grande = list(range(1, 31))
+    assert math.comb(30, 6) * math.comb(30, 4) > wheeling.TRABAJO_LOTO
+    _, info = wheeling.generar_rueda(grande, 3, 4, 5, tiempo_optimizacion=0, usar_cache=False)
+    assert info["estrategia"] == "muestreo"
+
+
+def test_kino_interactiva():
+    assert wheeling.kino_interactiva(18, 7)  # todos los boletos, dentro de TRABAJO_KINO
+    assert wheeling.kino_interactiva(22, 7)
+    assert not wheeling.kino_interactiva(30, 7)
+
+
+def test_verificar_rueda_contra_fuerza_bruta():
+    import modulos.tabla_loto as tabla_loto
+    boletos = [[1, 2, 3, 4, 5, 6], [4, 5, 6, 7, 8, 9], [1, 2, 7, 8, 10, 11]]
+    res = wheeling.verificar_rueda(boletos)
+
+    sorteos = np.asarray(tabla_loto.abrir_tabla()['bolas'])
+    mejor = np.max([np.isin(sorteos, b).sum(axis=1) for b in boletos], axis=0)
+    del_grupo = np.isin(sorteos, range(1, 12)).sum(axis=1)
+    esperada = np.zeros((7, 7), dtype=np.int64)
+    np.add.at(esperada, (del_grupo, mejor), 1)
+
+    np.testing.assert_array_equal(res["matriz"], esperada)
+    assert [res["matriz"][h].sum() for h in range(7)] == [math.comb(11, h) * math.comb(29, 6 - h) for h in range(7)]
+    assert res["minimo"][6] == 3 and res["al_menos"][6] == 3
+
+
+def test_cubre_contra_intersecciones(monkeypatch):
+    monkeypatch.setattr(wheeling, 'MAX_CELDAS', 1000)  # varios trozos de boletos
+    boletos = list(combinations(range(9), 6))
+    objetivos = list(combinations(range(9), 4))  # 126: dos palabras de bitset
+    cubre = wheeling._cubre(wheeling._mascaras(boletos), wheeling._mascaras(objetivos), 3)
+    bits = np.unpackbits(cubre.view(np.uint8), axis=1, bitorder='little')[:, :len(objetivos)]
+    esperado = [[len(set(b) & set(o)) >= 3 for o in objetivos] for b in boletos]
+    np.testing.assert_array_equal(bits, esperado)
+    assert not np.unpackbits(cubre.view(np.uint8), axis=1, bitorder='little')[:, len(objetivos):].any()
+
+
+def test_enumerar_es_combinations_en_orden_colex():
+    colex = sorted(combinations(range(10), 4), key=lambda c: c[::-1])
+    np.testing.assert_array_equal(wheeling._desrango(np.arange(len(colex)), 10, 4), colex)
+    trozos = list(wheeling._enumerar(10, 4, np.uint32, bloque=37))
+    assert [len(t) for t in trozos[:-1]] == [37] * (len(trozos) - 1)
+    np.testing.assert_array_equal(np.concatenate(trozos), wheeling._mascaras(colex, np.uint32))
+
+    rangos = np.random.default_rng(3).integers(0, math.comb(30, 6), 200)
+    filas = wheeling._desrango(rangos, 30, 6)
+    assert (np.diff(filas, axis=1) > 0).all()
+    assert [sum(math.comb(int(x), i + 1) for i, x in enumerate(f)) for f in filas] == rangos.tolist()